@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Access list benchmark.
+
+Compares the gas of trigger_exits transactions with and without an access list
+generated by eth_createAccessList, for several batch sizes. Transactions are only
+estimated, nothing is sent.
+
+Gas accounting needs a real EVM, so the benchmark runs against an EL node (mainnet,
+a testnet or a local fork) and a VEBO transaction that delivered exit requests
+(submitReportData or submitExitRequestsData). The first N requests of its payload are
+triggered for every batch size N. The sender must hold the withdrawal request fees.
+
+Usage:
+    poetry run python -m benchmarks.access_list --rpc-url http://localhost:8545 \\
+        --tx-hash 0x... --from-address 0x...
+    poetry run python -m benchmarks.access_list --tx-hash 0x... --from-address 0x... \\
+        --batch-sizes 1,5,20,100
+"""
+
+import os
+from typing import TYPE_CHECKING
+
+import click
+from eth_typing import HexStr
+from web3 import Web3
+from web3.types import TxParams, Wei
+
+if TYPE_CHECKING:
+    # src reads the environment on import, see cli
+    from src.blockchain.typings import Web3 as LidoWeb3
+
+DEFAULT_BATCH_SIZES = "1,10,50,100"
+
+
+def _payload(w3: "LidoWeb3", tx_hash: HexStr) -> tuple[bytes, int]:
+    """Exit requests data and its format delivered by the VEBO transaction."""
+    vebo = w3.lido.validator_exit_bus_oracle
+    tx_input = Web3.to_hex(w3.eth.get_transaction(tx_hash).get("input", b""))
+
+    report = vebo.decode_submit_report_data(tx_input)
+    if report is not None:
+        return report["data"]["data"], report["data"]["dataFormat"]
+    request = vebo.decode_submit_exit_requests_data(tx_input)
+    if request is not None:
+        return request["request"]["data"], request["request"]["dataFormat"]
+    raise click.UsageError(f"{tx_hash} is not a VEBO exit requests transaction")
+
+
+@click.command()
+@click.option("--rpc-url", envvar="WEB3_RPC_ENDPOINTS", help="EL RPC endpoint(s)")
+@click.option("--tx-hash", required=True, help="VEBO transaction with exit requests")
+@click.option("--from-address", required=True, help="Sender holding the request fees")
+@click.option(
+    "--batch-sizes",
+    default=DEFAULT_BATCH_SIZES,
+    show_default=True,
+    help="Comma-separated numbers of triggered requests",
+)
+def cli(rpc_url: str, tx_hash: str, from_address: str, batch_sizes: str):
+    """Report gas of trigger_exits with and without an access list."""
+    if not rpc_url:
+        raise click.UsageError("--rpc-url or WEB3_RPC_ENDPOINTS is required")
+    os.environ["WEB3_RPC_ENDPOINTS"] = rpc_url
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    # src reads the environment on import
+    from src.main import create_web3
+    from src.utils.exit_data_decoder import decode_all_validators
+
+    w3 = create_web3(rpc_url.split(","))
+    sender = Web3.to_checksum_address(from_address)
+    exits_data, data_format = _payload(w3, HexStr(tx_hash))
+    requests_count = len(decode_all_validators(exits_data))
+    fee_per_request = w3.lido.withdrawal_vault.get_withdrawal_request_fee()
+    transaction_utils = w3.transaction
+
+    click.echo(
+        f"Access list benchmark ({requests_count} requests in payload,"
+        f" fee {fee_per_request} wei per request)"
+    )
+    click.echo(
+        f"  {'batch':>6} {'gas':>10} {'with list':>10} {'saved':>8} {'saved %':>8}"
+        f" {'addresses':>10} {'slots':>6}"
+    )
+    for batch_size in (int(size) for size in batch_sizes.split(",")):
+        if batch_size > requests_count:
+            click.echo(f"  {batch_size:>6} skipped, payload is smaller")
+            continue
+        value = Wei(fee_per_request * batch_size)
+        transaction = w3.lido.validator_exit_bus_oracle.trigger_exits(
+            exits_data=exits_data,
+            data_format=data_format,
+            exit_data_indexes=list(range(batch_size)),
+            refund_recipient=sender,
+        )
+        gas = transaction_utils._estimate_gas(transaction, sender, value)
+        call_params = TxParams(
+            {
+                "from": sender,
+                "to": transaction.address,
+                "data": transaction._encode_transaction_data(),
+                "value": value,
+            }
+        )
+        access_list = w3.eth.create_access_list(call_params)["accessList"]
+        gas_with_list = transaction_utils._estimate_gas(
+            transaction, sender, value, access_list
+        )
+        if gas is None or gas_with_list is None:
+            click.echo(f"  {batch_size:>6} failed to estimate, see the warning above")
+            continue
+
+        saved = gas - gas_with_list
+        slots = sum(len(entry["storageKeys"]) for entry in access_list)
+        click.echo(
+            f"  {batch_size:>6} {gas:>10} {gas_with_list:>10} {saved:>8}"
+            f" {saved / gas * 100:>7.2f}% {len(access_list):>10} {slots:>6}"
+        )
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+End-to-end cycle benchmark.
+
+Starts local fake EL and beacon nodes (see benchmarks/fake_nodes.py) seeded with
+synthetic VEBO payloads and drives TriggerExitBot.trigger_exits against them, the same
+way the main loop does: the first cycle scans all payload blocks, the following cycles
+only re-check validators kept in the bot state.
+
+Reported per cycle:
+- seconds and validators checked per second
+- EL and CL requests per validator, counted by the fake nodes
+- stage breakdown from the cycle stats
+- peak memory: process max RSS, and traced Python allocations with --trace-memory
+
+With --record the EL/CL traffic is written to a cassette that can be replayed with
+benchmarks.replay.
+
+The bot runs without an account, so trigger transactions are simulated but not sent.
+
+Usage:
+    poetry run python -m benchmarks.cycle --validators 10000
+    poetry run python -m benchmarks.cycle --validators 100000 --payloads 20 --modules 3
+    poetry run python -m benchmarks.cycle --validators 1000 --latency-ms 20 --error-rate 0.01
+    poetry run python -m benchmarks.cycle --validators 1000 --record data/bench.jsonl.gz
+"""
+
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from benchmarks.fake_nodes import LOCATOR, FakeChainConfig, FakeNodes
+
+# Counters of the fake nodes that are not RPC methods
+_HTTP_COUNTERS = ("http_requests", "http_errors")
+
+
+def _configure_env(el_url: str, cl_url: str) -> None:
+    """Point the bot at the fake nodes. Must run before src is imported."""
+    os.environ.update(
+        {
+            "WEB3_RPC_ENDPOINTS": el_url,
+            "CL_RPC_ENDPOINTS": cl_url,
+            "LIDO_LOCATOR": LOCATOR,
+            "ADDRESS_CACHE_TTL_SECONDS": "0",
+            # Fake chains with different settings share tx hashes
+            "DISK_CACHE_MAX_BYTES": "0",
+            "MODULES_WHITELIST": "",
+            "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+        }
+    )
+    os.environ.pop("WALLET_PRIVATE_KEY", None)
+
+
+def _rpc_count(counters: dict[str, int]) -> int:
+    return sum(v for k, v in counters.items() if k not in _HTTP_COUNTERS)
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+def run_benchmark(
+    config: FakeChainConfig,
+    cycles: int,
+    trace_memory: bool,
+    record: Optional[Path] = None,
+) -> list[dict]:
+    with FakeNodes(config) as nodes:
+        _configure_env(nodes.el_url, nodes.cl_url)
+
+        from src.main import create_cl_client, create_web3
+        from src.metrics.cycle_stats import finish_cycle, start_cycle
+        from src.trigger_exit_bot import TriggerExitBot
+        from src.utils.cassette import CASSETTE_MODE_RECORD, Cassette
+
+        cassette = None
+        if record is not None:
+            cassette = Cassette(record, CASSETTE_MODE_RECORD)
+            cassette.record_env()
+
+        w3 = create_web3([nodes.el_url], cassette)
+        bot = TriggerExitBot(w3, create_cl_client([nodes.cl_url], cassette))
+
+        from_block = nodes.info["from_block"]
+        to_block = nodes.info["to_block"]
+        results = []
+        for cycle in range(cycles):
+            validators = bot.get_state_summary()["tracked_validators"]
+            nodes.reset_stats()
+            if cassette is not None:
+                cassette.record_cycle(from_block, to_block)
+            start_cycle()
+            if trace_memory:
+                tracemalloc.start()
+
+            started = time.perf_counter()
+            bot.trigger_exits(from_block=from_block, to_block=to_block)
+            seconds = time.perf_counter() - started
+
+            traced_peak = None
+            if trace_memory:
+                traced_peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+                tracemalloc.stop()
+            summary = finish_cycle()
+            stats = nodes.stats()
+
+            # The first cycle picks up all payloads, later cycles re-check the state
+            if cycle == 0:
+                validators = config.validators
+            el_requests = _rpc_count(stats["el"])
+            cl_requests = _rpc_count(stats["cl"])
+            results.append(
+                {
+                    "cycle": cycle + 1,
+                    "seconds": round(seconds, 3),
+                    "validators": validators,
+                    "validators_per_second": round(validators / seconds, 1),
+                    "el_requests": el_requests,
+                    "cl_requests": cl_requests,
+                    "el_requests_per_validator": round(
+                        el_requests / max(1, validators), 3
+                    ),
+                    "cl_requests_per_validator": round(
+                        cl_requests / max(1, validators), 3
+                    ),
+                    "http_errors": stats["el"].get("http_errors", 0)
+                    + stats["cl"].get("http_errors", 0),
+                    "el_methods": {
+                        k: v for k, v in stats["el"].items() if k not in _HTTP_COUNTERS
+                    },
+                    "stages_seconds": summary["stages_seconds"],
+                    "max_rss_mb": round(_max_rss_mb(), 1),
+                    "traced_peak_mb": None
+                    if traced_peak is None
+                    else round(traced_peak, 1),
+                }
+            )
+            # Following cycles start after the scanned range, like the main loop
+            from_block = to_block + 1
+
+        if cassette is not None:
+            cassette.close()
+        return results
+
+
+@click.command()
+@click.option("--validators", type=click.IntRange(1), default=1000)
+@click.option("--payloads", type=click.IntRange(1), default=1, help="VEBO reports")
+@click.option("--modules", type=click.IntRange(1), default=1, help="Staking modules")
+@click.option(
+    "--payloads-per-block",
+    type=click.IntRange(1),
+    default=1,
+    help="Payload transactions in the same block",
+)
+@click.option(
+    "--block-receipts/--no-block-receipts",
+    default=True,
+    help="Whether the fake EL node serves eth_getBlockReceipts",
+)
+@click.option("--exited-share", type=click.FloatRange(0, 1), default=0.1)
+@click.option("--reported-share", type=click.FloatRange(0, 1), default=0.5)
+@click.option("--latency-ms", type=click.FloatRange(0), default=0.0)
+@click.option("--error-rate", type=click.FloatRange(0, 1), default=0.0)
+@click.option("--cycles", type=click.IntRange(1), default=2)
+@click.option("--seed", type=int, default=0)
+@click.option(
+    "--trace-memory", is_flag=True, help="Trace Python allocations (slows the cycle)"
+)
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+@click.option(
+    "--record",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Record EL/CL traffic to a cassette file",
+)
+def cli(
+    validators: int,
+    payloads: int,
+    modules: int,
+    payloads_per_block: int,
+    block_receipts: bool,
+    exited_share: float,
+    reported_share: float,
+    latency_ms: float,
+    error_rate: float,
+    cycles: int,
+    seed: int,
+    trace_memory: bool,
+    as_json: bool,
+    record: Optional[Path],
+):
+    """Measure bot cycle time against local fake EL and beacon nodes."""
+    config = FakeChainConfig(
+        validators=validators,
+        payloads=payloads,
+        modules=modules,
+        payloads_per_block=payloads_per_block,
+        block_receipts=block_receipts,
+        exited_share=exited_share,
+        reported_share=reported_share,
+        latency_ms=latency_ms,
+        error_rate=error_rate,
+        seed=seed,
+    )
+    results = run_benchmark(config, cycles, trace_memory, record)
+
+    if as_json:
+        click.echo(json.dumps(results))
+        return
+
+    click.echo(
+        f"Cycle benchmark ({validators} validators, {payloads} payloads, "
+        f"{modules} modules, latency {latency_ms} ms, error rate {error_rate})"
+    )
+    for result in results:
+        click.echo(
+            f"  cycle {result['cycle']}: {result['seconds']:8.3f} s"
+            f"  {result['validators_per_second']:9.1f} validators/s"
+            f"  EL {result['el_requests_per_validator']:6.3f} req/validator"
+            f"  CL {result['cl_requests_per_validator']:6.3f} req/validator"
+            f"  max RSS {result['max_rss_mb']:7.1f} MB"
+            + (
+                f"  traced peak {result['traced_peak_mb']:7.1f} MB"
+                if result["traced_peak_mb"] is not None
+                else ""
+            )
+        )
+        click.echo(f"    stages: {result['stages_seconds']}")
+        click.echo(f"    EL methods: {result['el_methods']}")
+
+
+if __name__ == "__main__":
+    cli()
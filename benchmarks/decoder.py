@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Packed exit data microbenchmarks.
+
+Measures the code working with the VEBO packed format on synthetic payloads:
+- decode_all_validators:  packed bytes -> validator dicts
+- unpack_exit_request:    single record unpacking, called for every record
+- calldata_decode:        submitExitRequestsData tx input -> validators, the bot path
+- to_veb_calldata:        scripts encoder, keys -> packed bytes
+- to_et_calldata:         scripts encoder, keys -> ABI-encoded ExitRequestInput[]
+
+Every case reports records per second (best of --repeat runs) and the peak of Python
+allocations during one run (tracemalloc). Sizes whose estimated run time is above
+--max-seconds are skipped.
+
+Results are compared with the stored baseline (benchmarks/baselines/decoder.json) when
+it exists. --save-baseline overwrites it, --max-regression makes the run fail if
+throughput drops by more than the given share.
+
+Usage:
+    poetry run python -m benchmarks.decoder
+    poetry run python -m benchmarks.decoder --sizes 1,1000,1000000 --case decode_all_validators
+    poetry run python -m benchmarks.decoder --max-regression 0.2
+    poetry run python -m benchmarks.decoder --save-baseline
+"""
+
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Optional, cast
+
+import click
+from eth_typing import HexStr
+from web3 import Web3
+
+from scripts.encode_exit_requests import ValidatorExitData
+from scripts.kapi_client import Key
+from src.blockchain.contracts.validator_exit_bus_oracle import (
+    ValidatorExitBusOracleContract,
+)
+from src.utils.exit_data_decoder import decode_all_validators, unpack_exit_request
+from src.utils.logs import configure_logging
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "decoder.json"
+DEFAULT_SIZES = "1,100,10000,1000000"
+VEBO_ADDRESS = Web3.to_checksum_address("0x0De4Ea0184c2ad0BacA7183356Aea5B8d5Bf5c6e")
+
+
+def make_keys(records: int, seed: int = 0) -> list[Key]:
+    """Synthetic exit requests, already in VEBO order."""
+    rng = random.Random(seed)
+    return [
+        Key(
+            module_id=1 + i * 3 // records,
+            no_id=i % 500,
+            validator_index=1_000_000 + i,
+            validator_pub_key=HexStr("0x" + rng.randbytes(48).hex()),
+            pub_key_index=i,
+        )
+        for i in range(records)
+    ]
+
+
+def make_payload(records: int, seed: int = 0) -> bytes:
+    """Packed VEBO data for the same records as make_keys."""
+    return b"".join(
+        key.module_id.to_bytes(3, "big")
+        + key.no_id.to_bytes(5, "big")
+        + key.validator_index.to_bytes(8, "big")
+        + bytes.fromhex(key.validator_pub_key[2:])
+        for key in make_keys(records, seed)
+    )
+
+
+def _vebo() -> ValidatorExitBusOracleContract:
+    # No requests are made, the address is only needed to create the instance
+    return cast(
+        ValidatorExitBusOracleContract,
+        Web3().eth.contract(
+            address=VEBO_ADDRESS, ContractFactoryClass=ValidatorExitBusOracleContract
+        ),
+    )
+
+
+def setup_decode_all_validators(records: int) -> Callable[[], Any]:
+    payload = make_payload(records)
+    return lambda: decode_all_validators(payload)
+
+
+def setup_unpack_exit_request(records: int) -> Callable[[], Any]:
+    payload = make_payload(records)
+    return lambda: [unpack_exit_request(payload, i) for i in range(records)]
+
+
+def setup_calldata_decode(records: int) -> Callable[[], Any]:
+    vebo = _vebo()
+    calldata = vebo.encode_abi(
+        "submitExitRequestsData", args=[(make_payload(records), 1)]
+    )
+
+    def run():
+        decoded = vebo.decode_submit_exit_requests_data(calldata)
+        assert decoded is not None
+        return decode_all_validators(decoded["request"]["data"])
+
+    return run
+
+
+def setup_to_veb_calldata(records: int) -> Callable[[], Any]:
+    exit_data = ValidatorExitData(make_keys(records))
+    return exit_data.to_veb_calldata
+
+
+def setup_to_et_calldata(records: int) -> Callable[[], Any]:
+    exit_data = ValidatorExitData(make_keys(records))
+    return exit_data.to_et_calldata
+
+
+CASES: dict[str, Callable[[int], Callable[[], Any]]] = {
+    "decode_all_validators": setup_decode_all_validators,
+    "unpack_exit_request": setup_unpack_exit_request,
+    "calldata_decode": setup_calldata_decode,
+    "to_veb_calldata": setup_to_veb_calldata,
+    "to_et_calldata": setup_to_et_calldata,
+}
+
+
+def measure(run: Callable[[], Any], records: int, repeat: int) -> dict[str, float]:
+    # Small payloads are run in a loop, so timer resolution does not matter
+    loops = max(1, 10_000 // records)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            run()
+        best = min(best, (time.perf_counter() - started) / loops)
+
+    tracemalloc.start()
+    run()
+    allocated = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "seconds": best,
+        "records_per_second": records / best,
+        "alloc_bytes": allocated,
+        "alloc_bytes_per_record": allocated / records,
+    }
+
+
+def run_cases(
+    cases: list[str], sizes: list[int], repeat: int, max_seconds: float
+) -> dict[str, dict[str, Any]]:
+    results: dict[str, dict[str, Any]] = {}
+    for case in cases:
+        previous: Optional[tuple[int, float]] = None
+        for records in sorted(sizes):
+            key = f"{case}:{records}"
+            # Linear estimate from the previous size, encoders may scale worse
+            if previous is not None:
+                estimate = previous[1] * records / previous[0]
+                if estimate * (repeat + 1) > max_seconds:
+                    results[key] = {"skipped": True, "estimated_seconds": estimate}
+                    continue
+            results[key] = measure(CASES[case](records), records, repeat)
+            previous = (records, results[key]["seconds"])
+    return results
+
+
+def _format_delta(value: float, baseline: Optional[float]) -> str:
+    if not baseline:
+        return ""
+    return f" ({(value / baseline - 1) * 100:+6.1f}%)"
+
+
+@click.command()
+@click.option("--sizes", default=DEFAULT_SIZES, help="Comma-separated record counts")
+@click.option(
+    "--case",
+    "cases",
+    type=click.Choice(list(CASES)),
+    multiple=True,
+    help="Cases to run (default: all)",
+)
+@click.option("--repeat", type=click.IntRange(1), default=5)
+@click.option(
+    "--max-seconds",
+    type=float,
+    default=30.0,
+    help="Skip sizes estimated to run longer than this",
+)
+@click.option("--baseline", type=click.Path(path_type=Path), default=BASELINE_PATH)
+@click.option("--save-baseline", is_flag=True, help="Store results as the baseline")
+@click.option(
+    "--max-regression",
+    type=click.FloatRange(0, 1),
+    help="Fail if records/s is below the baseline by more than this share",
+)
+def cli(
+    sizes: str,
+    cases: tuple[str, ...],
+    repeat: int,
+    max_seconds: float,
+    baseline: Path,
+    save_baseline: bool,
+    max_regression: Optional[float],
+):
+    """Report records/s and allocations of packed exit data encoding and decoding."""
+    configure_logging("WARNING", "full", 1.0)
+
+    results = run_cases(
+        list(cases or CASES), [int(s) for s in sizes.split(",")], repeat, max_seconds
+    )
+
+    stored = json.loads(baseline.read_text())["results"] if baseline.exists() else {}
+    regressions = []
+    click.echo(f"{'case':<34} {'records/s':>24} {'alloc bytes/record':>28}")
+    for key, result in results.items():
+        if result.get("skipped"):
+            click.echo(
+                f"{key:<34} skipped (estimated {result['estimated_seconds']:.1f} s per run)"
+            )
+            continue
+        base = stored.get(key, {})
+        click.echo(
+            f"{key:<34} {result['records_per_second']:>14,.0f}"
+            f"{_format_delta(result['records_per_second'], base.get('records_per_second')):<10}"
+            f" {result['alloc_bytes_per_record']:>18,.1f}"
+            f"{_format_delta(result['alloc_bytes_per_record'], base.get('alloc_bytes_per_record'))}"
+        )
+        if (
+            max_regression is not None
+            and base.get("records_per_second")
+            and result["records_per_second"]
+            < base["records_per_second"] * (1 - max_regression)
+        ):
+            regressions.append(key)
+
+    if save_baseline:
+        baseline.parent.mkdir(parents=True, exist_ok=True)
+        baseline.write_text(
+            json.dumps(
+                {
+                    "machine": {
+                        "python": sys.version.split()[0],
+                        "platform": platform.platform(),
+                        "processor": platform.processor() or platform.machine(),
+                    },
+                    "results": {
+                        key: {
+                            "records_per_second": round(r["records_per_second"], 1),
+                            "alloc_bytes_per_record": round(
+                                r["alloc_bytes_per_record"], 1
+                            ),
+                        }
+                        for key, r in results.items()
+                        if not r.get("skipped")
+                    },
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+        click.echo(f"Baseline saved to {baseline}")
+
+    if regressions:
+        raise click.ClickException(f"Throughput regression: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,568 @@
+"""
+Local stand-ins for the execution and beacon nodes used by the benchmarks.
+
+FakeChain holds a synthetic Lido deployment: a locator, a staking router with a NOR
+per staking module, a withdrawal vault and a VEBO with one submitExitRequestsData
+transaction per payload. The EL node answers the JSON-RPC calls the bot makes against
+it and the beacon node answers validator lookups. Both nodes count requests by method,
+the counters are served at /__stats and reset with POST /__reset.
+
+Latency and error rate apply to every HTTP request, errors are returned as 503 so
+they go through the same retry paths as a failing hosted node.
+"""
+
+import json
+import multiprocessing
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing.context import SpawnProcess
+from typing import Any, Callable, Optional, cast
+from urllib.parse import urlparse
+
+import requests
+from eth_abi.abi import decode, encode
+from eth_typing import ABIEvent, ABIFunction
+from eth_utils.abi import (
+    event_abi_to_log_topic,
+    function_abi_to_4byte_selector,
+    get_abi_input_types,
+    get_abi_output_types,
+)
+from eth_utils.address import to_checksum_address
+from eth_utils.crypto import keccak
+
+from src.blockchain.contracts.base_interface import ContractInterface
+
+CHAIN_ID = 560048
+FIRST_BLOCK = 1_000_000
+# Blocks between two payload transactions
+BLOCKS_PER_PAYLOAD = 10
+
+LOCATOR = to_checksum_address("0x" + "10" * 20)
+VEBO = to_checksum_address("0x" + "11" * 20)
+STAKING_ROUTER = to_checksum_address("0x" + "12" * 20)
+WITHDRAWAL_VAULT = to_checksum_address("0x" + "13" * 20)
+SUBMITTER = to_checksum_address("0x" + "14" * 20)
+
+EXITED_STATUSES = ("exited_unslashed", "withdrawal_possible", "withdrawal_done")
+
+
+def module_address(module_id: int) -> str:
+    return to_checksum_address("0x" + "20" * 18 + f"{module_id:04x}")
+
+
+@dataclass
+class FakeChainConfig:
+    validators: int = 1000
+    payloads: int = 1
+    modules: int = 1
+    # Share of validators already exited on CL
+    exited_share: float = 0.1
+    # Share of validators with the exiting key reported in NOR
+    reported_share: float = 0.5
+    # Payload transactions included in the same block
+    payloads_per_block: int = 1
+    # Whether the EL node serves eth_getBlockReceipts
+    block_receipts: bool = True
+    latency_ms: float = 0.0
+    error_rate: float = 0.0
+    seed: int = 0
+
+
+class FakeChain:
+    """Synthetic chain state, generated deterministically from the config seed."""
+
+    def __init__(self, config: FakeChainConfig):
+        self.config = config
+        rng = random.Random(config.seed)
+
+        self.validators: dict[str, dict[str, Any]] = {}
+        self.reported: set[bytes] = set()
+        self.payloads: list[bytes] = []
+
+        per_payload = max(1, config.validators // max(1, config.payloads))
+        created = 0
+        while created < config.validators:
+            count = min(per_payload, config.validators - created)
+            records = []
+            for _ in range(count):
+                module_id = rng.randint(1, config.modules)
+                node_op_id = rng.randint(0, 499)
+                val_index = 1_000_000 + created
+                pubkey = rng.randbytes(48)
+                records.append(
+                    module_id.to_bytes(3, "big")
+                    + node_op_id.to_bytes(5, "big")
+                    + val_index.to_bytes(8, "big")
+                    + pubkey
+                )
+                self.validators["0x" + pubkey.hex()] = {
+                    "index": str(val_index),
+                    "status": rng.choice(EXITED_STATUSES)
+                    if rng.random() < config.exited_share
+                    else "active_ongoing",
+                }
+                if rng.random() < config.reported_share:
+                    self.reported.add(pubkey)
+                created += 1
+            self.payloads.append(b"".join(records))
+
+        self.latest_block = self.payload_block(len(self.payloads)) + 64
+        self.transactions = {self.tx_hash(i): i for i in range(len(self.payloads))}
+
+    @staticmethod
+    def tx_hash(payload_index: int) -> str:
+        return "0x" + keccak(b"tx" + payload_index.to_bytes(8, "big")).hex()
+
+    @staticmethod
+    def block_hash(number: int) -> str:
+        return "0x" + keccak(b"block" + number.to_bytes(8, "big")).hex()
+
+    def payload_block(self, payload_index: int) -> int:
+        block_offset = payload_index // self.config.payloads_per_block
+        return FIRST_BLOCK + block_offset * BLOCKS_PER_PAYLOAD
+
+    def payload_tx_index(self, payload_index: int) -> int:
+        return payload_index % self.config.payloads_per_block
+
+    def block_payloads(self, number: int) -> range:
+        offset, remainder = divmod(number - FIRST_BLOCK, BLOCKS_PER_PAYLOAD)
+        if number < FIRST_BLOCK or remainder:
+            return range(0)
+        first = offset * self.config.payloads_per_block
+        return range(
+            min(first, len(self.payloads)),
+            min(first + self.config.payloads_per_block, len(self.payloads)),
+        )
+
+    def validators_by_index(self) -> dict[str, tuple[str, dict[str, Any]]]:
+        return {v["index"]: (pubkey, v) for pubkey, v in self.validators.items()}
+
+
+def _abi(abi_file: str) -> list[dict[str, Any]]:
+    return ContractInterface.load_abi(f"./interfaces/{abi_file}")
+
+
+class FakeExecutionNode:
+    """JSON-RPC handlers for the calls made by the bot."""
+
+    def __init__(self, chain: FakeChain):
+        self.chain = chain
+        self.calls: dict[
+            tuple[str, bytes], tuple[ABIFunction, Callable[..., tuple]]
+        ] = {}
+        vebo_abi = _abi("ValidatorExitBusOracle.json")
+
+        self._register(
+            LOCATOR,
+            "LidoLocator.json",
+            {
+                "coreComponents": lambda: (
+                    LOCATOR,
+                    LOCATOR,
+                    STAKING_ROUTER,
+                    LOCATOR,
+                    LOCATOR,
+                    WITHDRAWAL_VAULT,
+                ),
+                "validatorsExitBusOracle": lambda: (VEBO,),
+                "stakingRouter": lambda: (STAKING_ROUTER,),
+                "withdrawalVault": lambda: (WITHDRAWAL_VAULT,),
+            },
+        )
+        self._register(
+            STAKING_ROUTER,
+            "StakingRouter.json",
+            {"getAllStakingModuleDigests": self._staking_module_digests},
+        )
+        for module_id in range(1, chain.config.modules + 1):
+            self._register(
+                module_address(module_id),
+                "NodeOperatorRegistry.json",
+                {
+                    "isValidatorExitingKeyReported": lambda pubkey: (
+                        pubkey in chain.reported,
+                    )
+                },
+            )
+        self._register(
+            WITHDRAWAL_VAULT,
+            "WithdrawalVault.json",
+            {"getWithdrawalRequestFee": lambda: (1,)},
+        )
+        self._register(
+            VEBO,
+            "ValidatorExitBusOracle.json",
+            {"triggerExits": lambda *args: ()},
+        )
+
+        event_abi = next(
+            cast(ABIEvent, item)
+            for item in vebo_abi
+            if item["type"] == "event" and item["name"] == "ExitDataProcessing"
+        )
+        self.exit_data_processing_topic = "0x" + event_abi_to_log_topic(event_abi).hex()
+        submit_abi = next(
+            cast(ABIFunction, item)
+            for item in vebo_abi
+            if item["type"] == "function" and item["name"] == "submitExitRequestsData"
+        )
+        self.submit_selector = function_abi_to_4byte_selector(submit_abi)
+        self.submit_input_types = get_abi_input_types(submit_abi)
+
+        self.methods: dict[str, Callable[[list], Any]] = {
+            "eth_chainId": lambda params: hex(CHAIN_ID),
+            "eth_blockNumber": lambda params: hex(chain.latest_block),
+            "eth_getBlockByNumber": self._get_block,
+            "eth_call": self._call,
+            "eth_estimateGas": lambda params: hex(150_000),
+            "eth_getLogs": self._get_logs,
+            "eth_getTransactionByHash": self._get_transaction,
+            "eth_getTransactionReceipt": self._get_receipt,
+            "eth_getBalance": lambda params: hex(10**18),
+        }
+        if chain.config.block_receipts:
+            self.methods["eth_getBlockReceipts"] = self._get_block_receipts
+
+    def _register(
+        self, address: str, abi_file: str, handlers: dict[str, Callable[..., tuple]]
+    ) -> None:
+        for item in _abi(abi_file):
+            if item.get("type") == "function" and item["name"] in handlers:
+                abi = cast(ABIFunction, item)
+                selector = function_abi_to_4byte_selector(abi)
+                self.calls[(address.lower(), selector)] = (abi, handlers[item["name"]])
+
+    def _staking_module_digests(self) -> tuple:
+        digests = []
+        for module_id in range(1, self.chain.config.modules + 1):
+            state = (
+                module_id,
+                module_address(module_id),
+                500,
+                500,
+                10000,
+                0,
+                f"module-{module_id}",
+                0,
+                0,
+                0,
+                10000,
+                150,
+                25,
+            )
+            digests.append((500, 500, state, (0, 0, 0)))
+        return (digests,)
+
+    def _parse_block(self, block: Any) -> int:
+        if isinstance(block, str) and block.startswith("0x"):
+            return int(block, 16)
+        if block == "earliest":
+            return 0
+        return self.chain.latest_block
+
+    def _get_block(self, params: list) -> dict[str, Any]:
+        number = self._parse_block(params[0])
+        return {
+            "number": hex(number),
+            "hash": self.chain.block_hash(number),
+            "parentHash": self.chain.block_hash(number - 1),
+            "timestamp": hex(1_700_000_000 + number * 12),
+            "baseFeePerGas": hex(10**9),
+            "gasLimit": hex(36_000_000),
+            "gasUsed": hex(0),
+            "miner": SUBMITTER,
+            "transactions": [],
+        }
+
+    def _call(self, params: list) -> str:
+        tx = params[0]
+        data = bytes.fromhex(tx.get("data", tx.get("input", "0x"))[2:])
+        entry = self.calls.get((tx["to"].lower(), data[:4]))
+        if entry is None:
+            raise ValueError(f"Unknown call {tx['to']} {data[:4].hex()}")
+        abi, handler = entry
+        args = decode(get_abi_input_types(abi), data[4:])
+        return "0x" + encode(get_abi_output_types(abi), handler(*args)).hex()
+
+    def _payload_log(self, payload_index: int) -> dict[str, Any]:
+        data = self.chain.payloads[payload_index]
+        block = self.chain.payload_block(payload_index)
+        # exitRequestsHash = keccak256(abi.encode(data, dataFormat))
+        exit_requests_hash = keccak(encode(["bytes", "uint256"], [data, 1]))
+        return {
+            "address": VEBO,
+            "topics": [self.exit_data_processing_topic],
+            "data": "0x" + exit_requests_hash.hex(),
+            "blockNumber": hex(block),
+            "blockHash": self.chain.block_hash(block),
+            "transactionHash": self.chain.tx_hash(payload_index),
+            "transactionIndex": hex(self.chain.payload_tx_index(payload_index)),
+            "logIndex": hex(self.chain.payload_tx_index(payload_index)),
+            "removed": False,
+        }
+
+    def _get_logs(self, params: list) -> list[dict[str, Any]]:
+        query = params[0]
+        from_block = self._parse_block(query.get("fromBlock", "latest"))
+        to_block = self._parse_block(query.get("toBlock", "latest"))
+        topics = query.get("topics") or []
+        if topics and topics[0] not in (None, self.exit_data_processing_topic):
+            return []
+        return [
+            self._payload_log(i)
+            for i in range(len(self.chain.payloads))
+            if from_block <= self.chain.payload_block(i) <= to_block
+        ]
+
+    def _get_transaction(self, params: list) -> Optional[dict[str, Any]]:
+        payload_index = self.chain.transactions.get(params[0])
+        if payload_index is None:
+            return None
+        block = self.chain.payload_block(payload_index)
+        calldata = self.submit_selector + encode(
+            self.submit_input_types, [(self.chain.payloads[payload_index], 1)]
+        )
+        return {
+            "blockHash": self.chain.block_hash(block),
+            "blockNumber": hex(block),
+            "chainId": hex(CHAIN_ID),
+            "from": SUBMITTER,
+            "gas": hex(30_000_000),
+            "gasPrice": hex(10**9),
+            "hash": params[0],
+            "input": "0x" + calldata.hex(),
+            "nonce": hex(payload_index),
+            "to": VEBO,
+            "transactionIndex": hex(self.chain.payload_tx_index(payload_index)),
+            "type": "0x0",
+            "value": "0x0",
+            "v": "0x1b",
+            "r": "0x1",
+            "s": "0x1",
+        }
+
+    def _get_receipt(self, params: list) -> Optional[dict[str, Any]]:
+        payload_index = self.chain.transactions.get(params[0])
+        if payload_index is None:
+            return None
+        return self._receipt(payload_index)
+
+    def _get_block_receipts(self, params: list) -> list[dict[str, Any]]:
+        number = self._parse_block(params[0])
+        return [self._receipt(i) for i in self.chain.block_payloads(number)]
+
+    def _receipt(self, payload_index: int) -> dict[str, Any]:
+        block = self.chain.payload_block(payload_index)
+        return {
+            "blockHash": self.chain.block_hash(block),
+            "blockNumber": hex(block),
+            "contractAddress": None,
+            "cumulativeGasUsed": hex(1_000_000),
+            "effectiveGasPrice": hex(10**9),
+            "from": SUBMITTER,
+            "gasUsed": hex(1_000_000),
+            "logs": [self._payload_log(payload_index)],
+            "logsBloom": "0x" + "00" * 256,
+            "status": "0x1",
+            "to": VEBO,
+            "transactionHash": self.chain.tx_hash(payload_index),
+            "transactionIndex": hex(self.chain.payload_tx_index(payload_index)),
+            "type": "0x0",
+        }
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        response: dict[str, Any] = {"jsonrpc": "2.0", "id": request.get("id")}
+        method = self.methods.get(request["method"])
+        if method is None:
+            response["error"] = {"code": -32601, "message": "Method not found"}
+            return response
+        try:
+            response["result"] = method(request.get("params") or [])
+        except Exception as error:
+            response["error"] = {"code": -32000, "message": str(error)}
+        return response
+
+
+class FakeBeaconNode:
+    """Beacon API handlers for validator lookups."""
+
+    prefix = "/eth/v1/beacon/states/head/validators"
+
+    def __init__(self, chain: FakeChain):
+        self.chain = chain
+        self.by_index = chain.validators_by_index()
+
+    @staticmethod
+    def _validator(pubkey: str, validator: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "index": validator["index"],
+            "balance": "32000000000",
+            "status": validator["status"],
+            "validator": {"pubkey": pubkey},
+        }
+
+    def handle(self, path: str) -> tuple[int, dict[str, Any]]:
+        if path == self.prefix:
+            return 200, {
+                "data": [
+                    self._validator(pubkey, v)
+                    for pubkey, v in self.chain.validators.items()
+                ]
+            }
+        if path.startswith(self.prefix + "/"):
+            validator_id = path.removeprefix(self.prefix + "/")
+            if validator_id.startswith("0x"):
+                validator = self.chain.validators.get(validator_id)
+                found = (validator_id, validator) if validator else None
+            else:
+                found = self.by_index.get(validator_id)
+            if found is None:
+                return 404, {"code": 404, "message": "Validator not found"}
+            return 200, {"data": self._validator(*found)}
+        return 404, {"code": 404, "message": "Not found"}
+
+
+def _make_handler(
+    node: FakeExecutionNode | FakeBeaconNode, config: FakeChainConfig
+) -> type[BaseHTTPRequestHandler]:
+    stats: Counter = Counter()
+    lock = threading.Lock()
+    rng = random.Random(config.seed)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately, Nagle would delay keep-alive replies
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, status: int, body: Any) -> None:
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _stats_request(self) -> bool:
+            if self.path == "/__stats":
+                with lock:
+                    self._reply(200, dict(stats))
+                return True
+            if self.path == "/__reset":
+                with lock:
+                    stats.clear()
+                self._reply(200, {})
+                return True
+            return False
+
+        def _simulate_network(self) -> bool:
+            """Apply configured latency, return False if the request must fail."""
+            if config.latency_ms:
+                time.sleep(config.latency_ms / 1000)
+            with lock:
+                stats["http_requests"] += 1
+                failed = rng.random() < config.error_rate
+                if failed:
+                    stats["http_errors"] += 1
+            if failed:
+                self._reply(503, {"message": "Service unavailable"})
+            return not failed
+
+        def do_GET(self):
+            if self._stats_request() or not self._simulate_network():
+                return
+            assert isinstance(node, FakeBeaconNode)
+            path = urlparse(self.path).path
+            with lock:
+                stats["validator_lookups" if path != node.prefix else "validators"] += 1
+            self._reply(*node.handle(path))
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self._stats_request() or not self._simulate_network():
+                return
+            assert isinstance(node, FakeExecutionNode)
+            request = json.loads(body)
+            requests = request if isinstance(request, list) else [request]
+            with lock:
+                stats.update(r["method"] for r in requests)
+            responses = [node.handle(r) for r in requests]
+            self._reply(200, responses if isinstance(request, list) else responses[0])
+
+    return Handler
+
+
+def serve(config: FakeChainConfig, ready: Any) -> None:
+    """Build the chain and serve both nodes until the process is terminated."""
+    chain = FakeChain(config)
+    servers = [
+        ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(node, config))
+        for node in (FakeExecutionNode(chain), FakeBeaconNode(chain))
+    ]
+    for server in servers:
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    ready.send(
+        {
+            "el_url": f"http://127.0.0.1:{servers[0].server_address[1]}",
+            "cl_url": f"http://127.0.0.1:{servers[1].server_address[1]}",
+            "from_block": FIRST_BLOCK,
+            "to_block": chain.latest_block,
+        }
+    )
+    threading.Event().wait()
+
+
+class FakeNodes:
+    """
+    Runs the fake EL and beacon nodes in a separate process.
+
+    The nodes must not share the GIL with the bot, otherwise their response time would
+    be part of the measured bot time.
+    """
+
+    def __init__(self, config: FakeChainConfig):
+        self.config = config
+        self.info: dict[str, Any] = {}
+        self._process: Optional[SpawnProcess] = None
+
+    def __enter__(self) -> "FakeNodes":
+        context = multiprocessing.get_context("spawn")
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=serve, args=(self.config, sender), daemon=True)
+        process.start()
+        self._process = process
+        if not receiver.poll(600):
+            raise TimeoutError("Fake nodes did not start")
+        self.info = receiver.recv()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+
+    @property
+    def el_url(self) -> str:
+        return self.info["el_url"]
+
+    @property
+    def cl_url(self) -> str:
+        return self.info["cl_url"]
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {
+            "el": requests.get(self.el_url + "/__stats", timeout=10).json(),
+            "cl": requests.get(self.cl_url + "/__stats", timeout=10).json(),
+        }
+
+    def reset_stats(self) -> None:
+        requests.post(self.el_url + "/__reset", timeout=10)
+        requests.get(self.cl_url + "/__reset", timeout=10)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Cassette replay benchmark.
+
+Runs the bot cycles recorded in an RPC cassette (RPC_CASSETTE_MODE=record in the bot,
+or benchmarks.cycle --record) against the recorded EL/CL responses, without network
+access. The bot sees the same responses in every run, so run-to-run differences come
+from the bot code only. With --preserve-latency every request also takes as long as it
+took when it was recorded.
+
+The environment the recording was made with (LIDO_LOCATOR, MODULES_WHITELIST,
+ADDRESS_CACHE_TTL_SECONDS) is restored from the cassette. Recordings made with the
+address cache enabled contain no locator calls and replay only with the same DATA_DIR.
+
+Usage:
+    poetry run python -m benchmarks.replay data/cassette.jsonl.gz
+    poetry run python -m benchmarks.replay data/cassette.jsonl.gz --repeat 10
+    poetry run python -m benchmarks.replay data/cassette.jsonl.gz --preserve-latency
+"""
+
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+
+import click
+
+from src.utils.cassette import CASSETTE_MODE_REPLAY, Cassette
+
+
+def _configure_env(cassette: Cassette) -> None:
+    """Restore the recorded environment. Must run before the bot modules are imported."""
+    os.environ.update(
+        {
+            "WEB3_RPC_ENDPOINTS": "http://replay",
+            "CL_RPC_ENDPOINTS": "http://replay",
+            "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+            **cassette.env,
+        }
+    )
+    os.environ.pop("WALLET_PRIVATE_KEY", None)
+    os.environ.pop("RPC_CASSETTE_MODE", None)
+
+
+def replay_once(path: Path, preserve_latency: bool) -> list[dict]:
+    """Run all recorded cycles with a fresh bot."""
+    from src.main import create_cl_client, create_web3
+    from src.metrics.cycle_stats import finish_cycle, start_cycle
+    from src.trigger_exit_bot import TriggerExitBot
+
+    cassette = Cassette(path, CASSETTE_MODE_REPLAY, preserve_latency)
+    w3 = create_web3(["http://replay"], cassette)
+    bot = TriggerExitBot(w3, create_cl_client(["http://replay"], cassette))
+
+    results = []
+    for cycle in cassette.cycles:
+        start_cycle()
+        started = time.perf_counter()
+        bot.trigger_exits(from_block=cycle["from_block"], to_block=cycle["to_block"])
+        seconds = time.perf_counter() - started
+        summary = finish_cycle()
+        results.append(
+            {
+                "seconds": seconds,
+                "rpc_requests_total": summary["rpc_requests_total"],
+                "stages_seconds": summary["stages_seconds"],
+            }
+        )
+    return results
+
+
+@click.command()
+@click.argument("path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--repeat", type=click.IntRange(1), default=5, help="Number of replays")
+@click.option(
+    "--preserve-latency", is_flag=True, help="Sleep for the recorded request time"
+)
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+def cli(path: Path, repeat: int, preserve_latency: bool, as_json: bool):
+    """Replay recorded bot cycles and report cycle times."""
+    _configure_env(Cassette(path, CASSETTE_MODE_REPLAY))
+
+    runs = [replay_once(path, preserve_latency) for _ in range(repeat)]
+
+    if as_json:
+        click.echo(json.dumps(runs))
+        return
+
+    click.echo(
+        f"Replay benchmark ({path}, {len(runs[0])} cycles, {repeat} runs, "
+        f"preserve_latency={preserve_latency})"
+    )
+    for index in range(len(runs[0])):
+        values = [run[index]["seconds"] for run in runs]
+        stages = runs[0][index]["stages_seconds"].keys()
+        click.echo(
+            f"  cycle {index + 1}: median {statistics.median(values) * 1000:9.1f} ms"
+            f"   min {min(values) * 1000:9.1f} ms"
+            f"   requests {runs[0][index]['rpc_requests_total']}"
+        )
+        for name in stages:
+            stage_values = [run[index]["stages_seconds"].get(name, 0) for run in runs]
+            click.echo(
+                f"    {name:<12} median {statistics.median(stage_values) * 1000:9.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    cli()
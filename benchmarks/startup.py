@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark.
+
+Measures how long the bot needs from importing its modules to being ready for the
+first cycle. Every sample runs in a fresh interpreter, so module imports, ABI loading
+and contract address resolution are measured as they happen on a real restart.
+
+Phases:
+- import:      importing src.main (env parsing, logging and metrics setup)
+- web3:        creating Web3 with providers and Lido contracts (ABI load, locator calls)
+- bot:         TriggerExitBot initialization
+- first_cycle: fetching the finalized block, the first RPC call of a bot cycle
+
+Usage:
+    poetry run python -m benchmarks.startup --rpc-url http://localhost:8545
+    poetry run python -m benchmarks.startup --rpc-url http://localhost:8545 --cold --repeat 10
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import click
+
+PHASES = ("import", "web3", "bot", "first_cycle")
+
+
+def measure_once() -> dict[str, float]:
+    """Measure startup phases in the current interpreter."""
+    started = time.perf_counter()
+
+    from src.main import create_cl_client, create_web3
+    from src.trigger_exit_bot import TriggerExitBot
+    from src.variables import CL_RPC_ENDPOINTS, WEB3_RPC_ENDPOINTS
+
+    imported = time.perf_counter()
+    w3 = create_web3(WEB3_RPC_ENDPOINTS)
+    web3_created = time.perf_counter()
+    TriggerExitBot(w3, create_cl_client(CL_RPC_ENDPOINTS))
+    bot_created = time.perf_counter()
+    w3.eth.get_block("finalized")
+    first_cycle = time.perf_counter()
+
+    return {
+        "import": imported - started,
+        "web3": web3_created - imported,
+        "bot": bot_created - web3_created,
+        "first_cycle": first_cycle - bot_created,
+        "total": first_cycle - started,
+    }
+
+
+def run_sample(rpc_url: str, cold: bool) -> dict[str, float]:
+    env = {
+        **os.environ,
+        "WEB3_RPC_ENDPOINTS": rpc_url,
+        "LOG_LEVEL": "WARNING",
+    }
+    if cold:
+        env["ADDRESS_CACHE_TTL_SECONDS"] = "0"
+
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--single"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@click.command()
+@click.option("--rpc-url", envvar="WEB3_RPC_ENDPOINTS", help="EL RPC endpoint(s)")
+@click.option("--repeat", type=int, default=5, help="Number of fresh-process samples")
+@click.option("--cold", is_flag=True, help="Disable the on-disk address cache")
+@click.option("--single", is_flag=True, hidden=True)
+def cli(rpc_url: str, repeat: int, cold: bool, single: bool):
+    """Report import-to-first-cycle time of the bot."""
+    if single:
+        click.echo(json.dumps(measure_once()))
+        return
+
+    if not rpc_url:
+        raise click.UsageError("--rpc-url or WEB3_RPC_ENDPOINTS is required")
+
+    samples = [run_sample(rpc_url, cold) for _ in range(repeat)]
+
+    click.echo(f"Startup benchmark ({repeat} samples, cold={cold})")
+    for phase in (*PHASES, "total"):
+        values = [sample[phase] for sample in samples]
+        click.echo(
+            f"  {phase:<12} median {statistics.median(values) * 1000:9.1f} ms"
+            f"   min {min(values) * 1000:9.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    cli()
@@ -1,34 +1,47 @@
-from scripts.kapi_client import Key, KeysAPIClient
+from eth_typing import HexStr
+
+from scripts.kapi_client import KapiKey, Key, KeysAPIClient
 from src.utils.cl_client import CLClient
 
 
 def build_exit_request(
     kapi_client: KeysAPIClient, cl_client: CLClient, validator_indexes: list[int]
 ) -> list[Key]:
-    all_validators = cl_client.get_validators_by_indexes()
-    keys = kapi_client.get_keys()
+    """
+    Exit request keys of the validators, in the order of `validator_indexes`.
+
+    Only the requested validators are fetched from the CL, and their pubkeys are looked
+    up in a dict of KAPI keys, so the work grows with the number of requested validators
+    and Lido keys instead of their product.
+    """
+    validators = cl_client.get_validators_by_indexes(validator_indexes)
+    keys_by_pubkey: dict[str, KapiKey] = {}
+    for key in kapi_client.get_keys():
+        keys_by_pubkey.setdefault(_normalize(key.validator_pub_key), key)
 
     result = []
 
     for validator_index in validator_indexes:
-        if validator_index not in all_validators:
+        if validator_index not in validators:
             raise ValueError(f"Validator index {validator_index} not found in CL")
 
-        pub_key = all_validators[validator_index]
-
-        for key in keys:
-            if pub_key == key.validator_pub_key:
-                result.append(
-                    Key(
-                        module_id=key.module_id,
-                        no_id=key.no_id,
-                        validator_index=validator_index,
-                        validator_pub_key=key.validator_pub_key,
-                        pub_key_index=key.pub_key_index,
-                    )
-                )
-                break
-        else:
+        pub_key = validators[validator_index]
+        key = keys_by_pubkey.get(_normalize(pub_key))
+        if key is None:
             raise ValueError(f"Validator pubkey {pub_key} not found in KAPI")
 
+        result.append(
+            Key(
+                module_id=key.module_id,
+                no_id=key.no_id,
+                validator_index=validator_index,
+                validator_pub_key=key.validator_pub_key,
+                pub_key_index=key.pub_key_index,
+            )
+        )
+
     return result
+
+
+def _normalize(pub_key: HexStr) -> str:
+    return pub_key.lower()
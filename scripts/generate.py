@@ -27,6 +27,8 @@ Environment Variables (optional):
 You can set default URLs via environment variables:
 - KAPI_URL: Default Keys API URL (default: https://keys-api.lido.fi)
 - CL_URL: Default Consensus Layer URL (default: http://localhost:5052)
+- VALIDATOR_REGISTRY_PATH: Validator registry snapshot (same as --registry). Validators
+  are looked up in the memory-mapped snapshot instead of downloading the whole registry
 
 Example:
    export KAPI_URL=https://keys-api.lido.fi
@@ -71,6 +73,8 @@ The script will fail with an error message if:
 """
 
 import sys
+from pathlib import Path
+from typing import Optional
 
 import click
 
@@ -90,12 +94,26 @@ class AppContext:
         cl_client: Consensus Layer client instance
     """
 
-    def __init__(self, debug: bool, kapi_url: str, cl_url: str):
+    def __init__(
+        self,
+        debug: bool,
+        kapi_url: str,
+        cl_url: str,
+        registry_path: Optional[str] = None,
+    ):
         self.debug = debug
         self.kapi = KeysAPIClient(kapi_url)
         self.cl_client = CLClient(cl_url)
         self.log(f"Connected to KAPI: {kapi_url}")
         self.log(f"Connected to CL: {cl_url}")
+        if registry_path:
+            # Imported on use, it sets up the bot metrics
+            from src.utils.validator_registry import ValidatorRegistry
+
+            registry = ValidatorRegistry(Path(registry_path))
+            registry.refresh(self.cl_client)
+            self.cl_client.registry = registry
+            self.log(f"Validator registry snapshot at epoch {registry.epoch}")
 
     def log(self, msg: str) -> None:
         """Print debug message if debug mode is enabled."""
@@ -124,8 +142,17 @@ class AppContext:
     default="http://localhost:5052",
     help="Consensus Layer (Beacon) API URL (default: http://localhost:5052, or CL_URL env var)",
 )
+@click.option(
+    "--registry",
+    "registry_path",
+    type=str,
+    envvar="VALIDATOR_REGISTRY_PATH",
+    default=None,
+    help="Validator registry snapshot to look validators up in, built or refreshed on start "
+    "(for example ./data/validator_registry, or VALIDATOR_REGISTRY_PATH env var)",
+)
 @click.pass_context
-def cli(ctx, debug: bool, kapi_url: str, cl_url: str):
+def cli(ctx, debug: bool, kapi_url: str, cl_url: str, registry_path: Optional[str]):
     """
     Generate validator exit request calldata for Lido protocol.
 
@@ -135,7 +162,9 @@ def cli(ctx, debug: bool, kapi_url: str, cl_url: str):
     Use 'poetry run python scripts/generate.py COMMAND --help' for command-specific help.
     """
     try:
-        ctx.obj = AppContext(debug=debug, kapi_url=kapi_url, cl_url=cl_url)
+        ctx.obj = AppContext(
+            debug=debug, kapi_url=kapi_url, cl_url=cl_url, registry_path=registry_path
+        )
         ctx.obj.log("CLI initialized successfully")
     except Exception as e:
         click.secho(f"Error initializing CLI: {e}", fg="red", err=True)
@@ -0,0 +1,85 @@
+"""
+On-disk cache of contract addresses resolved through LidoLocator.
+
+Addresses are stored together with the chain id and the locator address they were
+resolved for, so a cache file from another network or deployment is never used.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+import structlog
+from eth_typing import ChecksumAddress
+from web3 import Web3
+
+logger = structlog.get_logger(__name__)
+
+# Contracts resolved through LidoLocator, a cache without any of them is not used
+ADDRESS_KEYS = ("validatorsExitBusOracle", "stakingRouter", "withdrawalVault")
+
+
+def load_addresses(
+    path: Path, chain_id: int, locator: ChecksumAddress, max_age_seconds: int
+) -> Optional[dict[str, ChecksumAddress]]:
+    """
+    Load cached addresses.
+
+    Returns None if the cache is missing, expired, incomplete or was resolved for another
+    chain or locator.
+    """
+    try:
+        with open(path) as cache_file:
+            cache = json.load(cache_file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as error:
+        logger.warning({"msg": "Failed to read address cache.", "error": str(error)})
+        return None
+
+    if not isinstance(cache, dict):
+        logger.warning({"msg": "Address cache is malformed, ignoring."})
+        return None
+
+    if cache.get("chain_id") != chain_id or cache.get("locator") != locator:
+        logger.info({"msg": "Address cache belongs to another deployment, ignoring."})
+        return None
+
+    if time.time() - cache.get("resolved_at", 0) > max_age_seconds:
+        logger.info({"msg": "Address cache expired, ignoring."})
+        return None
+
+    addresses = cache.get("addresses")
+    if not isinstance(addresses, dict) or not all(
+        isinstance(addresses.get(key), str) and Web3.is_checksum_address(addresses[key])
+        for key in ADDRESS_KEYS
+    ):
+        logger.warning({"msg": "Address cache is incomplete, ignoring."})
+        return None
+
+    return {key: ChecksumAddress(addresses[key]) for key in ADDRESS_KEYS}
+
+
+def save_addresses(
+    path: Path,
+    chain_id: int,
+    locator: ChecksumAddress,
+    addresses: dict[str, ChecksumAddress],
+) -> None:
+    """Atomically write resolved addresses to the cache file."""
+    cache = {
+        "chain_id": chain_id,
+        "locator": locator,
+        "resolved_at": int(time.time()),
+        "addresses": addresses,
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as cache_file:
+            json.dump(cache, cache_file)
+        os.replace(tmp_path, path)
+    except OSError as error:
+        logger.warning({"msg": "Failed to write address cache.", "error": str(error)})
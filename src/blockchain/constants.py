@@ -2,3 +2,6 @@
 
 # Ethereum slot time in seconds (12 seconds for mainnet and most testnets)
 SLOT_TIME = 12
+
+# Slots in a beacon chain epoch
+SLOTS_PER_EPOCH = 32
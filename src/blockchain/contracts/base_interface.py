@@ -1,16 +1,23 @@
 import json
+from functools import cache
+from pathlib import Path
 from typing import Any, Optional
 
 from web3 import Web3
 from web3.contract.contract import Contract
 
+# Repository root, so ABIs are found regardless of the working directory
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+
 
 class ContractInterface(Contract):
     abi_path: str
 
     @staticmethod
-    def load_abi(abi_file: str) -> dict:
-        with open(abi_file) as abi_json:
+    @cache
+    def load_abi(abi_file: str) -> list[dict[str, Any]]:
+        """Read and parse ABI file. Each file is parsed once per process."""
+        with open(PROJECT_ROOT / abi_file) as abi_json:
             return json.load(abi_json)
 
     @classmethod
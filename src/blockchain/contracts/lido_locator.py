@@ -54,3 +54,39 @@ class LidoLocatorContract(ContractInterface):
             }
         )
         return response
+
+    def core_components(
+        self, block_identifier: BlockIdentifier = "latest"
+    ) -> dict[str, ChecksumAddress]:
+        """
+        Get core protocol addresses in a single call.
+
+        Returns:
+            Dictionary with keys: elRewardsVault, oracleReportSanityChecker,
+            stakingRouter, treasury, withdrawalQueue, withdrawalVault
+        """
+        (
+            el_rewards_vault,
+            oracle_report_sanity_checker,
+            staking_router,
+            treasury,
+            withdrawal_queue,
+            withdrawal_vault,
+        ) = self.functions.coreComponents().call(block_identifier=block_identifier)
+
+        response = {
+            "elRewardsVault": el_rewards_vault,
+            "oracleReportSanityChecker": oracle_report_sanity_checker,
+            "stakingRouter": staking_router,
+            "treasury": treasury,
+            "withdrawalQueue": withdrawal_queue,
+            "withdrawalVault": withdrawal_vault,
+        }
+        logger.info(
+            {
+                "msg": "Call `coreComponents()`.",
+                "value": response,
+                "block_identifier": repr(block_identifier),
+            }
+        )
+        return response
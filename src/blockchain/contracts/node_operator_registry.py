@@ -5,6 +5,7 @@ from eth_typing import HexStr
 from web3.types import BlockIdentifier
 
 from src.blockchain.contracts.base_interface import ContractInterface
+from src.utils.logs import log_sampled
 
 logger = structlog.get_logger(__name__)
 
@@ -20,13 +21,14 @@ class NodeOperatorRegistryContract(ContractInterface):
         response = self.functions.isValidatorExitingKeyReported(pubkey_bytes).call(
             block_identifier=block_identifier
         )
-        logger.info(
-            {
-                "msg": "Call `isValidatorExitingKeyReported()`.",
-                "value": response,
-                "block_identifier": repr(block_identifier),
-            }
-        )
+        if log_sampled():
+            logger.info(
+                {
+                    "msg": "Call `isValidatorExitingKeyReported()`.",
+                    "value": response,
+                    "block_identifier": repr(block_identifier),
+                }
+            )
         return response
 
     def get_node_operator(
@@ -25,3 +25,27 @@ class StakingRouterContract(ContractInterface):
         )
         (_, address, _, _, _, _, _, _, _, _, _, _, _) = response
         return address
+
+    def get_staking_modules_addresses(
+        self, block_identifier: BlockIdentifier = "latest"
+    ) -> dict[int, ChecksumAddress]:
+        """
+        Get addresses of all staking modules in a single call.
+
+        Returns:
+            Mapping of staking module id -> staking module address
+        """
+        response = self.functions.getAllStakingModuleDigests().call(
+            block_identifier=block_identifier
+        )
+        # Each digest is (nodeOperatorsCount, activeNodeOperatorsCount, state, summary)
+        # where state is the StakingModule struct starting with (id, stakingModuleAddress, ...)
+        modules = {int(state[0]): state[1] for _, _, state, _ in response}
+        logger.info(
+            {
+                "msg": "Call `getAllStakingModuleDigests()`.",
+                "value": modules,
+                "block_identifier": repr(block_identifier),
+            }
+        )
+        return modules
@@ -0,0 +1,230 @@
+"""
+Persistent cache of immutable chain data.
+
+Transactions, receipts, block receipts and logs of finalized blocks never change, so
+they are kept in an SQLite file between restarts and the lookback rescan after a
+restart is served mostly from disk. The cache is bounded by size, least recently used entries are
+evicted first.
+
+Keys are not tied to a chain, so the file stores the chain id it was filled for and is
+emptied when it is opened for another chain.
+
+The middleware only learns which block is finalized from eth_getBlockByNumber
+("finalized") responses, which the main loop requests at the start of every cycle.
+Nothing is cached before that.
+"""
+
+import json
+import sqlite3
+import threading
+from functools import partial
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Callable, Optional, Union, cast
+
+import structlog
+from web3 import Web3
+from web3.middleware.base import Middleware, Web3Middleware
+from web3.types import RPCEndpoint, RPCResponse
+
+from src.metrics.metrics import (
+    DISK_CACHE_EVICTIONS,
+    DISK_CACHE_REQUESTS,
+    DISK_CACHE_SIZE,
+)
+
+logger = structlog.get_logger(__name__)
+
+# Share of max size kept after eviction, so eviction doesn't run on every insert
+EVICTION_TARGET = 0.9
+
+
+class DiskCache:
+    """Size-bounded LRU key-value store in an SQLite file, for the data of one chain."""
+
+    def __init__(self, path: Path, max_bytes: int, chain_id: int):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+            "size INTEGER NOT NULL, used_at INTEGER NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS entries_used_at ON entries (used_at)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._check_chain_id(chain_id)
+        # used_at is a use counter rather than a timestamp, so the order is exact
+        self.size, self._clock = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0), COALESCE(MAX(used_at), 0) FROM entries"
+        ).fetchone()
+        DISK_CACHE_SIZE.set(self.size)
+        logger.info(
+            {"msg": "Disk cache opened", "path": str(path), "size_bytes": self.size}
+        )
+
+    def _check_chain_id(self, chain_id: int) -> None:
+        row = self._db.execute(
+            "SELECT value FROM meta WHERE key = 'chain_id'"
+        ).fetchone()
+        if row is not None and row[0] == str(chain_id):
+            return
+        if row is not None:
+            logger.info(
+                {
+                    "msg": "Disk cache belongs to another chain, clearing it.",
+                    "cache_chain_id": row[0],
+                    "chain_id": chain_id,
+                }
+            )
+        self._db.execute("DELETE FROM entries")
+        self._db.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('chain_id', ?)",
+            (str(chain_id),),
+        )
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._clock += 1
+            self._db.execute(
+                "UPDATE entries SET used_at = ? WHERE key = ?", (self._clock, key)
+            )
+            return row[0]
+
+    def set(self, key: str, value: bytes) -> None:
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._clock += 1
+            previous = self._db.execute(
+                "SELECT size FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, used_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, size, self._clock),
+            )
+            self.size += size - (previous[0] if previous else 0)
+            if self.size > self.max_bytes:
+                self._evict()
+            DISK_CACHE_SIZE.set(self.size)
+
+    def _evict(self) -> None:
+        target = self.max_bytes * EVICTION_TARGET
+        evicted = []
+        for key, size in self._db.execute(
+            "SELECT key, size FROM entries ORDER BY used_at"
+        ).fetchall():
+            if self.size <= target:
+                break
+            evicted.append((key,))
+            self.size -= size
+        self._db.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        DISK_CACHE_EVICTIONS.inc(len(evicted))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def _block_number(value: Any) -> Optional[int]:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.startswith("0x"):
+        return int(value, 16)
+    return None
+
+
+class DiskCacheMiddleware(Web3Middleware):
+    """Serves finalized transactions, receipts and logs from the disk cache."""
+
+    def __init__(self, w3: Union[Web3, Any], cache: DiskCache):
+        super().__init__(w3)
+        self.cache = cache
+        self.finalized_block: Optional[int] = None
+
+    @classmethod
+    def build(cls, cache: DiskCache) -> Middleware:
+        """Middleware for the onion, instantiated by web3 with the Web3 instance."""
+        return cast(Middleware, partial(cls, cache=cache))
+
+    def _cache_key(self, method: RPCEndpoint, params: Any) -> Optional[str]:
+        if method in ("eth_getTransactionByHash", "eth_getTransactionReceipt"):
+            return f"{method}:{params[0]}"
+        if method == "eth_getBlockReceipts" and self.finalized_block is not None:
+            block = _block_number(params[0])
+            if block is None or block > self.finalized_block:
+                return None
+            return f"{method}:{block}"
+        if method == "eth_getLogs" and self.finalized_block is not None:
+            query = params[0]
+            from_block = _block_number(query.get("fromBlock"))
+            to_block = _block_number(query.get("toBlock"))
+            if from_block is None or to_block is None:
+                return None
+            if to_block > self.finalized_block:
+                return None
+            digest = sha256(json.dumps(query, sort_keys=True).encode()).hexdigest()
+            return f"{method}:{digest}"
+        return None
+
+    def _is_final(self, method: RPCEndpoint, result: Any) -> bool:
+        if self.finalized_block is None or result is None:
+            return False
+        if method in ("eth_getLogs", "eth_getBlockReceipts"):
+            return True
+        block = _block_number(result.get("blockNumber"))
+        return block is not None and block <= self.finalized_block
+
+    def _observe(self, method: RPCEndpoint, params: Any, response: RPCResponse):
+        result = response.get("result")
+        if (
+            method == "eth_getBlockByNumber"
+            and params
+            and params[0] == "finalized"
+            and result
+        ):
+            self.finalized_block = _block_number(result.get("number"))
+
+    def wrap_make_request(
+        self, make_request: Callable[[RPCEndpoint, Any], RPCResponse]
+    ) -> Callable[[RPCEndpoint, Any], RPCResponse]:
+        def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+            key = self._cache_key(method, params)
+            if key is None:
+                response = make_request(method, params)
+                self._observe(method, params, response)
+                return response
+
+            cached = self.cache.get(key)
+            if cached is not None:
+                DISK_CACHE_REQUESTS.labels(method=method, result="hit").inc()
+                return RPCResponse(
+                    {"jsonrpc": "2.0", "id": 0, "result": json.loads(cached)}
+                )
+
+            DISK_CACHE_REQUESTS.labels(method=method, result="miss").inc()
+            response = make_request(method, params)
+            result = response.get("result")
+            if "error" not in response and self._is_final(method, result):
+                self.cache.set(key, json.dumps(result).encode())
+            return response
+
+        return middleware
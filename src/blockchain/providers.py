@@ -0,0 +1,311 @@
+import random
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import structlog
+from web3 import HTTPProvider
+from web3.providers.base import JSONBaseProvider
+from web3.providers.rpc.utils import check_if_retry_on_failure
+from web3.types import RPCEndpoint, RPCResponse
+from web3_multi_provider import FallbackProvider
+from web3_multi_provider.exceptions import NoActiveProviderError
+from web3_multi_provider.util import sanitize_poa_response
+
+from src.metrics.cycle_stats import count_rpc_request, endpoint_label
+from src.metrics.metrics import (
+    EL_ENDPOINT_LATENCY,
+    EL_ENDPOINT_REQUESTS,
+    RPC_RETRIES,
+    RPC_THROTTLED,
+)
+from src.utils.cassette import Cassette
+from src.utils.rate_limit import (
+    RETRY_STATUS_CODES,
+    TokenBucket,
+    retry_delay,
+    shared_bucket,
+    wait_for_bucket,
+)
+
+logger = structlog.get_logger(__name__)
+
+# Calls without side effects whose result doesn't depend on the endpoint's pending
+# state. Everything else, nonce, fee and send calls included, is pinned to one endpoint.
+READ_METHODS = frozenset(
+    {
+        "eth_call",
+        "eth_getLogs",
+        "eth_getTransactionByHash",
+        "eth_getTransactionReceipt",
+        "eth_getBlockReceipts",
+        "eth_getBalance",
+        "eth_getCode",
+    }
+)
+
+# Weight of the last request in the endpoint latency average
+LATENCY_EWMA_ALPHA = 0.2
+# Failed endpoints are tried last for this long
+ENDPOINT_COOLDOWN_SECONDS = 30
+
+
+class InstrumentedFallbackProvider(FallbackProvider):
+    """
+    FallbackProvider that counts requests per method and endpoint for the current bot cycle.
+
+    If a recording cassette is passed, every request is written to it with its response.
+    """
+
+    def __init__(self, *args: Any, cassette: Optional[Cassette] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.cassette = cassette
+        # Endpoint used by the last request of the current thread
+        self._local = threading.local()
+        # web3 validates the chain id of every eth_call. Its own request cache is per
+        # thread and is switched off while it validates other cached responses, so
+        # concurrent workers would request the chain id again on most calls
+        self._chain_id_response: Optional[RPCResponse] = None
+
+    def get_providers(self) -> Iterable[HTTPProvider]:
+        for provider in super().get_providers():
+            self._local.endpoint = str(provider.endpoint_uri)
+            yield provider
+
+    @property
+    def current_endpoint(self) -> str:
+        """Endpoint used by the last request of the current thread."""
+        return getattr(self._local, "endpoint", str(self.endpoint_uri))
+
+    def _request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        return super().make_request(method, params)
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        if method == "eth_chainId" and self._chain_id_response is not None:
+            return self._chain_id_response
+        started = time.perf_counter()
+        response = self._request(method, params)
+        if method == "eth_chainId" and "result" in response:
+            self._chain_id_response = response
+        if self.cassette is not None:
+            self.cassette.record_el(
+                method, params, response, time.perf_counter() - started
+            )
+        count_rpc_request("el", method, endpoint_label(self._local.endpoint))
+        return response
+
+
+@dataclass
+class _Endpoint:
+    provider: HTTPProvider
+    label: str
+    weight: float
+    bucket: Optional[TokenBucket]
+    # Average request duration, None until the first response
+    latency: Optional[float] = None
+    in_flight: int = 0
+    down_until: float = 0.0
+
+    @property
+    def uri(self) -> str:
+        return str(self.provider.endpoint_uri)
+
+    def is_down(self, now: float) -> bool:
+        return self.down_until > now
+
+    def score(self) -> float:
+        """Expected cost of the next request, lower is better."""
+        return (self.latency or 0.0) * (self.in_flight + 1) / self.weight
+
+
+class RoutingProvider(InstrumentedFallbackProvider):
+    """
+    Provider spreading read-only calls across all endpoints.
+
+    Every read goes to an endpoint picked at random with probability proportional to
+    weight / average latency, so faster and heavier endpoints get more traffic, but
+    none stays idle. Other calls are pinned to the first healthy endpoint, so nonce,
+    fee and send requests see the same node state. An endpoint over its rate limit is
+    skipped for reads while another one has capacity, pinned calls wait for it.
+
+    On errors the request fails over to the remaining endpoints, best scored first.
+    An endpoint that throttled the request (429, 5xx) is tried last until its backoff
+    passes, other failures put it aside for ENDPOINT_COOLDOWN_SECONDS. Once all
+    endpoints failed, idempotent calls are retried with jittered backoff. These
+    retries replace web3's own ones, which don't respect the rate limit.
+    """
+
+    def __init__(
+        self,
+        endpoint_urls: list[str],
+        *args: Any,
+        weights: Optional[list[float]] = None,
+        rate_limits: Optional[list[float]] = None,
+        max_retries: int = 0,
+        retry_backoff_seconds: float = 0.5,
+        **kwargs: Any,
+    ):
+        kwargs.setdefault("exception_retry_configuration", None)
+        super().__init__(endpoint_urls, *args, **kwargs)
+        weights = weights or []
+        rate_limits = rate_limits or []
+        self._endpoints = [
+            _Endpoint(
+                provider=provider,
+                label=endpoint_label(str(provider.endpoint_uri)),
+                weight=weights[i] if i < len(weights) and weights[i] > 0 else 1.0,
+                bucket=shared_bucket(
+                    str(provider.endpoint_uri),
+                    rate_limits[i] if i < len(rate_limits) else 0,
+                ),
+            )
+            for i, provider in enumerate(self._providers)
+        ]
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    def _pinned_order(self, now: float) -> list[_Endpoint]:
+        # Stable order keeps pinned calls on the same endpoint while it is healthy
+        return sorted(self._endpoints, key=lambda e: e.is_down(now))
+
+    def _read_order(self, now: float) -> list[_Endpoint]:
+        healthy = [e for e in self._endpoints if not e.is_down(now)]
+        by_score = sorted(healthy, key=_Endpoint.score) + sorted(
+            (e for e in self._endpoints if e.is_down(now)), key=lambda e: e.down_until
+        )
+        if len(healthy) < 2:
+            return by_score
+
+        # Unmeasured endpoints are explored first
+        unmeasured = [e for e in healthy if e.latency is None]
+        if unmeasured:
+            first = unmeasured[0]
+        else:
+            first = self._random.choices(
+                healthy, weights=[1 / max(e.score(), 1e-6) for e in healthy]
+            )[0]
+
+        # Skip endpoints over the rate limit while another one has capacity
+        order = [first] + [e for e in by_score if e is not first]
+        for i, endpoint in enumerate(order):
+            if endpoint.bucket is None or endpoint.bucket.wait_time() == 0:
+                return [endpoint] + order[:i] + order[i + 1 :]
+        return sorted(order, key=lambda e: e.bucket.wait_time() if e.bucket else 0.0)
+
+    def _send(
+        self, endpoint: _Endpoint, route: str, method: RPCEndpoint, params: Any
+    ) -> RPCResponse:
+        wait_for_bucket(endpoint.bucket, "el", endpoint.label)
+        self._local.endpoint = endpoint.uri
+        with self._lock:
+            endpoint.in_flight += 1
+        started = time.perf_counter()
+        try:
+            response = endpoint.provider.make_request(method, params)
+        except Exception:
+            with self._lock:
+                endpoint.in_flight -= 1
+            EL_ENDPOINT_REQUESTS.labels(
+                endpoint=endpoint.label, route=route, result="error"
+            ).inc()
+            raise
+
+        duration = time.perf_counter() - started
+        with self._lock:
+            endpoint.in_flight -= 1
+            endpoint.latency = (
+                duration
+                if endpoint.latency is None
+                else endpoint.latency
+                + LATENCY_EWMA_ALPHA * (duration - endpoint.latency)
+            )
+        EL_ENDPOINT_REQUESTS.labels(
+            endpoint=endpoint.label, route=route, result="success"
+        ).inc()
+        EL_ENDPOINT_LATENCY.labels(endpoint=endpoint.label).set(endpoint.latency)
+        return response
+
+    def _put_aside(self, endpoint: _Endpoint, error: Exception, attempt: int) -> None:
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+        if status in RETRY_STATUS_CODES:
+            RPC_THROTTLED.labels(
+                layer="el", endpoint=endpoint.label, status=str(status)
+            ).inc()
+            cooldown = retry_delay(
+                attempt,
+                self.retry_backoff_seconds,
+                response.headers.get("Retry-After") if response is not None else None,
+            )
+        else:
+            cooldown = ENDPOINT_COOLDOWN_SECONDS
+        with self._lock:
+            endpoint.down_until = max(endpoint.down_until, time.monotonic() + cooldown)
+        logger.warning(
+            {
+                "msg": "EL endpoint not responding, trying the next one.",
+                "endpoint": endpoint.label,
+                "status": status,
+                "error": str(error).replace(endpoint.uri, "****"),
+            }
+        )
+
+    def _request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        route = "read" if method in READ_METHODS else "pinned"
+        retries = self.max_retries if check_if_retry_on_failure(method) else 0
+        exceptions: list[Exception] = []
+
+        for attempt in range(retries + 1):
+            if attempt:
+                delay = retry_delay(attempt - 1, self.retry_backoff_seconds)
+                RPC_RETRIES.labels(layer="el").inc()
+                logger.warning(
+                    {
+                        "msg": "All EL endpoints failed, retrying.",
+                        "method": method,
+                        "attempt": attempt,
+                        "delay": round(delay, 3),
+                    }
+                )
+                time.sleep(delay)
+
+            with self._lock:
+                now = time.monotonic()
+                order = (
+                    self._read_order(now)
+                    if route == "read"
+                    else self._pinned_order(now)
+                )
+            for endpoint in order:
+                try:
+                    response = self._send(endpoint, route, method, params)
+                except Exception as error:
+                    exceptions.append(error)
+                    self._put_aside(endpoint, error, attempt)
+                    continue
+                sanitize_poa_response(method, response)
+                return response
+
+        raise NoActiveProviderError.from_exceptions(
+            f"No active provider available in {self.__class__.__name__}.", exceptions
+        )
+
+
+class ReplayProvider(JSONBaseProvider):
+    """Provider serving JSON-RPC responses recorded in a cassette, without network access."""
+
+    def __init__(self, cassette: Cassette, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        response = self.cassette.replay_el(method, params)
+        count_rpc_request("el", method, "replay")
+        return response
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
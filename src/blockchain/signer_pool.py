@@ -0,0 +1,194 @@
+"""
+Pool of accounts signing trigger_exits transactions.
+
+Transactions of one account are included in nonce order, so with a single account a
+transaction stuck in the mempool delays every later trigger. Independent transactions
+are spread across the accounts of the pool instead. Every account sends one transaction
+at a time, and accounts low on funds or with a stuck transaction are skipped until they
+are topped up or the transaction is included.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Literal, Optional, get_args
+
+import structlog
+from eth_account.signers.local import LocalAccount
+from eth_typing import ChecksumAddress
+from web3 import Web3
+from web3.types import Wei
+
+from src.metrics.metrics import ACCOUNT_BALANCE, SIGNERS
+
+logger = structlog.get_logger(__name__)
+
+SignerState = Literal["available", "busy", "stuck", "low_funds"]
+
+
+@dataclass
+class Signer:
+    account: LocalAccount
+    balance: Wei = Wei(0)
+    # Nonce of the next transaction, None until read from the chain
+    nonce: Optional[int] = None
+    busy: bool = False
+    low_funds: bool = False
+    # Nonce of a sent transaction not included in time
+    stuck_nonce: Optional[int] = None
+
+    @property
+    def address(self) -> ChecksumAddress:
+        return self.account.address
+
+    @property
+    def state(self) -> SignerState:
+        if self.busy:
+            return "busy"
+        if self.stuck_nonce is not None:
+            return "stuck"
+        if self.low_funds:
+            return "low_funds"
+        return "available"
+
+
+class SignerPool:
+    """
+    Accounts available to send transactions.
+
+    Args:
+        w3: Web3 instance to read nonces and balances
+        accounts: Signer accounts, preferred in the given order
+        min_balance: Balance an account keeps above the value of a transaction
+    """
+
+    # Longest wait for a busy signer, well above the inclusion timeout of a trigger
+    WAIT_TIMEOUT_SECONDS = 300
+
+    def __init__(self, w3: Web3, accounts: list[LocalAccount], min_balance: Wei):
+        self.w3 = w3
+        self.min_balance = min_balance
+        self.signers = [Signer(account) for account in accounts]
+        self._condition = threading.Condition()
+        self._export()
+
+    def __len__(self) -> int:
+        return len(self.signers)
+
+    def acquire(self, value: Wei) -> Optional[Signer]:
+        """
+        Take an idle account able to pay `value`, waiting while usable accounts are busy.
+
+        The nonce of the returned signer is the nonce of its next transaction. The signer
+        must be given back with `release`.
+
+        Returns:
+            Signer to send the transaction from, None if no account is usable or none
+            was given back within WAIT_TIMEOUT_SECONDS
+        """
+        tried: set[ChecksumAddress] = set()
+        while True:
+            with self._condition:
+                candidates = [s for s in self.signers if s.address not in tried]
+                if not candidates:
+                    return None
+                idle = [s for s in candidates if not s.busy]
+                if not idle:
+                    if not self._condition.wait(self.WAIT_TIMEOUT_SECONDS):
+                        logger.warning(
+                            {
+                                "msg": "Timed out waiting for a free signer",
+                                "timeout": self.WAIT_TIMEOUT_SECONDS,
+                            }
+                        )
+                        return None
+                    continue
+                signer = idle[0]
+                signer.busy = True
+                self._export()
+
+            tried.add(signer.address)
+            # Chain reads are made outside the lock, other senders aren't blocked
+            try:
+                usable = self._refresh(signer, value)
+            except Exception:
+                self.release(signer)
+                raise
+            if usable:
+                return signer
+            self.release(signer)
+
+    def release(
+        self, signer: Signer, sent_nonce: Optional[int] = None, included: bool = False
+    ) -> None:
+        """
+        Give the signer back.
+
+        Args:
+            signer: Signer taken with `acquire`
+            sent_nonce: Nonce of the sent transaction, None if nothing was sent
+            included: Whether the sent transaction was included
+        """
+        with self._condition:
+            if sent_nonce is not None:
+                signer.nonce = sent_nonce + 1
+                if not included:
+                    signer.stuck_nonce = sent_nonce
+                    logger.warning(
+                        {
+                            "msg": "Signer has a stuck transaction, routing around it",
+                            "address": signer.address,
+                            "nonce": sent_nonce,
+                        }
+                    )
+            signer.busy = False
+            self._export()
+            self._condition.notify()
+
+    def _refresh(self, signer: Signer, value: Wei) -> bool:
+        """Read the signer state from the chain, False if it can't send now."""
+        if signer.stuck_nonce is not None:
+            included_count = self.w3.eth.get_transaction_count(signer.address, "latest")
+            if included_count <= signer.stuck_nonce:
+                pending_count = self.w3.eth.get_transaction_count(
+                    signer.address, "pending"
+                )
+                if pending_count > signer.stuck_nonce:
+                    return False
+                # Dropped from the mempool, the nonce is free again
+                signer.nonce = None
+            logger.info(
+                {
+                    "msg": "Stuck transaction of signer resolved",
+                    "address": signer.address,
+                    "nonce": signer.stuck_nonce,
+                    "included": included_count > signer.stuck_nonce,
+                }
+            )
+            signer.stuck_nonce = None
+
+        signer.balance = self.w3.eth.get_balance(signer.address)
+        ACCOUNT_BALANCE.labels(signer.address, self.w3.eth.chain_id).set(signer.balance)
+        signer.low_funds = signer.balance < self.min_balance + value
+        if signer.low_funds:
+            logger.warning(
+                {
+                    "msg": "Signer balance is low, routing around it",
+                    "address": signer.address,
+                    "balance": signer.balance,
+                    "required": self.min_balance + value,
+                }
+            )
+            return False
+
+        # A lagging node may not see the last sent transaction yet
+        pending_count = self.w3.eth.get_transaction_count(signer.address, "pending")
+        signer.nonce = max(signer.nonce or 0, pending_count)
+        return True
+
+    def _export(self) -> None:
+        """Set the signer state gauge. Called with the lock held."""
+        counts: dict[SignerState, int] = dict.fromkeys(get_args(SignerState), 0)
+        for signer in self.signers:
+            counts[signer.state] += 1
+        for state, count in counts.items():
+            SIGNERS.labels(state=state).set(count)
@@ -1,9 +1,11 @@
 from web3 import Web3 as _Web3
 
 from src.blockchain.web3_extentions.lido_contracts import LidoContracts
+from src.blockchain.web3_extentions.receipts import ReceiptUtils
 from src.blockchain.web3_extentions.transaction import TransactionUtils
 
 
 class Web3(_Web3):
     lido: LidoContracts
     transaction: TransactionUtils
+    receipts: ReceiptUtils
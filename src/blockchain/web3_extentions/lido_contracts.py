@@ -1,10 +1,13 @@
-from typing import cast
+import time
+from typing import Optional, cast
 
 import structlog
+from eth_typing import ChecksumAddress
 from web3 import Web3
 from web3.module import Module
 
 from src import variables
+from src.blockchain.address_cache import load_addresses, save_addresses
 from src.blockchain.contracts.lido_locator import LidoLocatorContract
 from src.blockchain.contracts.node_operator_registry import NodeOperatorRegistryContract
 from src.blockchain.contracts.staking_router import StakingRouterContract
@@ -19,7 +22,10 @@ logger = structlog.get_logger(__name__)
 class LidoContracts(Module):
     def __init__(self, w3: Web3):
         super().__init__(w3)
+        # Contract instances are created lazily, on the first lookup of a module
         self.node_operator_registry_map: dict[int, NodeOperatorRegistryContract] = {}
+        self._staking_modules: dict[int, ChecksumAddress] = {}
+        self._staking_modules_updated_at: Optional[float] = None
         self._load_contracts()
 
     def _load_contracts(self):
@@ -31,17 +37,19 @@ class LidoContracts(Module):
             ),
         )
 
+        addresses = self._resolve_addresses()
+
         self.validator_exit_bus_oracle: ValidatorExitBusOracleContract = cast(
             ValidatorExitBusOracleContract,
             self.w3.eth.contract(
-                address=self.lido_locator.validator_exit_bus_oracle(),
+                address=addresses["validatorsExitBusOracle"],
                 ContractFactoryClass=ValidatorExitBusOracleContract,
             ),
         )
         self.staking_router: StakingRouterContract = cast(
             StakingRouterContract,
             self.w3.eth.contract(
-                address=self.lido_locator.staking_router(),
+                address=addresses["stakingRouter"],
                 ContractFactoryClass=StakingRouterContract,
             ),
         )
@@ -49,16 +57,97 @@ class LidoContracts(Module):
         self.withdrawal_vault: WithdrawalVaultContract = cast(
             WithdrawalVaultContract,
             self.w3.eth.contract(
-                address=self.lido_locator.withdrawal_vault(),
+                address=addresses["withdrawalVault"],
                 ContractFactoryClass=WithdrawalVaultContract,
             ),
         )
 
-        for module_id in variables.MODULES_WHITELIST:
-            self.node_operator_registry_map[module_id] = cast(
+    def _resolve_addresses(self) -> dict[str, ChecksumAddress]:
+        """
+        Resolve protocol contract addresses through LidoLocator.
+
+        Uses the on-disk address cache if it was written for the same chain and locator,
+        otherwise resolves addresses with two calls (coreComponents and validatorsExitBusOracle).
+        """
+        cache_path = variables.DATA_DIR / "addresses.json"
+        use_cache = variables.ADDRESS_CACHE_TTL_SECONDS > 0
+        chain_id = cast(int, self.w3.eth.chain_id)
+
+        if use_cache:
+            addresses = load_addresses(
+                cache_path,
+                chain_id,
+                variables.LIDO_LOCATOR,
+                variables.ADDRESS_CACHE_TTL_SECONDS,
+            )
+            if addresses is not None:
+                logger.info(
+                    {"msg": "Use cached contract addresses.", "value": addresses}
+                )
+                return addresses
+
+        core_components = self.lido_locator.core_components()
+        addresses = {
+            "validatorsExitBusOracle": self.lido_locator.validator_exit_bus_oracle(),
+            "stakingRouter": core_components["stakingRouter"],
+            "withdrawalVault": core_components["withdrawalVault"],
+        }
+
+        if use_cache:
+            save_addresses(cache_path, chain_id, variables.LIDO_LOCATOR, addresses)
+
+        return addresses
+
+    def get_staking_modules(self) -> dict[int, ChecksumAddress]:
+        """
+        Get all staking modules registered in the staking router.
+
+        The list is fetched with a single call and cached for
+        STAKING_MODULES_REFRESH_INTERVAL_SECONDS.
+
+        Returns:
+            Mapping of staking module id -> staking module address
+        """
+        now = time.monotonic()
+        if (
+            self._staking_modules_updated_at is None
+            or now - self._staking_modules_updated_at
+            >= variables.STAKING_MODULES_REFRESH_INTERVAL_SECONDS
+        ):
+            self._staking_modules = self.staking_router.get_staking_modules_addresses()
+            self._staking_modules_updated_at = now
+        return self._staking_modules
+
+    def is_module_enabled(self, module_id: int) -> bool:
+        """
+        Check if the bot should process validators of the staking module.
+
+        If MODULES_WHITELIST is empty, all modules known to the staking router are enabled.
+        """
+        if variables.MODULES_WHITELIST:
+            return module_id in variables.MODULES_WHITELIST
+        return module_id in self.get_staking_modules()
+
+    def get_node_operator_registry(
+        self, module_id: int
+    ) -> Optional[NodeOperatorRegistryContract]:
+        """
+        Get the node operator registry contract of the staking module.
+
+        Returns None if the module is not registered in the staking router.
+        """
+        address = self.get_staking_modules().get(module_id)
+        if address is None:
+            return None
+
+        registry = self.node_operator_registry_map.get(module_id)
+        if registry is None or registry.address != address:
+            registry = cast(
                 NodeOperatorRegistryContract,
                 self.w3.eth.contract(
-                    address=self.staking_router.get_staking_module(module_id),
+                    address=address,
                     ContractFactoryClass=NodeOperatorRegistryContract,
                 ),
             )
+            self.node_operator_registry_map[module_id] = registry
+        return registry
@@ -0,0 +1,137 @@
+from typing import Optional
+
+import structlog
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.exceptions import MethodUnavailable, Web3RPCError
+from web3.module import Module
+from web3.types import TxReceipt
+
+logger = structlog.get_logger(__name__)
+
+# Error messages of nodes that don't implement eth_getBlockReceipts
+_UNSUPPORTED_MESSAGES = (
+    "method not found",
+    "not supported",
+    "unsupported",
+    "does not exist",
+    "not available",
+)
+
+
+def _is_unsupported(error: Web3RPCError) -> bool:
+    if isinstance(error, MethodUnavailable):
+        return True
+    message = str(error).lower()
+    return any(text in message for text in _UNSUPPORTED_MESSAGES)
+
+
+class ReceiptUtils(Module):
+    """
+    Bulk transaction receipt fetching.
+
+    Receipts are requested per block with eth_getBlockReceipts, so the number of
+    requests depends on the number of distinct blocks rather than transactions.
+    Endpoints without eth_getBlockReceipts get eth_getTransactionReceipt requests for
+    the wanted transactions only. Blocks whose receipts fail for another reason fall
+    back the same way.
+
+    Support is detected once per provider. RoutingProvider spreads reads across its
+    endpoints, so the endpoint of the next request isn't known: once any endpoint
+    doesn't serve eth_getBlockReceipts, transaction receipts are used for all of them.
+    """
+
+    w3: Web3
+
+    def __init__(self, w3: Web3):
+        super().__init__(w3)
+        # Whether the provider serves eth_getBlockReceipts, None until detected
+        self.block_receipts_supported: Optional[bool] = None
+
+    def get_receipts(
+        self, tx_hashes_by_block: dict[int, list[HexBytes]]
+    ) -> dict[HexBytes, TxReceipt]:
+        """
+        Get receipts of the given transactions.
+
+        Args:
+            tx_hashes_by_block: Transaction hashes grouped by block number
+
+        Returns:
+            Mapping of transaction hash -> receipt
+        """
+        receipts: dict[HexBytes, TxReceipt] = {}
+        without_block_receipts: list[HexBytes] = []
+
+        for block_number, tx_hashes in tx_hashes_by_block.items():
+            block_receipts = self._get_block_receipts(block_number)
+            if block_receipts is None:
+                without_block_receipts.extend(tx_hashes)
+                continue
+            wanted = {HexBytes(tx_hash) for tx_hash in tx_hashes}
+            for receipt in block_receipts:
+                if receipt["transactionHash"] in wanted:
+                    receipts[HexBytes(receipt["transactionHash"])] = receipt
+
+        if without_block_receipts:
+            receipts.update(self._get_transaction_receipts(without_block_receipts))
+
+        return receipts
+
+    def _get_block_receipts(self, block_number: int) -> list[TxReceipt] | None:
+        if self.block_receipts_supported is False:
+            return None
+
+        try:
+            receipts = self.w3.eth.get_block_receipts(block_number)
+        except Exception as error:
+            if not isinstance(error, Web3RPCError) or not _is_unsupported(error):
+                # Too large response, pruned block, timeout: only this block falls
+                # back, its transactions without receipts are quarantined by the bot
+                logger.warning(
+                    {
+                        "msg": "Failed to get block receipts, falling back to transaction receipts",
+                        "block_number": block_number,
+                        "error": str(error),
+                    }
+                )
+                return None
+            self.block_receipts_supported = False
+            logger.warning(
+                {
+                    "msg": "eth_getBlockReceipts is not supported, falling back to transaction receipts",
+                    "error": str(error),
+                }
+            )
+            return None
+
+        if self.block_receipts_supported is None:
+            self.block_receipts_supported = True
+        return list(receipts)
+
+    def _get_transaction_receipts(
+        self, tx_hashes: list[HexBytes]
+    ) -> dict[HexBytes, TxReceipt]:
+        """
+        Receipts of the transactions, one request each.
+
+        A transaction whose receipt can't be fetched is left out, so its event is
+        quarantined by the bot instead of failing the whole batch.
+        """
+        # JSON-RPC batches are not used: web3-multi-provider's session proxy
+        # expects a single response object and fails on batch responses
+        receipts: dict[HexBytes, TxReceipt] = {}
+        for tx_hash in dict.fromkeys(tx_hashes):
+            try:
+                receipts[HexBytes(tx_hash)] = self.w3.eth.get_transaction_receipt(
+                    tx_hash
+                )
+            except Exception as error:
+                logger.warning(
+                    {
+                        "msg": "Failed to get transaction receipt",
+                        "transaction_hash": HexBytes(tx_hash).to_0x_hex(),
+                        "error": str(error),
+                    }
+                )
+        return receipts
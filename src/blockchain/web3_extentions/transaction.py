@@ -1,17 +1,23 @@
 # pyright: reportTypedDictNotRequiredAccess=false
 
+import threading
+from typing import Optional
+
 import structlog
 from eth_account.datastructures import SignedTransaction
 from eth_typing import ChecksumAddress
+from hexbytes import HexBytes
 from web3 import Web3
 from web3.contract.contract import ContractFunction
-from web3.exceptions import ContractLogicError, TimeExhausted
+from web3.exceptions import ContractLogicError, TimeExhausted, Web3Exception
 from web3.module import Module
-from web3.types import TxParams, Wei
+from web3.types import AccessList, Nonce, TxParams, Wei
 
 from src import variables
 from src.blockchain.constants import SLOT_TIME
-from src.metrics.metrics import TX_SEND
+from src.blockchain.signer_pool import SignerPool
+from src.metrics.cycle_stats import stage
+from src.metrics.metrics import ACCESS_LIST_GAS_SAVED, ACCESS_LISTS, TX_SEND
 
 logger = structlog.get_logger(__name__)
 
@@ -19,6 +25,16 @@ logger = structlog.get_logger(__name__)
 class TransactionUtils(Module):
     w3: Web3
 
+    def __init__(self, w3: Web3):
+        super().__init__(w3)
+        # Sent transactions still waiting for a receipt
+        self.pending_transactions = 0
+        self._pending_lock = threading.Lock()
+        # Accounts independent transactions are spread across
+        self.signers = SignerPool(
+            w3, variables.ACCOUNTS, Wei(variables.SIGNER_MIN_BALANCE)
+        )
+
     @staticmethod
     def check(transaction: ContractFunction, value: Wei | None = None) -> bool:
         if value is None:
@@ -27,7 +43,8 @@ class TransactionUtils(Module):
             call_params = TxParams({})
             if value > 0:
                 call_params["value"] = value
-            transaction.call(call_params)
+            with stage("simulation"):
+                transaction.call(call_params)
         except (ValueError, ContractLogicError) as error:
             logger.error({"msg": "Local transaction reverted.", "error": str(error)})
             return False
@@ -43,7 +60,7 @@ class TransactionUtils(Module):
     ) -> bool:
         if value is None:
             value = Wei(0)
-        if not variables.ACCOUNT:
+        if not variables.ACCOUNTS:
             logger.info(
                 {"msg": "Account was not provided. Sending transaction skipped."}
             )
@@ -53,35 +70,59 @@ class TransactionUtils(Module):
             logger.info({"msg": "Dry mode activated. Sending transaction skipped."})
             return True
 
-        pending = self.w3.eth.get_block("pending")
+        signer = self.signers.acquire(value)
+        if signer is None:
+            TX_SEND.labels("failure").inc()
+            logger.error(
+                {"msg": "No signer account is funded and free. Sending skipped."}
+            )
+            return False
 
-        priority = self._get_priority_fee(
-            variables.GAS_PRIORITY_FEE_PERCENTILE,
-            variables.MIN_PRIORITY_FEE,
-            variables.MAX_PRIORITY_FEE,
-        )
+        sent_nonce: Optional[int] = None
+        status = False
+        try:
+            # Read from the chain by acquire
+            nonce = signer.nonce
+            assert nonce is not None
+            pending = self.w3.eth.get_block("pending")
 
-        gas_limit = self._estimate_gas(transaction, variables.ACCOUNT.address, value)
+            priority = self._get_priority_fee(
+                variables.GAS_PRIORITY_FEE_PERCENTILE,
+                variables.MIN_PRIORITY_FEE,
+                variables.MAX_PRIORITY_FEE,
+            )
 
-        tx_params = TxParams(
-            {
-                "from": variables.ACCOUNT.address,
-                "gas": gas_limit,
-                "maxFeePerGas": Wei(pending["baseFeePerGas"] * 2 + priority),
-                "maxPriorityFeePerGas": priority,
-                "nonce": self.w3.eth.get_transaction_count(variables.ACCOUNT.address),
-            }
-        )
+            gas = self._estimate_gas(transaction, signer.address, value)
+            access_list, gas = self._choose_access_list(
+                transaction, signer.address, value, gas
+            )
 
-        if value > 0:
-            tx_params["value"] = Wei(value)
+            tx_params = TxParams(
+                {
+                    "from": signer.address,
+                    "gas": self._gas_limit(gas),
+                    "maxFeePerGas": Wei(pending["baseFeePerGas"] * 2 + priority),
+                    "maxPriorityFeePerGas": priority,
+                    "nonce": Nonce(nonce),
+                }
+            )
 
-        transaction_dict = transaction.build_transaction(tx_params)
+            if value > 0:
+                tx_params["value"] = Wei(value)
+            if access_list:
+                tx_params["accessList"] = access_list
 
-        signed = self.w3.eth.account.sign_transaction(
-            transaction_dict, variables.ACCOUNT.key
-        )
-        status = self.send_and_wait(signed, timeout_in_blocks)
+            transaction_dict = transaction.build_transaction(tx_params)
+
+            signed = self.w3.eth.account.sign_transaction(
+                transaction_dict, signer.account.key
+            )
+            tx_hash = self._send_raw(signed)
+            if tx_hash is not None:
+                sent_nonce = nonce
+                status = self._wait(tx_hash, timeout_in_blocks)
+        finally:
+            self.signers.release(signer, sent_nonce, included=status)
 
         if status:
             TX_SEND.labels("success").inc()
@@ -97,14 +138,19 @@ class TransactionUtils(Module):
         transaction: ContractFunction,
         account_address: ChecksumAddress,
         value: Wei | None = None,
-    ) -> int:
+        access_list: AccessList | None = None,
+    ) -> Optional[int]:
+        """Gas used by the transaction, None if it can't be estimated."""
         if value is None:
             value = Wei(0)
         try:
             tx_params = TxParams({"from": account_address})
             if value > 0:
                 tx_params["value"] = value
-            gas = transaction.estimate_gas(tx_params)
+            if access_list:
+                tx_params["accessList"] = access_list
+            with stage("simulation"):
+                return transaction.estimate_gas(tx_params)
         except ContractLogicError as error:
             logger.warning(
                 {
@@ -112,7 +158,6 @@ class TransactionUtils(Module):
                     "error": str(error),
                 }
             )
-            return variables.CONTRACT_GAS_LIMIT
         except ValueError as error:
             logger.warning(
                 {
@@ -120,29 +165,109 @@ class TransactionUtils(Module):
                     "error": str(error),
                 }
             )
-            return variables.CONTRACT_GAS_LIMIT
+        return None
 
+    @staticmethod
+    def _gas_limit(gas: Optional[int]) -> int:
+        if gas is None:
+            return variables.CONTRACT_GAS_LIMIT
         return min(
             variables.CONTRACT_GAS_LIMIT,
             int(gas * 1.3),
         )
 
+    def _choose_access_list(
+        self,
+        transaction: ContractFunction,
+        account_address: ChecksumAddress,
+        value: Wei,
+        gas: Optional[int],
+    ) -> tuple[Optional[AccessList], Optional[int]]:
+        """
+        Generate an access list for the transaction, kept only if it lowers the gas.
+
+        trigger_exits calls VEBO, the staking router, staking modules, the withdrawal
+        vault and the EIP-7002 predeploy. Addresses and storage slots declared in the
+        access list are charged as warm on first access.
+
+        Returns:
+            Access list to attach or None, and the gas of the transaction with it
+        """
+        if gas is None:
+            # Nothing to compare with, the transaction is sent with the gas limit
+            return None, gas
+
+        call_params = TxParams(
+            {
+                "from": account_address,
+                "to": transaction.address,
+                "data": transaction._encode_transaction_data(),
+            }
+        )
+        if value > 0:
+            call_params["value"] = value
+        try:
+            with stage("simulation"):
+                response = self.w3.eth.create_access_list(call_params)
+        except (ValueError, Web3Exception) as error:
+            ACCESS_LISTS.labels("failed").inc()
+            logger.warning({"msg": "Can not create access list.", "error": str(error)})
+            return None, gas
+
+        access_list = response["accessList"]
+        gas_with_list = None
+        if access_list:
+            gas_with_list = self._estimate_gas(
+                transaction, account_address, value, access_list
+            )
+        if gas_with_list is None or gas_with_list >= gas:
+            ACCESS_LISTS.labels("not_lower").inc()
+            return None, gas
+
+        ACCESS_LISTS.labels("attached").inc()
+        ACCESS_LIST_GAS_SAVED.observe(gas - gas_with_list)
+        logger.info(
+            {
+                "msg": "Access list attached.",
+                "gas": gas_with_list,
+                "gas_saved": gas - gas_with_list,
+                "addresses": len(access_list),
+            }
+        )
+        return access_list, gas_with_list
+
     def send_and_wait(
         self, signed_tx: SignedTransaction, timeout_in_blocks: int
     ) -> bool:
+        tx_hash = self._send_raw(signed_tx)
+        if tx_hash is None:
+            return False
+        return self._wait(tx_hash, timeout_in_blocks)
+
+    def _send_raw(self, signed_tx: SignedTransaction) -> Optional[HexBytes]:
         try:
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            with stage("send"):
+                tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
         except Exception as error:
             logger.error({"msg": "Transaction reverted.", "value": str(error)})
-            return False
+            return None
 
         logger.info({"msg": "Transaction sent.", "value": tx_hash.hex()})
+        return tx_hash
+
+    def _wait(self, tx_hash: HexBytes, timeout_in_blocks: int) -> bool:
+        with self._pending_lock:
+            self.pending_transactions += 1
         try:
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(
-                tx_hash, (timeout_in_blocks + 1) * SLOT_TIME
-            )
+            with stage("receipt_wait"):
+                tx_receipt = self.w3.eth.wait_for_transaction_receipt(
+                    tx_hash, (timeout_in_blocks + 1) * SLOT_TIME
+                )
         except TimeExhausted:
             return False
+        finally:
+            with self._pending_lock:
+                self.pending_transactions -= 1
 
         logger.info(
             {
@@ -0,0 +1,135 @@
+"""
+Dead-letter set of ExitDataProcessing events that failed to process.
+
+An event whose transaction can't be fetched or decoded is quarantined instead of
+failing the cycle, so the rest of the block range is processed and the event cursor
+moves on. Quarantined events are retried with exponential backoff. The set is kept in
+a JSON file, so events are not lost when the bot restarts after the cursor passed them.
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+import structlog
+from hexbytes import HexBytes
+from web3.types import EventData
+
+from src.metrics.metrics import DEAD_LETTERS
+
+logger = structlog.get_logger(__name__)
+
+MAX_RETRY_DELAY_SECONDS = 24 * 60 * 60
+
+
+@dataclass
+class DeadLetter:
+    exit_requests_hash: str
+    block_number: int
+    transaction_hash: str
+    error: str
+    attempts: int
+    retry_at: float
+
+    def to_event(self) -> EventData:
+        """Event fields used by the bot to process the event again."""
+        return EventData(  # type: ignore[typeddict-item]
+            args={"exitRequestsHash": HexBytes(self.exit_requests_hash)},
+            blockNumber=self.block_number,
+            transactionHash=HexBytes(self.transaction_hash),
+        )
+
+
+class DeadLetters:
+    """
+    Quarantined events keyed by exitRequestsHash, persisted to `path`.
+
+    Args:
+        path: JSON file of the set, None keeps the set in memory only
+        retry_seconds: Delay before the first retry, doubled on every failure
+    """
+
+    def __init__(self, path: Optional[Path], retry_seconds: float):
+        self.path = path
+        self.retry_seconds = retry_seconds
+        self._lock = threading.Lock()
+        self.entries: dict[str, DeadLetter] = self._load()
+        DEAD_LETTERS.set(len(self.entries))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, exit_requests_hash: str) -> bool:
+        with self._lock:
+            return exit_requests_hash in self.entries
+
+    def add(self, event: EventData, error: Exception) -> DeadLetter:
+        """Quarantine the event or schedule its next retry if it is quarantined."""
+        exit_requests_hash = event["args"]["exitRequestsHash"].hex()
+        with self._lock:
+            previous = self.entries.get(exit_requests_hash)
+            attempts = previous.attempts + 1 if previous else 1
+            delay = min(
+                MAX_RETRY_DELAY_SECONDS, self.retry_seconds * 2 ** (attempts - 1)
+            )
+            entry = DeadLetter(
+                exit_requests_hash=exit_requests_hash,
+                block_number=event["blockNumber"],
+                transaction_hash=HexBytes(event["transactionHash"]).to_0x_hex(),
+                error=f"{type(error).__name__}: {error}",
+                attempts=attempts,
+                retry_at=time.time() + delay,
+            )
+            self.entries[exit_requests_hash] = entry
+            self._save()
+        return entry
+
+    def remove(self, exit_requests_hash: str) -> None:
+        with self._lock:
+            if self.entries.pop(exit_requests_hash, None) is not None:
+                self._save()
+
+    def due(self) -> list[DeadLetter]:
+        """Entries to retry now, oldest block first."""
+        now = time.time()
+        with self._lock:
+            return sorted(
+                (entry for entry in self.entries.values() if entry.retry_at <= now),
+                key=lambda entry: entry.block_number,
+            )
+
+    def _load(self) -> dict[str, DeadLetter]:
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path) as dead_letters_file:
+                entries = json.load(dead_letters_file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as error:
+            logger.warning({"msg": "Failed to read dead letters.", "error": str(error)})
+            return {}
+        return {entry["exit_requests_hash"]: DeadLetter(**entry) for entry in entries}
+
+    def _save(self) -> None:
+        """Atomically write the set to the file. Called with the lock held."""
+        DEAD_LETTERS.set(len(self.entries))
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w") as dead_letters_file:
+                json.dump(
+                    [asdict(entry) for entry in self.entries.values()],
+                    dead_letters_file,
+                )
+            os.replace(tmp_path, self.path)
+        except OSError as error:
+            logger.warning(
+                {"msg": "Failed to write dead letters.", "error": str(error)}
+            )
@@ -0,0 +1,122 @@
+"""
+Event cursor of the bot, persisted between restarts.
+
+Keeps the next block to scan for ExitDataProcessing events and the event of every
+tracked payload. After a restart the bot reloads the tracked payloads from their
+transactions and continues from the cursor, instead of scanning the whole
+LOOKBACK_DAYS range again. Check priorities are not kept, restored payloads are
+checked as never checked ones.
+"""
+
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+import structlog
+from hexbytes import HexBytes
+from web3.types import EventData
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class PayloadEvent:
+    exit_requests_hash: str
+    block_number: int
+    transaction_hash: str
+
+    def to_event(self) -> EventData:
+        """Event fields used by the bot to process the event again."""
+        return EventData(  # type: ignore[typeddict-item]
+            args={"exitRequestsHash": HexBytes(self.exit_requests_hash)},
+            blockNumber=self.block_number,
+            transactionHash=HexBytes(self.transaction_hash),
+        )
+
+
+class EventCursor:
+    """
+    Next block to scan and events of tracked payloads, persisted to `path`.
+
+    Args:
+        path: JSON file of the cursor, None keeps the cursor in memory only
+    """
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self._lock = threading.Lock()
+        self.next_block: Optional[int] = None
+        self.payload_events: dict[str, PayloadEvent] = {}
+        self._load()
+
+    def track(self, event: EventData) -> None:
+        """Remember the event the payload was stored from."""
+        exit_requests_hash = event["args"]["exitRequestsHash"].hex()
+        with self._lock:
+            self.payload_events.setdefault(
+                exit_requests_hash,
+                PayloadEvent(
+                    exit_requests_hash=exit_requests_hash,
+                    block_number=event["blockNumber"],
+                    transaction_hash=HexBytes(event["transactionHash"]).to_0x_hex(),
+                ),
+            )
+
+    def forget(self, exit_requests_hash: str) -> None:
+        with self._lock:
+            self.payload_events.pop(exit_requests_hash, None)
+
+    def save(self, next_block: Optional[int]) -> None:
+        """Atomically write the cursor to the file."""
+        with self._lock:
+            self.next_block = next_block
+            if self.path is None:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix(".tmp")
+                with open(tmp_path, "w") as cursor_file:
+                    json.dump(
+                        {
+                            "next_block": next_block,
+                            "payload_events": [
+                                asdict(payload_event)
+                                for payload_event in self.payload_events.values()
+                            ],
+                        },
+                        cursor_file,
+                    )
+                os.replace(tmp_path, self.path)
+            except OSError as error:
+                logger.warning(
+                    {"msg": "Failed to write event cursor.", "error": str(error)}
+                )
+
+    def _load(self) -> None:
+        if self.path is None:
+            return
+        try:
+            with open(self.path) as cursor_file:
+                cursor = json.load(cursor_file)
+            next_block = cursor["next_block"]
+            payload_events = {
+                entry["exit_requests_hash"]: PayloadEvent(**entry)
+                for entry in cursor["payload_events"]
+            }
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            logger.warning({"msg": "Failed to read event cursor.", "error": str(error)})
+            return
+        self.next_block = next_block
+        self.payload_events = payload_events
+        logger.info(
+            {
+                "msg": "Event cursor restored",
+                "next_block": next_block,
+                "tracked_payloads": len(payload_events),
+            }
+        )
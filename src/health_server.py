@@ -1,35 +1,72 @@
+import json
 import threading
-from datetime import datetime, timedelta
-from http.server import BaseHTTPRequestHandler, HTTPServer
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
 
-import requests
 import structlog
 
-import src.variables as variables
+from src.utils.profiling import allocations_snapshot, cycle_profiler, thread_stacks
 
 logger = structlog.get_logger(__name__)
 
-_last_pulse = datetime.now()
+# Bot is considered unhealthy if there was no pulse for this long
+PULSE_TIMEOUT_SECONDS = 10 * 60
+
+# Monotonic time of the last bot loop heartbeat. A float assignment is atomic,
+# so the bot loop never waits for the server thread
+_last_pulse = time.monotonic()
+
+_status_lock = threading.Lock()
+_status: dict[str, Any] = {}
 
 
 def pulse():
-    try:
-        requests.get(f"http://localhost:{variables.SERVER_PORT}/pulse/", timeout=10)
-    except requests.exceptions.ConnectionError as error:
-        logger.warning(
-            {"msg": "Healthcheck server is not responding.", "error": str(error)}
+    """Heartbeat of the bot loop."""
+    global _last_pulse
+    _last_pulse = time.monotonic()
+
+
+def update_status(**fields: Any):
+    """Update fields exposed by the /status endpoint."""
+    with _status_lock:
+        _status.update(fields)
+
+
+def get_status() -> dict[str, Any]:
+    with _status_lock:
+        status = dict(_status)
+    status["last_pulse_seconds_ago"] = round(time.monotonic() - _last_pulse, 3)
+    if "last_successful_cycle_at" in status:
+        status["cycle_lag_seconds"] = round(
+            time.time() - status["last_successful_cycle_at"], 3
         )
+    if status.get("last_processed_block") is not None and "finalized_block" in status:
+        status["cycle_lag_blocks"] = (
+            status["finalized_block"] - status["last_processed_block"]
+        )
+    return status
 
 
 class HealthCheckHandler(BaseHTTPRequestHandler):
-    """HTTP request handler with a simple health check endpoint."""
+    """HTTP request handler with health check and status endpoints."""
 
     def do_GET(self):
-        global _last_pulse
+        url = urlparse(self.path)
+        if url.path.startswith("/debug/"):
+            self._handle_debug(url.path, parse_qs(url.query))
+            return
 
-        if self.path == "/pulse/":
-            _last_pulse = datetime.now()
-        if datetime.now() - _last_pulse > timedelta(minutes=10):
+        if url.path == "/status":
+            body = json.dumps(get_status(), default=str) + "\n"
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body.encode())
+            return
+
+        if time.monotonic() - _last_pulse > PULSE_TIMEOUT_SECONDS:
             self.send_response(503)
             self.end_headers()
             self.wfile.write(b'{"metrics": "fail", "reason": "timeout exceeded"}\n')
@@ -38,12 +75,65 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
             self.end_headers()
             self.wfile.write(b'{"metrics": "ok", "reason": "ok"}\n')
 
+    def _handle_debug(self, path: str, query: dict[str, list[str]]):
+        """
+        Profiling endpoints. Served only by the debug server, which is bound to
+        DEBUG_SERVER_HOST (localhost by default).
+
+        - /debug/profile?cycles=1&timeout=600&sort=cumulative&limit=50 - sampled profile of the next N cycles
+        - /debug/tracemalloc?seconds=10&top=25 - top-N allocation sites
+        - /debug/stacks?format=collapsed - stacks of all threads
+        """
+        if not getattr(self.server, "debug_enabled", False):
+            self._send_text(404, "Not found\n")
+            return
 
-def _run_server(port: int):
+        def param(name: str, default: str) -> str:
+            return query.get(name, [default])[0]
+
+        try:
+            if path == "/debug/profile":
+                body = cycle_profiler.profile_cycles(
+                    cycles=int(param("cycles", "1")),
+                    timeout=float(param("timeout", "600")),
+                    sort=param("sort", "cumulative"),
+                    limit=int(param("limit", "50")),
+                )
+            elif path == "/debug/tracemalloc":
+                body = allocations_snapshot(
+                    seconds=float(param("seconds", "10")),
+                    top=int(param("top", "25")),
+                )
+            elif path == "/debug/stacks":
+                body = thread_stacks(collapsed=param("format", "text") == "collapsed")
+            else:
+                self._send_text(404, "Not found\n")
+                return
+        except ValueError as error:
+            self._send_text(400, f"{error}\n")
+            return
+        except (RuntimeError, TimeoutError) as error:
+            self._send_text(409, f"{error}\n")
+            return
+
+        self._send_text(200, body)
+
+    def _send_text(self, status: int, body: str):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+
+def _run_server(port: int, host: str = "", debug_enabled: bool = False):
     """Start the HTTP server (blocking)."""
-    server_address = ("", port)
-    httpd = HTTPServer(server_address, HealthCheckHandler)
-    logger.info(f"Health check available at http://localhost:{port}/health")
+    server_address = (host, port)
+    httpd = ThreadingHTTPServer(server_address, HealthCheckHandler)
+    httpd.debug_enabled = debug_enabled  # type: ignore[attr-defined]
+    if debug_enabled:
+        logger.info(f"Debug endpoints available at http://{host}:{port}/debug/")
+    else:
+        logger.info(f"Health check available at http://localhost:{port}/health")
     httpd.serve_forever()
 
 
@@ -53,3 +143,17 @@ def start_health_server(port: int):
     server_thread = threading.Thread(target=_run_server, args=(port,), daemon=True)
     server_thread.start()
     return server_thread
+
+
+def start_debug_server(host: str, port: int):
+    """
+    Start the HTTP server with profiling endpoints in a background thread.
+
+    Access is restricted by the bind address, so keep host on a loopback or private interface.
+    """
+    logger.info(f"Starting debug HTTP server on {host}:{port}")
+    server_thread = threading.Thread(
+        target=_run_server, args=(port, host, True), daemon=True
+    )
+    server_thread.start()
+    return server_thread
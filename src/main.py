@@ -1,76 +1,249 @@
-import logging
+import fcntl
+import sqlite3
 import time
+from typing import IO, Optional
 
 import structlog
 import web3_multi_provider
 from prometheus_client import start_http_server
-from web3_multi_provider import FallbackProvider
 from web3_multi_provider.metrics import MetricsConfig
 
 from src.blockchain.constants import SLOT_TIME
+from src.blockchain.disk_cache import DiskCache, DiskCacheMiddleware
+from src.blockchain.providers import ReplayProvider, RoutingProvider
 from src.blockchain.typings import Web3
 from src.blockchain.web3_extentions.lido_contracts import LidoContracts
+from src.blockchain.web3_extentions.receipts import ReceiptUtils
 from src.blockchain.web3_extentions.transaction import TransactionUtils
-from src.health_server import pulse, start_health_server
+from src.health_server import (
+    pulse,
+    start_debug_server,
+    start_health_server,
+    update_status,
+)
 from src.metrics import metrics
+from src.metrics.cycle_stats import (
+    WorkBudget,
+    count_cl_response,
+    finish_cycle,
+    stage,
+    start_cycle,
+)
 from src.metrics.metrics import (
     BOT_CYCLE_DURATION,
     LAST_PROCESSED_BLOCK,
     UNEXPECTED_EXCEPTIONS,
 )
+from src.sharding import Sharding, ShardLease
 from src.trigger_exit_bot import TriggerExitBot
+from src.utils.cassette import Cassette, CassetteAdapter
 from src.utils.cl_client import CLClient
+from src.utils.logs import configure_logging
+from src.utils.profiling import cycle_profiler
+from src.utils.rate_limit import RateLimitedAdapter, shared_bucket
+from src.utils.validator_registry import ValidatorRegistry
 from src.variables import (
-    ACCOUNT,
+    ACCOUNTS,
     CL_RPC_ENDPOINTS,
+    CL_RPC_RATE_LIMITS,
+    CYCLE_BUDGET_RPC_REQUESTS,
+    CYCLE_BUDGET_SECONDS,
+    DATA_DIR,
+    DEBUG_SERVER_HOST,
+    DEBUG_SERVER_PORT,
+    DISK_CACHE_MAX_BYTES,
     LOG_LEVEL,
+    LOG_MODE,
+    LOG_SAMPLE_RATE,
     LOOKBACK_DAYS,
     PROMETHEUS_PORT,
     PROMETHEUS_PREFIX,
+    RPC_CASSETTE_MODE,
+    RPC_CASSETTE_PATH,
+    RPC_CASSETTE_PRESERVE_LATENCY,
+    RPC_MAX_RETRIES,
+    RPC_RETRY_BACKOFF_SECONDS,
     SERVER_PORT,
+    SHARD_COUNT,
+    SHARD_ID,
+    SHARD_INSTANCE_ID,
+    SHARD_KEY,
+    SHARD_LEASE_DIR,
+    SHARD_LEASE_TTL_SECONDS,
     SLEEP_INTERVAL_SECONDS,
+    VALIDATOR_REGISTRY_SNAPSHOT,
     WEB3_RPC_ENDPOINTS,
+    WEB3_RPC_RATE_LIMITS,
+    WEB3_RPC_WEIGHTS,
 )
 
-# Configure structlog for JSON logging
-structlog.configure(
-    processors=[
-        structlog.contextvars.merge_contextvars,
-        structlog.processors.add_log_level,
-        structlog.processors.StackInfoRenderer(),
-        structlog.dev.set_exc_info,
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.JSONRenderer(),
-    ],
-    wrapper_class=structlog.make_filtering_bound_logger(getattr(logging, LOG_LEVEL)),
-    context_class=dict,
-    logger_factory=structlog.PrintLoggerFactory(),
-    cache_logger_on_first_use=False,
-)
+configure_logging(LOG_LEVEL, LOG_MODE, LOG_SAMPLE_RATE)
 
 logger = structlog.get_logger(__name__)
 
 
-def create_web3(endpoints: list[str]) -> Web3:
-    w3 = Web3(FallbackProvider(endpoints, cache_allowed_requests=True))
-    logger.info({"msg": "Current chain_id", "chain_id": w3.eth.chain_id})
+def create_cassette() -> Optional[Cassette]:
+    if not RPC_CASSETTE_MODE:
+        return None
+    logger.info(
+        {
+            "msg": "RPC cassette enabled",
+            "mode": RPC_CASSETTE_MODE,
+            "path": str(RPC_CASSETTE_PATH),
+        }
+    )
+    cassette = Cassette(
+        RPC_CASSETTE_PATH, RPC_CASSETTE_MODE, RPC_CASSETTE_PRESERVE_LATENCY
+    )
+    if cassette.recording:
+        cassette.record_env()
+    return cassette
+
+
+def lock_data_dir() -> Optional[IO[str]]:
+    """
+    Lock DATA_DIR for this instance, the lock is held while the file is open.
+
+    Instances must not share DATA_DIR: stale payload files of one instance would be
+    removed by the others, and the event cursor, dead letters and caches overwritten.
+
+    Raises:
+        RuntimeError: If DATA_DIR is locked by another instance
+    """
+    try:
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        lock_file = open(DATA_DIR / ".lock", "w")
+    except OSError as error:
+        # Files in DATA_DIR fail the same way, the bot runs without them
+        logger.warning({"msg": "Failed to lock data directory.", "error": str(error)})
+        return None
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError as error:
+        lock_file.close()
+        raise RuntimeError(
+            f"DATA_DIR {DATA_DIR} is used by another bot instance, "
+            "every instance needs its own"
+        ) from error
+    return lock_file
+
+
+def create_sharding() -> Sharding:
+    lease = None
+    if SHARD_COUNT > 1 and SHARD_ID is None:
+        lease = ShardLease(
+            SHARD_LEASE_DIR, SHARD_COUNT, SHARD_INSTANCE_ID, SHARD_LEASE_TTL_SECONDS
+        )
+    sharding = Sharding(SHARD_COUNT, SHARD_ID, SHARD_KEY, lease)
+    if sharding.enabled:
+        logger.info(
+            {
+                "msg": "Sharding enabled",
+                "shard_count": SHARD_COUNT,
+                "shard_id": SHARD_ID,
+                "shard_key": SHARD_KEY,
+                "lease_dir": str(SHARD_LEASE_DIR) if lease else None,
+            }
+        )
+    return sharding
+
+
+def create_web3(endpoints: list[str], cassette: Optional[Cassette] = None) -> Web3:
+    if cassette is not None and not cassette.recording:
+        w3 = Web3(ReplayProvider(cassette))
+    else:
+        w3 = Web3(
+            RoutingProvider(
+                endpoints,
+                weights=WEB3_RPC_WEIGHTS,
+                rate_limits=WEB3_RPC_RATE_LIMITS,
+                max_retries=RPC_MAX_RETRIES,
+                retry_backoff_seconds=RPC_RETRY_BACKOFF_SECONDS,
+                cache_allowed_requests=True,
+                cassette=cassette,
+            )
+        )
+    chain_id = w3.eth.chain_id
+    logger.info({"msg": "Current chain_id", "chain_id": chain_id})
+    # Cache hits would be missing in a recorded cassette
+    if cassette is None and DISK_CACHE_MAX_BYTES > 0:
+        try:
+            disk_cache = DiskCache(
+                DATA_DIR / "rpc_cache.sqlite", DISK_CACHE_MAX_BYTES, chain_id
+            )
+        except (OSError, sqlite3.Error) as error:
+            logger.warning(
+                {
+                    "msg": "Failed to open disk cache, running without it.",
+                    "error": str(error),
+                }
+            )
+        else:
+            # In web3 v7 layer 0 is the innermost layer, next to the provider (add()
+            # puts middleware on the outermost one). The cache sees raw JSON-RPC
+            # responses, before the attrdict middleware turns them into AttributeDicts
+            # that can't be stored as JSON
+            w3.middleware_onion.inject(
+                DiskCacheMiddleware.build(disk_cache), "disk_cache", layer=0
+            )
     w3.attach_modules(
         {
             "lido": LidoContracts,
             "transaction": TransactionUtils,
+            "receipts": ReceiptUtils,
         }
     )
     return w3
 
 
-def create_cl_client(endpoints: list[str]) -> CLClient:
-    return CLClient(endpoints[0])
+def create_cl_client(
+    endpoints: list[str], cassette: Optional[Cassette] = None
+) -> CLClient:
+    cl_client = CLClient(endpoints[0])
+    if VALIDATOR_REGISTRY_SNAPSHOT:
+        cl_client.registry = ValidatorRegistry(DATA_DIR / "validator_registry")
+    cl_client.session.hooks["response"].append(count_cl_response)
+    if cassette is not None and not cassette.recording:
+        cl_client.session.mount("http://", CassetteAdapter(cassette))
+        cl_client.session.mount("https://", CassetteAdapter(cassette))
+        return cl_client
+
+    if cassette is not None:
+        cl_client.session.hooks["response"].append(cassette.record_cl_response)
+    adapter = RateLimitedAdapter(
+        "cl",
+        shared_bucket(endpoints[0], CL_RPC_RATE_LIMITS[0] if CL_RPC_RATE_LIMITS else 0),
+        RPC_MAX_RETRIES,
+        RPC_RETRY_BACKOFF_SECONDS,
+    )
+    cl_client.session.mount("http://", adapter)
+    cl_client.session.mount("https://", adapter)
+    return cl_client
+
+
+def refresh_validator_registry(cl_client: CLClient) -> None:
+    """Bring the snapshot to the head epoch, lookups keep the previous one on failure."""
+    if cl_client.registry is None:
+        return
+    try:
+        with stage("registry_refresh"):
+            cl_client.registry.refresh(cl_client)
+    except Exception as error:
+        logger.error(
+            {
+                "msg": "Failed to refresh validator registry snapshot",
+                "error": str(error),
+                "epoch": cl_client.registry.epoch,
+            }
+        )
 
 
 def main():
     """Main bot logic."""
     # Start health server in background thread
     start_health_server(SERVER_PORT)
+    if DEBUG_SERVER_PORT:
+        start_debug_server(DEBUG_SERVER_HOST, DEBUG_SERVER_PORT)
     start_http_server(PROMETHEUS_PORT)
 
     logger.info(
@@ -81,11 +254,15 @@ def main():
     )
     web3_multi_provider.init_metrics(MetricsConfig(namespace=PROMETHEUS_PREFIX))
 
-    w3 = create_web3(WEB3_RPC_ENDPOINTS)
-    cl_client = create_cl_client(CL_RPC_ENDPOINTS)
+    # Held until the process exits
+    _data_dir_lock = lock_data_dir()
+    cassette = create_cassette()
+    w3 = create_web3(WEB3_RPC_ENDPOINTS, cassette)
+    cl_client = create_cl_client(CL_RPC_ENDPOINTS, cassette)
 
     # Initialize TriggerExitBot
-    bot = TriggerExitBot(w3, cl_client)
+    sharding = create_sharding()
+    bot = TriggerExitBot(w3, cl_client, sharding)
     logger.info({"msg": "TriggerExitBot initialized"})
 
     # Track last processed block
@@ -94,11 +271,13 @@ def main():
     try:
         while True:
             pulse()
-            if ACCOUNT:
-                balance = w3.eth.get_balance(ACCOUNT.address)
-                metrics.ACCOUNT_BALANCE.labels(ACCOUNT.address, w3.eth.chain_id).set(
+            start_cycle()
+            for account in ACCOUNTS:
+                balance = w3.eth.get_balance(account.address)
+                metrics.ACCOUNT_BALANCE.labels(account.address, w3.eth.chain_id).set(
                     balance
                 )
+            refresh_validator_registry(cl_client)
             logger.info({"msg": "Running bot cycle"})
             # Always use 'finalized' as to_block
             finalized_block = w3.eth.get_block("finalized").get("number")
@@ -106,7 +285,7 @@ def main():
                 raise RuntimeError("Finalized block must have a number")
 
             # Determine from_block
-            if last_processed_block is None:
+            if bot.next_block is None:
                 # Approximate blocks in lookback period (12 seconds per block average)
                 blocks_per_day = 24 * 60 * 60 // SLOT_TIME
                 lookback_blocks = LOOKBACK_DAYS * blocks_per_day
@@ -122,28 +301,40 @@ def main():
                     }
                 )
             else:
-                # Subsequent runs: continue from last processed block
-                from_block = last_processed_block + 1
+                # Subsequent runs: continue from the bot event cursor
+                from_block = bot.next_block
                 logger.info(
                     {
                         "msg": "Continuing from last processed block",
                         "from_block": from_block,
                     }
                 )
+            if cassette is not None and cassette.recording:
+                cassette.record_cycle(from_block, finalized_block)
             # Fetch and process ExitDataProcessing events
             cycle_start_time = time.time()
             try:
-                events = bot.trigger_exits(
-                    from_block=from_block, to_block=finalized_block
+                with cycle_profiler.cycle():
+                    events = bot.trigger_exits(
+                        from_block=from_block,
+                        to_block=finalized_block,
+                        budget=WorkBudget(
+                            CYCLE_BUDGET_SECONDS, CYCLE_BUDGET_RPC_REQUESTS
+                        ),
+                    )
+                last_processed_block = (
+                    bot.next_block - 1 if bot.next_block is not None else None
                 )
-                last_processed_block = finalized_block
 
                 cycle_duration = time.time() - cycle_start_time
                 BOT_CYCLE_DURATION.labels(status="success").observe(cycle_duration)
-                LAST_PROCESSED_BLOCK.labels(chain_id=w3.eth.chain_id).set(
-                    last_processed_block
-                )
+                if last_processed_block is not None:
+                    LAST_PROCESSED_BLOCK.labels(chain_id=w3.eth.chain_id).set(
+                        last_processed_block
+                    )
 
+                cycle_summary = finish_cycle()
+                update_status(last_successful_cycle_at=time.time())
                 logger.info(
                     {
                         "msg": "Bot cycle completed",
@@ -152,7 +343,11 @@ def main():
                         "to_block": finalized_block,
                         "last_processed_block": last_processed_block,
                         "cycle_duration_seconds": cycle_duration,
-                        "sleeping_for_seconds": SLEEP_INTERVAL_SECONDS,
+                        "pending_work": bot.pending_work,
+                        "sleeping_for_seconds": 0
+                        if bot.pending_work
+                        else SLEEP_INTERVAL_SECONDS,
+                        **cycle_summary,
                     }
                 )
             except Exception as e:
@@ -161,6 +356,7 @@ def main():
 
                 error_type = type(e).__name__
                 UNEXPECTED_EXCEPTIONS.labels(type=error_type).inc()
+                cycle_summary = finish_cycle()
                 logger.error(
                     {
                         "msg": "Error triggering exits",
@@ -169,12 +365,26 @@ def main():
                         "from_block": from_block,
                         "to_block": finalized_block,
                         "cycle_duration_seconds": cycle_duration,
+                        **cycle_summary,
                     },
                     exc_info=True,
                 )
-            time.sleep(SLEEP_INTERVAL_SECONDS)
+
+            update_status(
+                last_cycle_duration_seconds=round(cycle_duration, 3),
+                last_cycle_stages_seconds=cycle_summary["stages_seconds"],
+                last_cycle_rpc_requests_total=cycle_summary["rpc_requests_total"],
+                last_processed_block=last_processed_block,
+                finalized_block=finalized_block,
+                pending_transactions=w3.transaction.pending_transactions,
+                **bot.get_state_summary(),
+            )
+            # Work left by the budget is resumed right away
+            if not bot.pending_work:
+                time.sleep(SLEEP_INTERVAL_SECONDS)
     except KeyboardInterrupt:
         logger.info({"msg": "Shutting down bot..."})
+        sharding.release()
 
 
 if __name__ == "__main__":
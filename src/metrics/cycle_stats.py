@@ -0,0 +1,152 @@
+"""
+Per-cycle instrumentation: stage timings and RPC request counts.
+
+Stages are measured with the `stage` context manager and exported to the
+STAGE_DURATION histogram. RPC requests are counted by layer, method and endpoint.
+Both are also accumulated for the current bot cycle, so the main loop can log a
+single summary line and export per-cycle RPC counts when the cycle ends.
+
+WorkBudget limits the work done in one cycle by the same clock and RPC counters.
+"""
+
+import re
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+from urllib.parse import urlparse
+
+import requests
+
+from src.metrics.metrics import CYCLE_RPC_REQUESTS, STAGE_DURATION
+
+# Validator ids (index or pubkey) in beacon API paths are replaced to keep labels bounded
+_CL_VALIDATOR_ID = re.compile(r"/validators/(0x[0-9a-fA-F]+|\d+)")
+
+
+class CycleStats:
+    """Stage timings and RPC counts collected during a single bot cycle."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self.stage_seconds: dict[str, float] = defaultdict(float)
+        self.stage_calls: dict[str, int] = defaultdict(int)
+        # (layer, method, endpoint) -> requests count
+        self.rpc_requests: dict[tuple[str, str, str], int] = defaultdict(int)
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stage_seconds[name] += seconds
+            self.stage_calls[name] += 1
+
+    def add_rpc_request(self, layer: str, method: str, endpoint: str) -> None:
+        with self._lock:
+            self.rpc_requests[(layer, method, endpoint)] += 1
+
+    @property
+    def rpc_requests_total(self) -> int:
+        with self._lock:
+            return sum(self.rpc_requests.values())
+
+    def summary(self) -> dict[str, Any]:
+        """Breakdown of the cycle suitable for a structured log line."""
+        with self._lock:
+            rpc: dict[str, dict[str, int]] = defaultdict(dict)
+            for (layer, method, endpoint), count in self.rpc_requests.items():
+                rpc[f"{layer}:{endpoint}"][method] = count
+            return {
+                "stages_seconds": {
+                    name: round(seconds, 4)
+                    for name, seconds in self.stage_seconds.items()
+                },
+                "stages_calls": dict(self.stage_calls),
+                "rpc_requests": dict(rpc),
+                "rpc_requests_total": sum(self.rpc_requests.values()),
+            }
+
+
+_current_cycle = CycleStats()
+_exported_rpc_labels: set[tuple[str, str, str]] = set()
+
+
+def start_cycle() -> CycleStats:
+    """Reset counters at the beginning of a bot cycle."""
+    global _current_cycle
+    _current_cycle = CycleStats()
+    return _current_cycle
+
+
+def current_cycle() -> CycleStats:
+    return _current_cycle
+
+
+def finish_cycle() -> dict[str, Any]:
+    """Export per-cycle RPC counts and return the cycle summary."""
+    cycle = _current_cycle
+    with cycle._lock:
+        requests = dict(cycle.rpc_requests)
+
+    # Labels not seen in this cycle are reset, so the gauge always reflects the last cycle
+    for labels in _exported_rpc_labels - requests.keys():
+        CYCLE_RPC_REQUESTS.labels(*labels).set(0)
+    for labels, count in requests.items():
+        CYCLE_RPC_REQUESTS.labels(*labels).set(count)
+    _exported_rpc_labels.update(requests.keys())
+
+    return cycle.summary()
+
+
+class WorkBudget:
+    """
+    Wall-clock time and RPC requests allowed for the work of one bot cycle.
+
+    0 means no limit. RPC requests are counted in the current cycle stats, so the
+    budget must be created after `start_cycle`.
+    """
+
+    def __init__(self, seconds: float = 0, rpc_requests: int = 0):
+        self.seconds = seconds
+        self.rpc_requests = rpc_requests
+        self.started_at = time.monotonic()
+        self._rpc_requests_at_start = _current_cycle.rpc_requests_total
+
+    def exhausted(self) -> bool:
+        if self.seconds and time.monotonic() - self.started_at >= self.seconds:
+            return True
+        return bool(
+            self.rpc_requests
+            and _current_cycle.rpc_requests_total - self._rpc_requests_at_start
+            >= self.rpc_requests
+        )
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Measure a bot stage. Nested and repeated stages are accumulated per cycle."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_DURATION.labels(stage=name).observe(elapsed)
+        _current_cycle.add_stage(name, elapsed)
+
+
+def count_rpc_request(layer: str, method: str, endpoint: str) -> None:
+    _current_cycle.add_rpc_request(layer, method, endpoint)
+
+
+def endpoint_label(url: str) -> str:
+    """Host part of the endpoint URL. Paths and credentials often contain API keys."""
+    parsed = urlparse(url)
+    return parsed.hostname or "unknown"
+
+
+def count_cl_response(response: requests.Response, *args: Any, **kwargs: Any) -> None:
+    """`requests` response hook counting beacon node requests by route."""
+    url = urlparse(response.request.url or "")
+    route = _CL_VALIDATOR_ID.sub("/validators/{validator_id}", url.path)
+    count_rpc_request("cl", route, url.hostname or "unknown")
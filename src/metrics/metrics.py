@@ -27,18 +27,97 @@ ACCOUNT_BALANCE = Gauge(
     namespace=PROMETHEUS_PREFIX,
 )
 
+ACCESS_LISTS = Counter(
+    "access_lists",
+    "Access lists generated for sent transactions",
+    ["result"],  # attached, not_lower, failed
+    namespace=PROMETHEUS_PREFIX,
+)
+
+ACCESS_LIST_GAS_SAVED = Histogram(
+    "access_list_gas_saved",
+    "Estimated gas saved per transaction by the attached access list",
+    namespace=PROMETHEUS_PREFIX,
+    buckets=(100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000),
+)
+
+SIGNERS = Gauge(
+    "signers",
+    "Signer accounts by state",
+    ["state"],  # available, busy, stuck, low_funds
+    namespace=PROMETHEUS_PREFIX,
+)
 
 EVENTS_PROCESSED = Counter(
     "exit_events_processed",
     "Number of ExitDataProcessing events processed",
-    ["status"],  # success, failed, skipped
+    ["status"],  # success, skipped, known, quarantined
+    namespace=PROMETHEUS_PREFIX,
+)
+
+VALIDATOR_STATUS_LOOKUPS = Counter(
+    "validator_status_lookups",
+    "Validator status checks, resolved or reused from another payload in the same cycle",
+    ["check", "result"],  # check: cl, nor; result: resolved, reused
+    namespace=PROMETHEUS_PREFIX,
+)
+
+SHARD_ID = Gauge(
+    "shard_id",
+    "Shard owned by the instance, -1 if none",
+    namespace=PROMETHEUS_PREFIX,
+)
+
+SHARD_LEASE_EVENTS = Counter(
+    "shard_lease_events",
+    "Shard lease changes of the instance",
+    ["event"],  # acquired, taken_over, lost
+    namespace=PROMETHEUS_PREFIX,
+)
+
+VALIDATOR_REGISTRY_EPOCH = Gauge(
+    "validator_registry_epoch",
+    "Epoch of the validator registry snapshot",
+    namespace=PROMETHEUS_PREFIX,
+)
+
+VALIDATOR_REGISTRY_SIZE = Gauge(
+    "validator_registry_validators",
+    "Validators in the validator registry snapshot",
+    namespace=PROMETHEUS_PREFIX,
+)
+
+TRACKED_PAYLOADS = Gauge(
+    "tracked_payloads",
+    "Number of payloads with validators not exited yet",
+    namespace=PROMETHEUS_PREFIX,
+)
+
+TRACKED_VALIDATORS = Gauge(
+    "tracked_validators",
+    "Number of validators not exited yet across tracked payloads",
+    namespace=PROMETHEUS_PREFIX,
+)
+
+TRACKED_PAYLOAD_BYTES = Gauge(
+    "tracked_payload_bytes",
+    "Raw exit requests data of tracked payloads",
+    ["location"],  # memory, disk
+    namespace=PROMETHEUS_PREFIX,
+)
+
+DEAD_LETTERS = Gauge(
+    "dead_letter_events",
+    "Number of events that failed to process and wait for a retry",
     namespace=PROMETHEUS_PREFIX,
 )
 
 VALIDATORS_CHECKED = Gauge(
     "validators_checked",
     "Current number of validators in each check status",
-    ["module_id", "status"],  # already_exited, needs_exit, not_reported, skipped_module
+    # already_exited, needs_exit, triggered_elsewhere, not_reported, skipped_module,
+    # other_shard
+    ["module_id", "status"],
     namespace=PROMETHEUS_PREFIX,
 )
 
@@ -64,6 +143,98 @@ BOT_CYCLE_DURATION = Histogram(
     buckets=(0.5, 1, 2, 5, 10, 30, 60, 120, 300),
 )
 
+STAGE_DURATION = Histogram(
+    "stage_duration_seconds",
+    "Duration of a single bot stage execution in seconds",
+    # log_scan, tx_fetch, decode, cl_check, nor_check, simulation, send, receipt_wait,
+    # registry_refresh
+    ["stage"],
+    namespace=PROMETHEUS_PREFIX,
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 120),
+)
+
+PIPELINE_QUEUE_DEPTH = Gauge(
+    "pipeline_queue_depth",
+    "Items waiting in the queue of a bot pipeline stage",
+    ["stage"],  # decode, check, plan, submit
+    namespace=PROMETHEUS_PREFIX,
+)
+
+PIPELINE_BACKPRESSURE = Counter(
+    "pipeline_backpressure_seconds",
+    "Time spent waiting for room in the full queue of a bot pipeline stage",
+    ["stage"],
+    namespace=PROMETHEUS_PREFIX,
+)
+
+CYCLE_BUDGET_EXHAUSTED = Counter(
+    "cycle_budget_exhausted",
+    "Number of cycles stopped by the work budget, with the stage left unfinished",
+    ["stage"],  # payloads, events
+    namespace=PROMETHEUS_PREFIX,
+)
+
+CYCLE_RPC_REQUESTS = Gauge(
+    "cycle_rpc_requests",
+    "Number of RPC requests made during the last bot cycle",
+    ["layer", "method", "endpoint"],
+    namespace=PROMETHEUS_PREFIX,
+)
+
+DISK_CACHE_REQUESTS = Counter(
+    "disk_cache_requests",
+    "Requests for immutable chain data looked up in the disk cache",
+    ["method", "result"],  # hit, miss
+    namespace=PROMETHEUS_PREFIX,
+)
+
+DISK_CACHE_SIZE = Gauge(
+    "disk_cache_size_bytes",
+    "Size of the entries stored in the disk cache",
+    namespace=PROMETHEUS_PREFIX,
+)
+
+DISK_CACHE_EVICTIONS = Counter(
+    "disk_cache_evictions",
+    "Number of disk cache entries evicted to stay within the size limit",
+    namespace=PROMETHEUS_PREFIX,
+)
+
+EL_ENDPOINT_REQUESTS = Counter(
+    "el_endpoint_requests",
+    "EL requests by endpoint and routing",
+    ["endpoint", "route", "result"],  # route: read, pinned; result: success, error
+    namespace=PROMETHEUS_PREFIX,
+)
+
+EL_ENDPOINT_LATENCY = Gauge(
+    "el_endpoint_latency_seconds",
+    "Moving average of EL request duration used for routing",
+    ["endpoint"],
+    namespace=PROMETHEUS_PREFIX,
+)
+
+RPC_RATE_LIMIT_WAIT = Counter(
+    "rpc_rate_limit_wait_seconds",
+    "Time spent waiting for the endpoint rate limit",
+    ["layer", "endpoint"],
+    namespace=PROMETHEUS_PREFIX,
+)
+
+RPC_THROTTLED = Counter(
+    "rpc_throttled_responses",
+    "EL and CL responses with a throttling (429) or transient server error status",
+    ["layer", "endpoint", "status"],
+    namespace=PROMETHEUS_PREFIX,
+)
+
+RPC_RETRIES = Counter(
+    "rpc_retries",
+    "EL and CL requests retried after backoff",
+    ["layer"],
+    namespace=PROMETHEUS_PREFIX,
+)
+
 PENDING_VALIDATORS = Gauge(
     "pending_validators",
     "Number of validators pending exit trigger (reported but not exited)",
@@ -0,0 +1,150 @@
+"""
+Raw exit requests data of tracked payloads, within a memory budget.
+
+The raw bytes are needed only to build a trigger_exits transaction, while a payload may
+be tracked for days until its validators exit. Payloads over the memory budget are
+spilled to files, least recently used first, and read back when a transaction is built.
+Spilled files belong to the running process: the state they complement is in memory,
+so files left by a previous run are removed on start.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Optional
+
+import structlog
+
+from src.metrics.metrics import TRACKED_PAYLOAD_BYTES
+
+logger = structlog.get_logger(__name__)
+
+
+class PayloadStore:
+    """
+    Mapping of exitRequestsHash -> raw exit requests data.
+
+    Args:
+        spill_dir: Directory for payloads over the budget
+        memory_budget: Bytes kept in memory, 0 means no limit
+    """
+
+    def __init__(self, spill_dir: Path, memory_budget: int):
+        self.spill_dir = spill_dir
+        self.memory_budget = memory_budget
+        self._lock = threading.Lock()
+        # Least recently used first
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        # Data key -> size of the spilled payload
+        self._spilled: dict[str, int] = {}
+        self._remove_stale_files()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._memory) + len(self._spilled)
+
+    def __contains__(self, data_key: object) -> bool:
+        with self._lock:
+            return data_key in self._memory or data_key in self._spilled
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter([*self._memory, *self._spilled])
+
+    def __getitem__(self, data_key: str) -> bytes:
+        data = self.get(data_key)
+        if data is None:
+            raise KeyError(data_key)
+        return data
+
+    def __setitem__(self, data_key: str, data: bytes) -> None:
+        with self._lock:
+            self._discard(data_key)
+            self._memory[data_key] = data
+            self._memory_bytes += len(data)
+            self._spill_over_budget()
+            self._export()
+
+    def get(self, data_key: str, default: Optional[bytes] = None) -> Optional[bytes]:
+        """Payload bytes, spilled payloads are read back into memory."""
+        with self._lock:
+            data = self._memory.get(data_key)
+            if data is not None:
+                self._memory.move_to_end(data_key)
+                return data
+            if data_key not in self._spilled:
+                return default
+            try:
+                data = self._path(data_key).read_bytes()
+            except OSError as error:
+                logger.error(
+                    {
+                        "msg": "Failed to read spilled payload.",
+                        "data_hash": data_key,
+                        "error": str(error),
+                    }
+                )
+                return default
+            self._unlink(data_key)
+            self._memory[data_key] = data
+            self._memory_bytes += len(data)
+            self._spill_over_budget(keep=data_key)
+            self._export()
+            return data
+
+    def remove(self, data_key: str) -> None:
+        with self._lock:
+            self._discard(data_key)
+            self._export()
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return self._memory_bytes
+
+    def spilled_bytes(self) -> int:
+        with self._lock:
+            return sum(self._spilled.values())
+
+    def _path(self, data_key: str) -> Path:
+        return self.spill_dir / f"{data_key}.bin"
+
+    def _discard(self, data_key: str) -> None:
+        data = self._memory.pop(data_key, None)
+        if data is not None:
+            self._memory_bytes -= len(data)
+        if data_key in self._spilled:
+            self._unlink(data_key)
+
+    def _unlink(self, data_key: str) -> None:
+        del self._spilled[data_key]
+        self._path(data_key).unlink(missing_ok=True)
+
+    def _spill_over_budget(self, keep: Optional[str] = None) -> None:
+        if not self.memory_budget:
+            return
+        for data_key in list(self._memory):
+            if self._memory_bytes <= self.memory_budget:
+                return
+            if data_key == keep:
+                continue
+            data = self._memory[data_key]
+            try:
+                self.spill_dir.mkdir(parents=True, exist_ok=True)
+                self._path(data_key).write_bytes(data)
+            except OSError as error:
+                # Kept in memory, over the budget rather than lost
+                logger.error({"msg": "Failed to spill payload.", "error": str(error)})
+                return
+            del self._memory[data_key]
+            self._memory_bytes -= len(data)
+            self._spilled[data_key] = len(data)
+
+    def _remove_stale_files(self) -> None:
+        for path in self.spill_dir.glob("*.bin"):
+            path.unlink(missing_ok=True)
+
+    def _export(self) -> None:
+        TRACKED_PAYLOAD_BYTES.labels(location="memory").set(self._memory_bytes)
+        TRACKED_PAYLOAD_BYTES.labels(location="disk").set(sum(self._spilled.values()))
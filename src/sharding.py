@@ -0,0 +1,208 @@
+"""
+Sharding of the bot work across instances.
+
+Every instance owns one of SHARD_COUNT shards and checks and triggers only the
+validators of its shard: validators of staking modules with module_id % SHARD_COUNT
+equal to the shard id, or whole payloads by exitRequestsHash. Events are still ingested
+by all instances, so a shard can be taken over with warm state. With module sharding
+every instance still drops exited validators of other shards, so payloads spanning
+several shards are retired everywhere once all their validators exited.
+
+The shard is either fixed (SHARD_ID) or leased from a directory shared by the
+instances. A lease is renewed at the start of every cycle and before every submission.
+A lease is taken over only after it expired, and its owner stops submitting as soon as
+it can't renew it, so two instances never trigger exits of the same shard at the same
+time. The lease TTL must exceed the time a sent transaction waits for inclusion.
+"""
+
+import fcntl
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Optional
+
+import structlog
+
+from src.metrics.metrics import SHARD_ID, SHARD_LEASE_EVENTS
+
+logger = structlog.get_logger(__name__)
+
+SHARD_KEY_MODULE = "module"
+SHARD_KEY_PAYLOAD = "payload"
+
+
+class ShardLease:
+    """
+    Lease of one shard, kept as a file in a directory shared by the instances.
+
+    Lease files are read and written under an exclusive lock of the directory, so
+    instances acquiring shards at the same time never get the same one.
+    """
+
+    def __init__(
+        self, lease_dir: Path, shard_count: int, instance_id: str, ttl_seconds: float
+    ):
+        self.lease_dir = lease_dir
+        self.shard_count = shard_count
+        self.instance_id = instance_id
+        self.ttl_seconds = ttl_seconds
+        self.shard_id: Optional[int] = None
+
+    def _path(self, shard_id: int) -> Path:
+        return self.lease_dir / f"shard-{shard_id}.json"
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        self.lease_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.lease_dir / ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self, shard_id: int) -> Optional[dict[str, Any]]:
+        try:
+            with open(self._path(shard_id)) as lease_file:
+                return json.load(lease_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as error:
+            logger.warning({"msg": "Failed to read shard lease.", "error": str(error)})
+            return None
+
+    def _write(self, shard_id: int) -> None:
+        path = self._path(shard_id)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as lease_file:
+            json.dump(
+                {
+                    "owner": self.instance_id,
+                    "expires_at": time.time() + self.ttl_seconds,
+                },
+                lease_file,
+            )
+        os.replace(tmp_path, path)
+
+    def refresh(self) -> Optional[int]:
+        """
+        Renew the held lease or acquire a free or expired one.
+
+        Returns:
+            Shard id held by the instance, None if all shards are leased by others
+        """
+        with self._locked():
+            if self.shard_id is not None:
+                lease = self._read(self.shard_id)
+                if lease is not None and lease["owner"] == self.instance_id:
+                    self._write(self.shard_id)
+                    return self.shard_id
+                logger.error(
+                    {
+                        "msg": "Shard lease lost",
+                        "shard_id": self.shard_id,
+                        "owner": lease and lease["owner"],
+                    }
+                )
+                SHARD_LEASE_EVENTS.labels(event="lost").inc()
+                self.shard_id = None
+
+            now = time.time()
+            for shard_id in range(self.shard_count):
+                lease = self._read(shard_id)
+                if lease is not None and lease["expires_at"] > now:
+                    continue
+                self._write(shard_id)
+                self.shard_id = shard_id
+                event = "acquired" if lease is None else "taken_over"
+                SHARD_LEASE_EVENTS.labels(event=event).inc()
+                logger.info(
+                    {
+                        "msg": "Shard lease acquired",
+                        "shard_id": shard_id,
+                        "previous_owner": lease and lease["owner"],
+                    }
+                )
+                return shard_id
+        return None
+
+    def release(self) -> None:
+        """Give the shard up, so another instance takes it without waiting for expiry."""
+        if self.shard_id is None:
+            return
+        with self._locked():
+            lease = self._read(self.shard_id)
+            if lease is not None and lease["owner"] == self.instance_id:
+                self._path(self.shard_id).unlink(missing_ok=True)
+        self.shard_id = None
+
+
+class Sharding:
+    """
+    Work owned by this instance.
+
+    Args:
+        shard_count: Number of shards, 1 disables sharding
+        shard_id: Fixed shard of the instance, None to lease one
+        key: Shard validators by staking module or whole payloads by exitRequestsHash
+        lease: Lease of the shard, required without a fixed shard id
+    """
+
+    def __init__(
+        self,
+        shard_count: int = 1,
+        shard_id: Optional[int] = None,
+        key: str = SHARD_KEY_MODULE,
+        lease: Optional[ShardLease] = None,
+    ):
+        if key not in (SHARD_KEY_MODULE, SHARD_KEY_PAYLOAD):
+            raise ValueError(f"Unknown shard key: {key}")
+        if shard_count > 1 and shard_id is None and lease is None:
+            raise ValueError("Shard id or shard lease is required")
+        self.shard_count = shard_count
+        self.key = key
+        self.lease = lease
+        self.shard_id = shard_id if shard_count > 1 else 0
+        # Leases are renewed by submit workers while check workers read the shard id
+        self._lock = threading.RLock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.shard_count > 1
+
+    def refresh(self) -> Optional[int]:
+        """Renew or acquire the shard lease, called at the start of every cycle."""
+        with self._lock:
+            if self.lease is not None:
+                self.shard_id = self.lease.refresh()
+            SHARD_ID.set(-1 if self.shard_id is None else self.shard_id)
+            return self.shard_id
+
+    def _owns(self, value: int) -> bool:
+        with self._lock:
+            shard_id = self.shard_id
+        return shard_id is not None and value % self.shard_count == shard_id
+
+    def owns_module(self, module_id: int) -> bool:
+        return self.key != SHARD_KEY_MODULE or self._owns(module_id)
+
+    def owns_payload(self, data_key: str) -> bool:
+        return self.key != SHARD_KEY_PAYLOAD or self._owns(int(data_key[:16], 16))
+
+    def can_submit(self) -> bool:
+        """Renew the lease right before a submission, False if the shard is lost."""
+        with self._lock:
+            shard_id = self.shard_id
+            if self.lease is None or shard_id is None:
+                return shard_id is not None
+            # A lost lease may be replaced by another shard, the planned work is not its
+            return self.refresh() == shard_id
+
+    def release(self) -> None:
+        with self._lock:
+            if self.lease is not None:
+                self.lease.release()
@@ -1,9 +1,14 @@
-from hashlib import sha256
-from typing import Any, Optional, cast
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, cast
 
 import structlog
+from eth_abi.abi import encode
 from eth_typing import Hash32, HexStr
-from web3.types import BlockIdentifier, TxData, TxReceipt, Wei
+from hexbytes import HexBytes
+from web3.contract.contract import ContractFunction
+from web3.types import BlockIdentifier, EventData, TxData, TxReceipt, Wei
 
 from src import variables
 from src.blockchain.contracts.validator_exit_bus_oracle import (
@@ -11,61 +16,150 @@ from src.blockchain.contracts.validator_exit_bus_oracle import (
 )
 from src.blockchain.typings import Web3
 from src.blockchain.web3_extentions.transaction import TransactionUtils
+from src.dead_letters import DeadLetters
+from src.event_cursor import EventCursor
+from src.metrics.cycle_stats import WorkBudget, stage
 from src.metrics.metrics import (
+    CYCLE_BUDGET_EXHAUSTED,
     EVENTS_PROCESSED,
     PENDING_VALIDATORS,
+    TRACKED_PAYLOADS,
+    TRACKED_VALIDATORS,
+    VALIDATOR_STATUS_LOOKUPS,
     VALIDATORS_CHECKED,
     VALIDATORS_TRIGGERED,
 )
+from src.payload_store import PayloadStore
+from src.sharding import Sharding
 from src.utils.cl_client import CLClient
 from src.utils.exit_data_decoder import decode_all_validators
+from src.utils.logs import log_sampled
+from src.utils.pipeline import Pipeline
 
 logger = structlog.get_logger(__name__)
 
 
+def _pubkey_hex(validator: dict[str, Any]) -> HexStr:
+    pubkey = validator["pubkey"]
+    return HexStr(pubkey.hex() if isinstance(pubkey, bytes) else pubkey)
+
+
+@dataclass
+class TriggerPlan:
+    """trigger_exits transaction checked locally and ready to be sent."""
+
+    data_key: str
+    tx_function: ContractFunction
+    value: Wei
+    validators: list[dict[str, Any]]
+
+
 class TriggerExitBot:
-    def __init__(self, w3: Web3, cl_client: CLClient):
+    def __init__(
+        self, w3: Web3, cl_client: CLClient, sharding: Optional[Sharding] = None
+    ):
         self.w3 = w3
         self.cl_client = cl_client
+        # Work owned by this instance, everything without sharding
+        self.sharding = sharding or Sharding()
         # Store mapping of exit_requests_data hash -> list of validators
-        # Key is SHA256 hash of the data, value is list of validator dicts
+        # Key is the on-chain exitRequestsHash, value is list of validator dicts
         self.validators_map: dict[str, list[dict[str, Any]]] = {}
         # Store mapping of exit_requests_data hash -> data_format
         self.data_format_map: dict[str, int] = {}
         # Store mapping of hash -> original bytes data (for transaction building)
-        self.data_bytes_map: dict[str, bytes] = {}
+        # Kept within PAYLOAD_MEMORY_BUDGET_BYTES, cold payloads are spilled to disk
+        self.data_bytes_map = PayloadStore(
+            variables.DATA_DIR / "payloads", variables.PAYLOAD_MEMORY_BUDGET_BYTES
+        )
+        # Payloads with all validators exited, their events need no processing
+        self.retired_payloads: set[str] = set()
+        # Validator pubkey -> {exitRequestsHash: exit data index} of payloads with it
+        self.validator_index: dict[str, dict[str, int]] = {}
+        # Validator statuses resolved by the current trigger_exits call
+        self._cycle_statuses: dict[tuple[Any, ...], Future] = {}
+        # Validator pubkey -> payload triggering its exit in the current call
+        self._trigger_claims: dict[str, str] = {}
+        # Validator pubkey -> (payload, validator) skipped for the claim, in check order
+        self._trigger_waiters: dict[str, list[tuple[str, dict[str, Any]]]] = {}
+        # Number of validators to trigger found by the last check of each payload
+        self.triggerable_counts: dict[str, int] = {}
+        # Order of the last check of each payload, lower was checked earlier
+        self.payload_checked_at: dict[str, int] = {}
+        self._check_sequence = 0
+        # Event cursor, events before this block are processed. Persisted with the
+        # events of tracked payloads, so a restart does not rescan the lookback range
+        self.cursor = EventCursor(variables.DATA_DIR / "event_cursor.json")
+        self.next_block: Optional[int] = self.cursor.next_block
+        # Events of payloads tracked before a restart, not reloaded yet
+        self._restored_events = [
+            payload_event.to_event()
+            for payload_event in self.cursor.payload_events.values()
+        ]
+        # Set if the last trigger_exits call stopped on the work budget
+        self.pending_work = False
+        # Guards payload state shared by pipeline workers
+        self._state_lock = threading.RLock()
+        # Events that failed to process, retried with backoff
+        self.dead_letters = DeadLetters(
+            variables.DATA_DIR / "dead_letters.json",
+            variables.DEAD_LETTER_RETRY_SECONDS,
+        )
         self.vebo = cast(
             ValidatorExitBusOracleContract, self.w3.lido.validator_exit_bus_oracle
         )
         self.transaction_utils = cast(TransactionUtils, self.w3.transaction)
 
-    def _get_data_key(self, data: bytes | str) -> str:
+    def _get_data_key(self, data: bytes | str, data_format: int) -> str:
         """
-        Generate a consistent hash key for exit requests data.
+        Generate the hash key for exit requests data.
+
+        The key is computed the same way as exitRequestsHash in VEBO,
+        keccak256(abi.encode(data, dataFormat)), so payloads can be looked up
+        by ExitDataProcessing events without fetching the transaction.
 
         Args:
             data: Either bytes or hex string of the data
+            data_format: Data format identifier
 
         Returns:
-            SHA256 hash as hex string (64 characters instead of potentially thousands)
+            Hash as hex string without 0x prefix
         """
         if isinstance(data, str):
             # If it's already a hex string, convert to bytes first
-            data = bytes.fromhex(data)
-        return sha256(data).hexdigest()
+            data = bytes.fromhex(data.removeprefix("0x"))
+        return Web3.keccak(encode(["bytes", "uint256"], [data, data_format])).hex()
+
+    def _get_receipts(self, events: list[EventData]) -> dict[HexBytes, TxReceipt]:
+        """
+        Get receipts of the event transactions.
+
+        Transactions are grouped by block, so the number of requests depends on the
+        number of distinct blocks rather than events.
+
+        Returns:
+            Mapping of transaction hash -> transaction receipt
+        """
+        tx_hashes_by_block: dict[int, list[HexBytes]] = {}
+        for event in events:
+            tx_hashes_by_block.setdefault(event["blockNumber"], []).append(
+                HexBytes(event["transactionHash"])
+            )
+        with stage("tx_fetch"):
+            return self.w3.receipts.get_receipts(tx_hashes_by_block)
 
     def _get_transaction_data(
-        self, tx_hash: Hash32
+        self, tx_hash: Hash32, receipts: dict[HexBytes, TxReceipt]
     ) -> tuple[Optional[TxData], Optional[TxReceipt]]:
         """
         Get transaction data and receipt for a given transaction hash.
 
         Returns:
-            Tuple of (transaction_data, transaction_receipt) or (None, None) if failed
+            Tuple of (transaction_data, transaction_receipt), None if not found
         """
-        tx = self.w3.eth.get_transaction(tx_hash)
-        tx_receipt = self.w3.eth.get_transaction_receipt(tx_hash)
-        return tx, tx_receipt
+        with stage("tx_fetch"):
+            tx = self.w3.eth.get_transaction(tx_hash)
+        return tx, receipts.get(HexBytes(tx_hash))
 
     def _decode_transaction_input(
         self, input_data: HexStr
@@ -96,15 +190,161 @@ class TriggerExitBot:
         return None, None
 
     def trigger_exits(
-        self, from_block: BlockIdentifier = 0, to_block: BlockIdentifier = "latest"
+        self,
+        from_block: BlockIdentifier = 0,
+        to_block: BlockIdentifier = "latest",
+        budget: Optional[WorkBudget] = None,
     ):
         """
         Fetch and process ExitDataProcessing events from VEBO.
 
+        Work is done in priority order until the budget is exhausted:
+        1. Payloads that had validators to trigger on their last check
+        2. Payloads tracked before a restart, reloaded from their events
+        3. New events, from the event cursor
+        4. Quarantined events due for a retry
+        5. Remaining payloads, never checked first, then least recently checked
+
+        Whatever is left is resumed by the next call. The event cursor (next_block)
+        is advanced per event, so progress is kept when processing fails halfway.
+        It is saved when the call completes.
+        Events that fail to process are quarantined in the dead-letter set instead of
+        failing the call.
+
+        The work runs in a pipeline of stages with their own workers, connected by
+        bounded queues: tx fetch/decode -> status check -> trigger planning ->
+        submission. Log scan and prioritization feed it from the calling thread.
+        The call returns when all stages are drained.
+
         Args:
             from_block: Starting block number (default: 0)
             to_block: Ending block number (default: 'latest')
+            budget: Work limit of the call (default: no limit)
+
+        Returns:
+            Events processed by this call
         """
+        budget = budget or WorkBudget()
+        self.pending_work = False
+        checked: set[str] = set()
+        self._cycle_statuses = {}
+        self._trigger_claims = {}
+        self._trigger_waiters = {}
+        if self.sharding.enabled and self.sharding.refresh() is None:
+            # Events are still ingested, to take a shard over with warm state
+            logger.warning({"msg": "No shard owned, validators are not checked"})
+
+        with self._build_pipeline(budget, checked) as pipeline:
+            self._check_payloads(pipeline, budget, checked, triggerable_only=True)
+            self._restore_payloads(pipeline, budget)
+            events = self._scan_events(pipeline, budget, from_block, to_block)
+            self._retry_dead_letters(pipeline, budget)
+
+            # After processing events, check and trigger exits for validators in state
+            logger.info(
+                {
+                    "msg": "Processing complete, checking all validators in state",
+                    "state_entries": len(self.validators_map),
+                }
+            )
+            self._check_payloads(pipeline, budget, checked)
+
+        self.cursor.save(self.next_block)
+        # Exports state gauges
+        self.get_state_summary()
+        return events
+
+    def _build_pipeline(self, budget: WorkBudget, checked: set[str]) -> Pipeline:
+        pipeline = Pipeline()
+
+        def decode(item: tuple[EventData, dict[HexBytes, TxReceipt], bool]) -> None:
+            event, receipts, retry = item
+            exit_requests_hash = event["args"]["exitRequestsHash"].hex()
+            try:
+                self._process_event(event, receipts)
+            except Exception as error:
+                self._quarantine(event, error)
+                return
+            if retry:
+                self.dead_letters.remove(exit_requests_hash)
+            with self._state_lock:
+                if exit_requests_hash not in self.validators_map:
+                    return
+                self.cursor.track(event)
+            if budget.exhausted():
+                # Never checked payloads go first in the next call
+                self.pending_work = True
+                return
+            self._queue_check(pipeline, checked, exit_requests_hash)
+
+        def check(data_key: str) -> None:
+            validators_to_trigger = self._check_payload(data_key)
+            if validators_to_trigger:
+                pipeline.stages["plan"].put((data_key, validators_to_trigger))
+            else:
+                logger.info({"msg": "No validators to trigger exits for"})
+
+        def plan(item: tuple[str, list[dict[str, Any]]]) -> None:
+            data_key, validators_to_trigger = item
+            trigger_plan = None
+            try:
+                trigger_plan = self._plan_trigger(data_key, validators_to_trigger)
+            finally:
+                if trigger_plan is None:
+                    # Validators are triggered by the payloads skipped for this one
+                    fallbacks = self._release_claims(
+                        data_key, validators_to_trigger, hand_over=True
+                    )
+                    for fallback in fallbacks.items():
+                        plan(fallback)
+            if trigger_plan is not None:
+                pipeline.stages["submit"].put(trigger_plan)
+
+        # Upstream stages first, see Pipeline
+        pipeline.add_stage(
+            "decode",
+            decode,
+            workers=variables.PIPELINE_WORKERS,
+            queue_size=variables.PIPELINE_QUEUE_SIZE,
+        )
+        pipeline.add_stage(
+            "check",
+            check,
+            workers=variables.PIPELINE_WORKERS,
+            queue_size=variables.PIPELINE_QUEUE_SIZE,
+        )
+        pipeline.add_stage("plan", plan, queue_size=variables.PIPELINE_QUEUE_SIZE)
+        # A sender per signer account, every account sends one transaction at a time
+        pipeline.add_stage(
+            "submit",
+            self._submit_trigger,
+            workers=len(variables.ACCOUNTS),
+            queue_size=variables.PIPELINE_QUEUE_SIZE,
+        )
+        return pipeline
+
+    def _restore_payloads(self, pipeline: Pipeline, budget: WorkBudget) -> None:
+        """Reload payloads tracked before a restart, until the budget is exhausted."""
+        events, self._restored_events = self._restored_events, []
+        if not events:
+            return
+
+        logger.info({"msg": "Reloading tracked payloads", "count": len(events)})
+        receipts = self._get_receipts(events)
+        for i, event in enumerate(events):
+            if budget.exhausted():
+                self._restored_events = events[i:]
+                self._budget_exhausted("restored_payloads", remaining=len(events) - i)
+                return
+            pipeline.stages["decode"].put((event, receipts, False))
+
+    def _scan_events(
+        self,
+        pipeline: Pipeline,
+        budget: WorkBudget,
+        from_block: BlockIdentifier,
+        to_block: BlockIdentifier,
+    ) -> list[EventData]:
         logger.info(
             {
                 "msg": "Starting to fetch ExitDataProcessing events",
@@ -114,9 +354,10 @@ class TriggerExitBot:
         )
 
         # Fetch ExitDataProcessing events from VEBO
-        events = self.vebo.get_exit_data_processing_events(
-            from_block=from_block, to_block=to_block
-        )
+        with stage("log_scan"):
+            events = self.vebo.get_exit_data_processing_events(
+                from_block=from_block, to_block=to_block
+            )
 
         logger.info(
             {
@@ -125,50 +366,105 @@ class TriggerExitBot:
             }
         )
 
-        # Process each event
-        for event in events:
-            exit_requests_hash = event["args"]["exitRequestsHash"]
-            block_number = event["blockNumber"]
-            transaction_hash = Hash32(event["transactionHash"])
+        return self._ingest_events(pipeline, events, budget, to_block)
 
-            logger.info(
-                {
-                    "msg": "Processing ExitDataProcessing event",
-                    "exit_requests_hash": exit_requests_hash.hex(),
-                    "block_number": block_number,
-                    "transaction_hash": transaction_hash,
-                }
-            )
-
-            tx_data, tx_receipt = self._get_transaction_data(transaction_hash)
-
-            if tx_data is None or tx_receipt is None:
-                EVENTS_PROCESSED.labels(status="failed").inc()
-                raise ValueError("Could not get transaction data")
+    def _ingest_events(
+        self,
+        pipeline: Pipeline,
+        events: list[EventData],
+        budget: WorkBudget,
+        to_block: BlockIdentifier,
+    ) -> list[EventData]:
+        """
+        Queue new events for decoding, until the budget is exhausted.
 
-            # Check if transaction was successful
-            if tx_receipt["status"] != 1:
-                logger.warning(
+        Returns:
+            Events queued, the rest is left to the next call
+        """
+        # Payloads already in state need nothing but the event
+        new_events = []
+        new_hashes = set()
+        for event in events:
+            exit_requests_hash = event["args"]["exitRequestsHash"].hex()
+            if exit_requests_hash in self.dead_letters:
+                # Retried with backoff by _retry_dead_letters
+                continue
+            if (
+                exit_requests_hash in self.validators_map
+                or exit_requests_hash in self.retired_payloads
+                or exit_requests_hash in new_hashes
+            ):
+                logger.info(
                     {
-                        "msg": "Transaction was not successful, skipping",
-                        "transaction_hash": transaction_hash,
-                        "status": tx_receipt["status"],
+                        "msg": "Payload already in state, skipping transaction",
+                        "exit_requests_hash": exit_requests_hash,
+                        "block_number": event["blockNumber"],
                     }
                 )
-                EVENTS_PROCESSED.labels(status="skipped").inc()
+                EVENTS_PROCESSED.labels(status="known").inc()
                 continue
+            new_hashes.add(exit_requests_hash)
+            new_events.append(event)
 
-            logger.info(
+        receipts = self._get_receipts(new_events) if new_events else {}
+
+        for event in new_events:
+            # Events of the same block are cheap to skip once their payload is stored
+            next_block = self.next_block = event["blockNumber"]
+            if budget.exhausted():
+                self._budget_exhausted("events", next_block=next_block)
+                return [e for e in events if e["blockNumber"] < next_block]
+            pipeline.stages["decode"].put((event, receipts, False))
+
+        if isinstance(to_block, int):
+            self.next_block = to_block + 1
+        return events
+
+    def _process_event(
+        self, event: EventData, receipts: dict[HexBytes, TxReceipt]
+    ) -> None:
+        exit_requests_hash = event["args"]["exitRequestsHash"].hex()
+        block_number = event["blockNumber"]
+        transaction_hash = Hash32(event["transactionHash"])
+
+        logger.info(
+            {
+                "msg": "Processing ExitDataProcessing event",
+                "exit_requests_hash": exit_requests_hash,
+                "block_number": block_number,
+                "transaction_hash": transaction_hash,
+            }
+        )
+
+        tx_data, tx_receipt = self._get_transaction_data(transaction_hash, receipts)
+
+        if tx_data is None or tx_receipt is None:
+            raise ValueError("Could not get transaction data")
+
+        # Check if transaction was successful
+        if tx_receipt["status"] != 1:
+            logger.warning(
                 {
-                    "msg": "Transaction was successful",
+                    "msg": "Transaction was not successful, skipping",
                     "transaction_hash": transaction_hash,
+                    "status": tx_receipt["status"],
                 }
             )
+            EVENTS_PROCESSED.labels(status="skipped").inc()
+            return
 
-            # Decode transaction input data
-            tx_input = tx_data.get("input")
-            if tx_input is None:
-                raise ValueError("Transaction data does not contain input")
+        logger.info(
+            {
+                "msg": "Transaction was successful",
+                "transaction_hash": transaction_hash,
+            }
+        )
+
+        # Decode transaction input data
+        tx_input = tx_data.get("input")
+        if tx_input is None:
+            raise ValueError("Transaction data does not contain input")
+        with stage("decode"):
             function_name, decoded_data = self._decode_transaction_input(
                 Web3.to_hex(tx_input)
             )
@@ -177,26 +473,111 @@ class TriggerExitBot:
                 raise ValueError("Could not decode transaction input")
 
             if function_name == "submitReportData":
-                self._process_submit_report_data(decoded_data)
-                EVENTS_PROCESSED.labels(status="success").inc()
-            elif function_name == "submitExitRequestsData":
-                self._process_submit_exit_requests_data(decoded_data)
-                EVENTS_PROCESSED.labels(status="success").inc()
+                self._process_submit_report_data(decoded_data, exit_requests_hash)
+            else:
+                self._process_submit_exit_requests_data(
+                    decoded_data, exit_requests_hash
+                )
+            EVENTS_PROCESSED.labels(status="success").inc()
 
-        # After processing all events, check and trigger exits for ALL validators in state
-        logger.info(
+    def _quarantine(self, event: EventData, error: Exception) -> None:
+        """Put the failed event to the dead-letter set, the range goes on without it."""
+        entry = self.dead_letters.add(event, error)
+        EVENTS_PROCESSED.labels(status="quarantined").inc()
+        logger.error(
             {
-                "msg": "Processing complete, checking all validators in state",
-                "state_entries": len(self.validators_map),
-            }
+                "msg": "Failed to process event, quarantined",
+                "exit_requests_hash": entry.exit_requests_hash,
+                "block_number": entry.block_number,
+                "transaction_hash": entry.transaction_hash,
+                "error": entry.error,
+                "attempts": entry.attempts,
+                "retry_at": int(entry.retry_at),
+            },
+            exc_info=error,
         )
 
-        for data_key in list(self.validators_map.keys()):
-            self._check_and_trigger_exits(data_key)
+    def _retry_dead_letters(self, pipeline: Pipeline, budget: WorkBudget) -> None:
+        """Process quarantined events due for a retry, until the budget is exhausted."""
+        events = []
+        for entry in self.dead_letters.due():
+            if (
+                entry.exit_requests_hash in self.validators_map
+                or entry.exit_requests_hash in self.retired_payloads
+            ):
+                # Stored from another event of the same payload
+                self.dead_letters.remove(entry.exit_requests_hash)
+                continue
+            events.append(entry.to_event())
+        if not events:
+            return
 
-        return events
+        logger.info({"msg": "Retrying quarantined events", "count": len(events)})
+        receipts = self._get_receipts(events)
+        for event in events:
+            if budget.exhausted():
+                self._budget_exhausted("dead_letters")
+                return
+            pipeline.stages["decode"].put((event, receipts, True))
+
+    def _check_payloads(
+        self,
+        pipeline: Pipeline,
+        budget: WorkBudget,
+        checked: set[str],
+        triggerable_only: bool = False,
+    ) -> None:
+        """
+        Queue checks of payloads not checked by this call yet, in priority order.
+
+        Payloads with validators to trigger go first, then payloads never checked,
+        then the least recently checked ones, so checks interrupted by the budget
+        resume with the payloads that were skipped.
+        """
+        with self._state_lock:
+            data_keys = [
+                data_key
+                for data_key in self.validators_map
+                if data_key not in checked
+                and self.sharding.owns_payload(data_key)
+                and (not triggerable_only or self.triggerable_counts.get(data_key))
+            ]
+            data_keys.sort(
+                key=lambda data_key: (
+                    -self.triggerable_counts.get(data_key, 0),
+                    self.payload_checked_at.get(data_key, -1),
+                )
+            )
+        for i, data_key in enumerate(data_keys):
+            if budget.exhausted():
+                self._budget_exhausted("payloads", unchecked=len(data_keys) - i)
+                return
+            self._queue_check(pipeline, checked, data_key)
+
+    def _queue_check(self, pipeline: Pipeline, checked: set[str], data_key: str):
+        """Queue the payload check unless the payload was checked by this call."""
+        with self._state_lock:
+            if data_key in checked:
+                return
+            checked.add(data_key)
+            self._check_sequence += 1
+            self.payload_checked_at[data_key] = self._check_sequence
+        pipeline.stages["check"].put(data_key)
+
+    def _budget_exhausted(self, stage_name: str, **details: Any) -> None:
+        self.pending_work = True
+        CYCLE_BUDGET_EXHAUSTED.labels(stage=stage_name).inc()
+        logger.info(
+            {
+                "msg": "Cycle work budget exhausted, resuming in the next cycle",
+                "stage": stage_name,
+                **details,
+            }
+        )
 
-    def _process_submit_report_data(self, decoded_data: dict[str, Any]) -> None:
+    def _process_submit_report_data(
+        self, decoded_data: dict[str, Any], exit_requests_hash: str
+    ) -> None:
         """Process decoded submitReportData transaction."""
         data_obj = decoded_data.get("data", {})
         exit_requests_data = data_obj.get("data", b"")
@@ -214,21 +595,14 @@ class TriggerExitBot:
             }
         )
         validators = decode_all_validators(exit_requests_data)
-
-        # Generate hash key for efficient storage
-        data_key = self._get_data_key(exit_requests_data)
-        self.validators_map[data_key] = validators
-        self.data_format_map[data_key] = data_format
-        self.data_bytes_map[data_key] = (
-            exit_requests_data
-            if isinstance(exit_requests_data, bytes)
-            else bytes.fromhex(exit_requests_data)
+        self._store_payload(
+            exit_requests_hash, exit_requests_data, data_format, validators
         )
 
         logger.info(
             {
                 "msg": "Stored validators mapping for submitReportData",
-                "data_hash": data_key,
+                "data_hash": exit_requests_hash,
                 "validators_count": len(validators),
             }
         )
@@ -248,7 +622,9 @@ class TriggerExitBot:
                     }
                 )
 
-    def _process_submit_exit_requests_data(self, decoded_data: dict[str, Any]):
+    def _process_submit_exit_requests_data(
+        self, decoded_data: dict[str, Any], exit_requests_hash: str
+    ) -> None:
         """Process decoded submitExitRequestsData transaction."""
         request_obj = decoded_data.get("request", {})
         exit_requests_data = request_obj.get("data", b"")
@@ -264,21 +640,14 @@ class TriggerExitBot:
 
         # Decode all validators from the packed data
         validators = decode_all_validators(exit_requests_data)
-
-        # Generate hash key for efficient storage
-        data_key = self._get_data_key(exit_requests_data)
-        self.validators_map[data_key] = validators
-        self.data_format_map[data_key] = data_format
-        self.data_bytes_map[data_key] = (
-            exit_requests_data
-            if isinstance(exit_requests_data, bytes)
-            else bytes.fromhex(exit_requests_data)
+        self._store_payload(
+            exit_requests_hash, exit_requests_data, data_format, validators
         )
 
         logger.info(
             {
                 "msg": "Stored validators mapping for submitExitRequestsData",
-                "data_hash": data_key,
+                "data_hash": exit_requests_hash,
                 "validators_count": len(validators),
             }
         )
@@ -298,46 +667,248 @@ class TriggerExitBot:
                     }
                 )
 
+    def _store_payload(
+        self,
+        exit_requests_hash: str,
+        exit_requests_data: bytes | str,
+        data_format: int,
+        validators: list[dict[str, Any]],
+    ) -> None:
+        """
+        Store decoded payload under its exitRequestsHash.
+
+        Raises:
+            ValueError: If the payload hash doesn't match the hash from the event, the
+                transaction did not produce the event payload. The event is quarantined
+                and retried, in case the fetched data was wrong
+        """
+        data_bytes = (
+            exit_requests_data
+            if isinstance(exit_requests_data, bytes)
+            else bytes.fromhex(exit_requests_data.removeprefix("0x"))
+        )
+        data_key = self._get_data_key(data_bytes, data_format)
+        if data_key != exit_requests_hash:
+            raise ValueError(
+                f"Decoded payload hash {data_key} does not match "
+                f"exitRequestsHash {exit_requests_hash}"
+            )
+
+        with self._state_lock:
+            self.validators_map[data_key] = validators
+            self.data_format_map[data_key] = data_format
+            self.data_bytes_map[data_key] = data_bytes
+            for validator in validators:
+                self.validator_index.setdefault(_pubkey_hex(validator), {})[
+                    data_key
+                ] = validator["index"]
+
+    def _retire_payload(self, data_key: str) -> None:
+        """Drop the state of a payload with all validators exited."""
+        with self._state_lock:
+            for validator in self.validators_map.pop(data_key, None) or []:
+                self._unindex(_pubkey_hex(validator), data_key)
+            self.data_format_map.pop(data_key, None)
+            self.triggerable_counts.pop(data_key, None)
+            self.payload_checked_at.pop(data_key, None)
+            self.retired_payloads.add(data_key)
+            self.cursor.forget(data_key)
+        self.data_bytes_map.remove(data_key)
+        logger.info(
+            {"msg": "All validators exited, payload retired", "data_hash": data_key}
+        )
+
+    def _unindex(self, pubkey_hex: str, data_key: str) -> None:
+        payloads = self.validator_index.get(pubkey_hex)
+        if payloads is None:
+            return
+        payloads.pop(data_key, None)
+        if not payloads:
+            del self.validator_index[pubkey_hex]
+
+    def _remove_exited_validators(self, pubkeys: set[str]) -> None:
+        """Drop exited validators from every payload referencing them."""
+        emptied = []
+        with self._state_lock:
+            exited_by_payload: dict[str, set[str]] = {}
+            for pubkey_hex in pubkeys:
+                for data_key in self.validator_index.pop(pubkey_hex, {}):
+                    exited_by_payload.setdefault(data_key, set()).add(pubkey_hex)
+            for data_key, exited in exited_by_payload.items():
+                if data_key not in self.validators_map:
+                    continue
+                remaining = [
+                    validator
+                    for validator in self.validators_map[data_key]
+                    if _pubkey_hex(validator) not in exited
+                ]
+                self.validators_map[data_key] = remaining
+                if not remaining:
+                    emptied.append(data_key)
+        for data_key in emptied:
+            self._retire_payload(data_key)
+
+    def _cycle_status(
+        self,
+        key: tuple[Any, ...],
+        resolve: Callable[[HexStr], bool],
+        pubkey_hex: HexStr,
+    ) -> bool:
+        """
+        Validator status resolved once per trigger_exits call.
+
+        Payloads sharing the validator reuse the result, concurrent checks of the same
+        validator wait for the first one.
+        """
+        with self._state_lock:
+            future = self._cycle_statuses.get(key)
+            resolving = future is None
+            if resolving:
+                future = self._cycle_statuses[key] = Future()
+        check = key[0]
+        if not resolving:
+            VALIDATOR_STATUS_LOOKUPS.labels(check=check, result="reused").inc()
+            return future.result()
+
+        VALIDATOR_STATUS_LOOKUPS.labels(check=check, result="resolved").inc()
+        try:
+            status = resolve(pubkey_hex)
+        except Exception as error:
+            # Waiting checks fail too, later ones resolve the status again
+            with self._state_lock:
+                del self._cycle_statuses[key]
+            future.set_exception(error)
+            raise
+        future.set_result(status)
+        return status
+
+    def _claim_trigger(
+        self, pubkey_hex: str, data_key: str, validator: dict[str, Any]
+    ) -> bool:
+        """
+        Pick the payload triggering the validator exit in the current call.
+
+        The first payload checked claims the validator. Payloads with more validators
+        to trigger are checked first, so shared validators join the largest trigger
+        transactions and every validator is triggered once. Payloads skipped for the
+        claim wait for it, see `_release_claims`.
+        """
+        with self._state_lock:
+            if self._trigger_claims.setdefault(pubkey_hex, data_key) == data_key:
+                return True
+            self._trigger_waiters.setdefault(pubkey_hex, []).append(
+                (data_key, validator)
+            )
+            return False
+
+    def _release_claims(
+        self, data_key: str, validators: list[dict[str, Any]], hand_over: bool
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        Release claims of a payload that doesn't trigger its validators.
+
+        With `hand_over`, every validator is claimed by the first payload that was
+        skipped for it, otherwise the validator is free for payloads checked later.
+
+        Returns:
+            Validators handed over, by payload
+        """
+        handed_over: dict[str, list[dict[str, Any]]] = {}
+        with self._state_lock:
+            for validator in validators:
+                pubkey_hex = _pubkey_hex(validator)
+                if self._trigger_claims.get(pubkey_hex) != data_key:
+                    continue
+                del self._trigger_claims[pubkey_hex]
+                waiters = self._trigger_waiters.get(pubkey_hex)
+                # Exited validators are not in the index anymore
+                if (
+                    not hand_over
+                    or not waiters
+                    or pubkey_hex not in self.validator_index
+                ):
+                    continue
+                waiting_key, waiting_validator = waiters.pop(0)
+                if not waiters:
+                    del self._trigger_waiters[pubkey_hex]
+                self._trigger_claims[pubkey_hex] = waiting_key
+                handed_over.setdefault(waiting_key, []).append(waiting_validator)
+        if handed_over:
+            logger.info(
+                {
+                    "msg": "Validator exits handed over to other payloads",
+                    "data_hash": data_key,
+                    "payloads": {
+                        waiting_key: len(waiting_validators)
+                        for waiting_key, waiting_validators in handed_over.items()
+                    },
+                }
+            )
+        return handed_over
+
+    def get_state_summary(self) -> dict[str, int]:
+        """Size of the tracked state."""
+        with self._state_lock:
+            summary = {
+                "tracked_payloads": len(self.validators_map),
+                "tracked_validators": sum(
+                    len(validators) for validators in self.validators_map.values()
+                ),
+                "retired_payloads": len(self.retired_payloads),
+                "payload_bytes_in_memory": self.data_bytes_map.memory_bytes(),
+                "payload_bytes_on_disk": self.data_bytes_map.spilled_bytes(),
+                "dead_letters": len(self.dead_letters),
+            }
+        TRACKED_PAYLOADS.set(summary["tracked_payloads"])
+        TRACKED_VALIDATORS.set(summary["tracked_validators"])
+        return summary
+
     def get_validators_for_data(
-        self, exit_requests_data: bytes | str
+        self, exit_requests_data: bytes | str, data_format: int
     ) -> Optional[list[dict[str, Any]]]:
         """
         Get decoded validators for given exit requests data.
 
         Args:
             exit_requests_data: Either bytes or hex string of the exit requests data
+            data_format: Data format identifier
 
         Returns:
             List of validator dictionaries or None if not found
         """
-        data_key = self._get_data_key(exit_requests_data)
+        data_key = self._get_data_key(exit_requests_data, data_format)
         return self.validators_map.get(data_key)
 
-    def _check_and_trigger_exits(self, data_key: str):
+    def _check_payload(self, data_key: str) -> list[dict[str, Any]]:
         """
-        Check validators and trigger exits for those that are reported but not exited.
+        Check validators of the payload for those that are reported but not exited.
 
         This method:
         1. Checks if each validator is already exited using CL client
         2. If exited, removes it from the state
         3. If not exited, checks if it was reported using the node operator registry
         4. If reported and not exited, adds it to the list to trigger
-        5. Calls trigger_exits transaction with the list
 
         Args:
-            data_key: SHA256 hash of the exit requests data
+            data_key: exitRequestsHash of the exit requests data
+
+        Returns:
+            Validators to trigger exits for
         """
         validators = self.validators_map.get(data_key)
         data_format = self.data_format_map.get(data_key)
 
-        if not validators or data_format is None:
+        if data_format is None:
             logger.warning(
                 {
                     "msg": "No validators or data_format found for data_key",
                     "data_hash": data_key,
                 }
             )
-            return
+            return []
+        if not validators:
+            self._retire_payload(data_key)
+            return []
 
         logger.info(
             {
@@ -353,60 +924,73 @@ class TriggerExitBot:
         status_counts = {}
 
         for validator in validators:
-            pubkey = validator["pubkey"]
-            pubkey_hex = HexStr(pubkey.hex() if isinstance(pubkey, bytes) else pubkey)
+            pubkey_hex = _pubkey_hex(validator)
             module_id = validator["moduleId"]
             node_op_id = validator["nodeOpId"]
             val_index = validator["valIndex"]
             validator_index = validator["index"]
+            # In aggregate log mode only a sample of validators is logged
+            log_validator = log_sampled()
 
-            logger.info(
-                {
-                    "msg": "Checking validator",
-                    "pubkey": pubkey_hex[:20]
-                    + "...",  # Log first part of pubkey for brevity
-                    "module_id": module_id,
-                    "node_op_id": node_op_id,
-                    "val_index": val_index,
-                    "validator_index": validator_index,
-                }
-            )
-
-            # Check if validator is already exited
-            is_exited = self.cl_client.is_validator_exited(pubkey_hex)
-
-            if is_exited:
+            if log_validator:
                 logger.info(
                     {
-                        "msg": "Validator is already exited, removing from state",
-                        "pubkey": pubkey_hex[:20] + "...",
+                        "msg": "Checking validator",
+                        "pubkey": pubkey_hex[:20]
+                        + "...",  # Log first part of pubkey for brevity
+                        "module_id": module_id,
+                        "node_op_id": node_op_id,
+                        "val_index": val_index,
                         "validator_index": validator_index,
                     }
                 )
+
+            # Check if validator is already exited
+            with stage("cl_check"):
+                is_exited = self._cycle_status(
+                    ("cl", pubkey_hex), self.cl_client.is_validator_exited, pubkey_hex
+                )
+
+            if is_exited:
+                if log_validator:
+                    logger.info(
+                        {
+                            "msg": "Validator is already exited, removing from state",
+                            "pubkey": pubkey_hex[:20] + "...",
+                            "validator_index": validator_index,
+                        }
+                    )
                 validators_to_remove.append(validator)
                 status_counts[(str(module_id), "already_exited")] = (
                     status_counts.get((str(module_id), "already_exited"), 0) + 1
                 )
                 continue
 
-            # Check if module_id is in the whitelist
-            if module_id not in variables.MODULES_WHITELIST:
-                logger.info(
-                    {
-                        "msg": "Module not in whitelist, skipping",
-                        "module_id": module_id,
-                        "validator_index": validator_index,
-                    }
+            # Exited validators of other shards are still dropped, so payloads
+            # spanning several shards are retired on every instance
+            if not self.sharding.owns_module(module_id):
+                status_counts[(str(module_id), "other_shard")] = (
+                    status_counts.get((str(module_id), "other_shard"), 0) + 1
                 )
+                continue
+
+            # Check if module_id is in the whitelist
+            if not self.w3.lido.is_module_enabled(module_id):
+                if log_validator:
+                    logger.info(
+                        {
+                            "msg": "Module not in whitelist, skipping",
+                            "module_id": module_id,
+                            "validator_index": validator_index,
+                        }
+                    )
                 status_counts[(str(module_id), "skipped_module")] = (
                     status_counts.get((str(module_id), "skipped_module"), 0) + 1
                 )
                 continue
 
             # Get the node operator registry for this module
-            node_operator_registry = self.w3.lido.node_operator_registry_map.get(
-                module_id
-            )
+            node_operator_registry = self.w3.lido.get_node_operator_registry(module_id)
 
             if node_operator_registry is None:
                 logger.warning(
@@ -418,18 +1002,35 @@ class TriggerExitBot:
                 )
                 continue
 
-            is_reported = node_operator_registry.is_validator_exiting_key_reported(
-                pubkey_hex
-            )
+            with stage("nor_check"):
+                is_reported = self._cycle_status(
+                    ("nor", module_id, pubkey_hex),
+                    node_operator_registry.is_validator_exiting_key_reported,
+                    pubkey_hex,
+                )
 
-            if is_reported:
-                logger.info(
-                    {
-                        "msg": "Validator is reported but not exited, adding to trigger list",
-                        "pubkey": pubkey_hex[:20] + "...",
-                        "validator_index": validator_index,
-                    }
+            if is_reported and not self._claim_trigger(pubkey_hex, data_key, validator):
+                if log_validator:
+                    logger.info(
+                        {
+                            "msg": "Validator exit is triggered with another payload",
+                            "pubkey": pubkey_hex[:20] + "...",
+                            "validator_index": validator_index,
+                            "trigger_data_hash": self._trigger_claims[pubkey_hex],
+                        }
+                    )
+                status_counts[(str(module_id), "triggered_elsewhere")] = (
+                    status_counts.get((str(module_id), "triggered_elsewhere"), 0) + 1
                 )
+            elif is_reported:
+                if log_validator:
+                    logger.info(
+                        {
+                            "msg": "Validator is reported but not exited, adding to trigger list",
+                            "pubkey": pubkey_hex[:20] + "...",
+                            "validator_index": validator_index,
+                        }
+                    )
                 validators_to_trigger.append(validator)
                 status_counts[(str(module_id), "needs_exit")] = (
                     status_counts.get((str(module_id), "needs_exit"), 0) + 1
@@ -439,32 +1040,45 @@ class TriggerExitBot:
                     validators_by_module.get(module_id, 0) + 1
                 )
             else:
-                logger.info(
-                    {
-                        "msg": "Validator exiting key not reported yet",
-                        "pubkey": pubkey_hex[:20] + "...",
-                        "validator_index": validator_index,
-                    }
-                )
+                if log_validator:
+                    logger.info(
+                        {
+                            "msg": "Validator exiting key not reported yet",
+                            "pubkey": pubkey_hex[:20] + "...",
+                            "validator_index": validator_index,
+                        }
+                    )
                 status_counts[(str(module_id), "not_reported")] = (
                     status_counts.get((str(module_id), "not_reported"), 0) + 1
                 )
 
-        # Remove exited validators from state
+        # Remove exited validators from this and other payloads
         if validators_to_remove:
-            self.validators_map[data_key] = [
-                v for v in validators if v not in validators_to_remove
-            ]
+            self._remove_exited_validators(
+                {_pubkey_hex(validator) for validator in validators_to_remove}
+            )
             logger.info(
                 {
                     "msg": "Removed exited validators from state",
                     "removed_count": len(validators_to_remove),
-                    "remaining_count": len(self.validators_map[data_key]),
+                    "remaining_count": len(self.validators_map.get(data_key, [])),
                 }
             )
 
+        modules_summary: dict[str, dict[str, int]] = {}
         for (module_id, status), count in status_counts.items():
             VALIDATORS_CHECKED.labels(module_id=module_id, status=status).set(count)
+            modules_summary.setdefault(module_id, {})[status] = count
+
+        logger.info(
+            {
+                "msg": "Payload check summary",
+                "data_hash": data_key,
+                "validators_count": len(validators),
+                "to_trigger_count": len(validators_to_trigger),
+                "modules": modules_summary,
+            }
+        )
 
         for module_id, count in validators_by_module.items():
             PENDING_VALIDATORS.labels(module_id=str(module_id)).set(count)
@@ -472,43 +1086,47 @@ class TriggerExitBot:
         remaining_validators = self.validators_map.get(data_key, [])
         for validator in remaining_validators:
             mid = validator["moduleId"]
-            if mid not in validators_by_module and mid in variables.MODULES_WHITELIST:
+            if mid not in validators_by_module and self.w3.lido.is_module_enabled(mid):
                 PENDING_VALIDATORS.labels(module_id=str(mid)).set(0)
 
-        # Trigger exits for reported validators
-        if validators_to_trigger:
-            self._trigger_exits_transaction(
-                data_key, data_format, validators_to_trigger
-            )
-        else:
-            logger.info({"msg": "No validators to trigger exits for"})
+        with self._state_lock:
+            self.triggerable_counts[data_key] = len(validators_to_trigger)
+        return validators_to_trigger
 
-    def _trigger_exits_transaction(
-        self,
-        data_key: str,
-        data_format: int,
-        validators_to_trigger: list[dict[str, Any]],
-    ):
+    def _plan_trigger(
+        self, data_key: str, validators_to_trigger: list[dict[str, Any]]
+    ) -> Optional[TriggerPlan]:
         """
-        Build and send trigger_exits transaction.
+        Build trigger_exits transaction and check it locally.
 
-        Uses the bot's account address as the refund recipient.
+        Uses the primary account (WALLET_PRIVATE_KEY) as the refund recipient, whichever
+        signer of the pool sends the transaction. The plan is checked before a signer is
+        picked, and the refund is only the part of the value above the fee, so refunds
+        are collected on the account operators top up.
 
         Args:
-            data_key: SHA256 hash of the exit requests data
-            data_format: Data format identifier
+            data_key: exitRequestsHash of the exit requests data
             validators_to_trigger: List of validator dicts to trigger exits for
+
+        Returns:
+            Transaction to submit, None if the payload was retired or the local check
+            failed
         """
         # Get original bytes data from the hash key
         exits_data = self.data_bytes_map.get(data_key)
+        data_format = self.data_format_map.get(data_key)
 
-        if exits_data is None:
-            raise ValueError(f"Original exit data not found for hash key {data_key}")
+        if exits_data is None or data_format is None:
+            # Retired after the check, all validators exited in the meantime
+            logger.info(
+                {"msg": "Payload retired, not triggering", "data_hash": data_key}
+            )
+            return None
 
         # Get exit data indexes from validators
         exit_data_indexes = [v["index"] for v in validators_to_trigger]
 
-        # Use bot's account address as refund recipient
+        # Refunds go to the primary account, not to the signer sending the transaction
         # If account is not configured, use zero address as placeholder
         refund_recipient = (
             variables.ACCOUNT.address
@@ -550,11 +1168,27 @@ class TriggerExitBot:
                     "validators_count": len(validators_to_trigger),
                 }
             )
-            return
+            return None
+
+        return TriggerPlan(data_key, tx_function, total_fee, validators_to_trigger)
 
-        # Send transaction
+    def _submit_trigger(self, trigger_plan: TriggerPlan) -> None:
+        """Send trigger_exits transaction and wait for its receipt."""
+        validators_to_trigger = trigger_plan.validators
+        if not self.sharding.can_submit():
+            logger.error(
+                {
+                    "msg": "Shard lease lost, not sending",
+                    "validators_count": len(validators_to_trigger),
+                }
+            )
+            # Nothing is sent by this instance anymore, no payload takes the claims over
+            self._release_claims(
+                trigger_plan.data_key, validators_to_trigger, hand_over=False
+            )
+            return
         success = self.transaction_utils.send(
-            tx_function, timeout_in_blocks=10, value=total_fee
+            trigger_plan.tx_function, timeout_in_blocks=10, value=trigger_plan.value
         )
 
         if success:
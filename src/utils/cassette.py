@@ -0,0 +1,207 @@
+"""
+Record and replay of EL and CL traffic.
+
+A cassette is a gzip-compressed JSON lines file. Every line is one entry:
+- el:   JSON-RPC method, params, raw response and request duration
+- cl:   HTTP method, path with query, request body, status, response body and duration
+- mark: markers written by the main loop: the environment the bot was started with
+        and the block range of every cycle, so replay tools can run the same cycles
+
+In replay mode requests are matched by layer and request key (method with params, or
+method with path and body). Repeated identical requests are served in recorded order,
+the last response is reused once the recorded ones are exhausted.
+"""
+
+import atexit
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import IO, Any, Optional
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+CASSETTE_MODE_RECORD = "record"
+CASSETTE_MODE_REPLAY = "replay"
+
+# Variables that change which requests the bot makes. They are recorded with the traffic
+ENV_VARS = ("LIDO_LOCATOR", "MODULES_WHITELIST", "ADDRESS_CACHE_TTL_SECONDS")
+
+
+class CassetteMiss(LookupError):
+    """Request was not recorded in the cassette."""
+
+
+def _el_key(method: str, params: Any) -> str:
+    return f"{method} {json.dumps(params, sort_keys=True, default=str)}"
+
+
+def _cl_key(method: str, path: str, body: Optional[str]) -> str:
+    return f"{method} {path} {body or ''}"
+
+
+class Cassette:
+    """Recorded EL/CL request-response pairs with their timings."""
+
+    def __init__(self, path: Path, mode: str, preserve_latency: bool = False):
+        if mode not in (CASSETTE_MODE_RECORD, CASSETTE_MODE_REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.preserve_latency = preserve_latency
+        self.marks: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = None
+        self._entries: dict[tuple[str, str], deque[dict[str, Any]]] = defaultdict(deque)
+
+        if mode == CASSETTE_MODE_RECORD:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = gzip.open(self.path, "wt", encoding="utf-8")
+            atexit.register(self.close)
+        else:
+            self._load()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == CASSETTE_MODE_RECORD
+
+    def _load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as cassette:
+            for line in cassette:
+                entry = json.loads(line)
+                if entry["layer"] == "mark":
+                    self.marks.append(entry["fields"])
+                else:
+                    self._entries[(entry["layer"], entry["key"])].append(entry)
+
+    def _write(self, entry: dict[str, Any]) -> None:
+        line = json.dumps(entry, separators=(",", ":"), default=str)
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + "\n")
+
+    def _take(self, layer: str, key: str) -> dict[str, Any]:
+        with self._lock:
+            entries = self._entries.get((layer, key))
+            if not entries:
+                raise CassetteMiss(f"{layer} request is not in the cassette: {key}")
+            entry = entries.popleft() if len(entries) > 1 else entries[0]
+
+        if self.preserve_latency:
+            time.sleep(entry["seconds"])
+        return entry
+
+    @property
+    def env(self) -> dict[str, str]:
+        """Recorded environment, see ENV_VARS."""
+        for mark in self.marks:
+            if mark["kind"] == "env":
+                return mark["variables"]
+        return {}
+
+    @property
+    def cycles(self) -> list[dict[str, Any]]:
+        """Recorded bot cycles, in order."""
+        return [mark for mark in self.marks if mark["kind"] == "cycle"]
+
+    def mark(self, kind: str, **fields: Any) -> None:
+        """Write a marker, and flush what was recorded so far."""
+        self._write({"layer": "mark", "fields": {"kind": kind, **fields}})
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def record_env(self) -> None:
+        self.mark("env", variables={name: os.getenv(name, "") for name in ENV_VARS})
+
+    def record_cycle(self, from_block: int, to_block: int) -> None:
+        self.mark("cycle", from_block=from_block, to_block=to_block)
+
+    def record_el(
+        self, method: str, params: Any, response: Any, seconds: float
+    ) -> None:
+        self._write(
+            {
+                "layer": "el",
+                "key": _el_key(method, params),
+                "response": response,
+                "seconds": round(seconds, 6),
+            }
+        )
+
+    def replay_el(self, method: str, params: Any) -> Any:
+        return self._take("el", _el_key(method, params))["response"]
+
+    def record_cl_response(
+        self, response: requests.Response, *args: Any, **kwargs: Any
+    ) -> None:
+        """`requests` response hook recording beacon node responses."""
+        request = response.request
+        body = (
+            request.body.decode() if isinstance(request.body, bytes) else request.body
+        )
+        self._write(
+            {
+                "layer": "cl",
+                "key": _cl_key(request.method or "GET", request.path_url, body),
+                "status": response.status_code,
+                "headers": {"Content-Type": response.headers.get("Content-Type", "")},
+                "body": response.text,
+                "seconds": round(response.elapsed.total_seconds(), 6),
+            }
+        )
+
+    def replay_cl(self, request: requests.PreparedRequest) -> requests.Response:
+        body = (
+            request.body.decode() if isinstance(request.body, bytes) else request.body
+        )
+        entry = self._take(
+            "cl", _cl_key(request.method or "GET", request.path_url, body)
+        )
+
+        body = entry["body"].encode()
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        # Streamed requests read the body with iter_content and close the response
+        response._content = body
+        response._content_consumed = True  # type: ignore[attr-defined]
+        response.raw = io.BytesIO(body)
+        response.encoding = "utf-8"
+        response.url = request.url or ""
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class CassetteAdapter(BaseAdapter):
+    """`requests` transport adapter serving beacon node responses from a cassette."""
+
+    def __init__(self, cassette: Cassette):
+        super().__init__()
+        self.cassette = cassette
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream=False,
+        timeout=None,
+        verify=True,
+        cert=None,
+        proxies=None,
+    ) -> requests.Response:
+        return self.cassette.replay_cl(request)
+
+    def close(self) -> None:
+        pass
@@ -1,29 +1,107 @@
-from typing import Any, Optional
+from collections.abc import Iterable, Iterator, Mapping
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Optional
 from urllib.parse import urljoin
 
 import requests
 from eth_typing import HexStr
 
+from src.utils.json_stream import iter_json_array
+
+if TYPE_CHECKING:
+    from src.utils.validator_registry import ValidatorRegistry
+
 
 class CLClient:
-    def __init__(self, url: str):
+    # Validator ids sent in one POST request
+    IDS_PER_REQUEST: int = 1000
+    # Bytes of a response body decoded at once by list endpoints
+    STREAM_CHUNK_BYTES: int = 256 * 1024
+
+    def __init__(
+        self,
+        url: str,
+        session: Optional[requests.Session] = None,
+        registry: Optional["ValidatorRegistry"] = None,
+    ):
         self.url = url
+        self.session = session or requests.Session()
+        # Snapshot of the validator registry used for lookups, refreshed by its owner
+        self.registry = registry
 
-    def get_validators_by_indexes(self) -> dict[int, HexStr]:
-        validators = self.get_all_validators()
+    def get_validators_by_indexes(
+        self, indexes: Optional[Iterable[int]] = None
+    ) -> Mapping[int, HexStr]:
+        """
+        Pubkeys by validator index.
+
+        With `indexes`, only those validators are requested from the node, the mapping
+        may miss indexes unknown to the node.
+        """
+        if self.registry is not None:
+            return self.registry.pubkeys()
+        if indexes is None:
+            validators = self.iter_validators()
+        else:
+            validators = self.iter_validators(ids=sorted(set(indexes)))
         return {
             int(val["index"]): HexStr(val["validator"]["pubkey"]) for val in validators
         }
 
-    def get_all_validators(self) -> list[dict[str, Any]]:
-        response = requests.get(
-            urljoin(self.url, "/eth/v1/beacon/states/head/validators"), timeout=60
+    def get_head_slot(self) -> int:
+        response = self.session.get(
+            urljoin(self.url, "/eth/v1/beacon/headers/head"), timeout=10
         )
         response.raise_for_status()
-        return response.json()["data"]
+        return int(response.json()["data"]["header"]["message"]["slot"])
+
+    def iter_validators(
+        self,
+        state_id: str = "head",
+        ids: Optional[Iterable[int]] = None,
+        statuses: Optional[list[str]] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Validators of the state, filtered by indexes and statuses if given.
+
+        Filtered requests are sent as POST, ids in batches of IDS_PER_REQUEST.
+        """
+        url = urljoin(self.url, f"/eth/v1/beacon/states/{state_id}/validators")
+        if ids is None and statuses is None:
+            yield from self._iter_data("GET", url)
+            return
+
+        body: dict[str, Any] = {}
+        if statuses is not None:
+            body["statuses"] = statuses
+        if ids is None:
+            yield from self._iter_data("POST", url, json=body)
+            return
+
+        ids = iter(ids)
+        while batch := [str(index) for index in islice(ids, self.IDS_PER_REQUEST)]:
+            yield from self._iter_data("POST", url, json={**body, "ids": batch})
+
+    def get_all_validators(self) -> list[dict[str, Any]]:
+        return list(self.iter_validators())
+
+    def _iter_data(self, method: str, url: str, **kwargs: Any) -> Iterator[Any]:
+        """
+        Items of the `data` array of a response, decoded while the body downloads.
+
+        The body is read with `iter_content`, so gzip responses are decompressed on the
+        fly and neither the body nor the whole array is kept in memory.
+        """
+        with self.session.request(
+            method, url, stream=True, timeout=60, **kwargs
+        ) as response:
+            response.raise_for_status()
+            yield from iter_json_array(
+                response.iter_content(self.STREAM_CHUNK_BYTES), "data"
+            )
 
     def get_validator_index_by_pubkey(self, pub_key: HexStr) -> int:
-        response = requests.get(
+        response = self.session.get(
             urljoin(self.url, f"/eth/v1/beacon/states/head/validators/{pub_key}"),
             timeout=10,
         )
@@ -43,7 +121,7 @@ class CLClient:
         Returns None if validator not found, otherwise returns validator data dict.
         """
         try:
-            response = requests.get(
+            response = self.session.get(
                 urljoin(self.url, f"/eth/v1/beacon/states/head/validators/{pub_key}"),
                 timeout=10,
             )
@@ -67,6 +145,12 @@ class CLClient:
         - exited_slashed
         - exited_unslashed
         """
+        if self.registry is not None:
+            record = self.registry.get_by_pubkey(pub_key)
+            # Validators deposited after the snapshot are requested from the API
+            if record is not None:
+                return record.exited
+
         validator_data = self.get_validator_by_pubkey(pub_key)
 
         if validator_data is None:
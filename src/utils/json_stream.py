@@ -0,0 +1,109 @@
+"""
+Incremental decoding of large JSON responses.
+
+Beacon API responses such as the whole validator registry are hundreds of megabytes of
+JSON. `response.json()` keeps the body and every decoded object in memory at once. The
+decoder below reads the body in chunks and yields the items of one array of the top-level
+object one at a time, so memory is bounded by the chunk size and the largest item, and
+items are processed while the rest of the body is still downloading.
+"""
+
+import codecs
+import json
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = frozenset(" \t\n\r")
+
+
+class _Buffer:
+    """Decoded text of the chunks read so far, parsed text is dropped on refill."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Append the next chunk, False at the end of the body."""
+        if self.eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.eof = True
+            text = self._utf8.decode(b"", final=True)
+        else:
+            text = self._utf8.decode(chunk)
+        self.text = self.text[self.pos :] + text
+        self.pos = 0
+        return chunk is not None
+
+    def peek(self) -> str:
+        """Next non-whitespace character, empty at the end of the body."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, got {found!r}")
+        self.pos += 1
+
+    def skip_comma(self) -> None:
+        if self.peek() == ",":
+            self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next JSON value, reading chunks until it is complete."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.text) and isinstance(value, int | float) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str) -> Iterator[Any]:
+    """
+    Items of the array under `key` of the top-level JSON object.
+
+    Other members of the object are decoded and dropped, members after the array are
+    not read.
+
+    Args:
+        chunks: Body of the JSON document, e.g. `response.iter_content(...)`
+        key: Key of the array in the top-level object
+
+    Raises:
+        ValueError: The document is malformed, truncated or has no `key` member
+    """
+    buffer = _Buffer(chunks)
+    buffer.expect("{")
+    while buffer.peek() != "}":
+        name = buffer.value()
+        buffer.expect(":")
+        if name != key:
+            buffer.value()
+            buffer.skip_comma()
+            continue
+        buffer.expect("[")
+        while buffer.peek() != "]":
+            yield buffer.value()
+            buffer.skip_comma()
+        return
+    raise ValueError(f"No {key!r} array in JSON stream")
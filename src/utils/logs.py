@@ -0,0 +1,127 @@
+"""
+Logging setup.
+
+Two modes are supported (LOG_MODE):
+- full:      every log line is written synchronously to stdout
+- aggregate: per-validator lines are sampled (LOG_SAMPLE_RATE), the bot emits
+             per-payload summaries instead, and lines are written to stdout by a
+             background thread, so formatting and I/O don't block the bot loop
+"""
+
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+from typing import Any, TextIO
+
+import orjson
+import structlog
+
+LOG_MODE_FULL = "full"
+LOG_MODE_AGGREGATE = "aggregate"
+
+_sample_rate = 1.0
+
+
+def log_sampled() -> bool:
+    """
+    Check if a per-validator log line should be written.
+
+    Check it before building the log message, so skipped lines cost nothing.
+    """
+    return _sample_rate >= 1 or random.random() < _sample_rate
+
+
+def _dumps(obj: Any, **kwargs: Any) -> str:
+    default = kwargs.get("default", str)
+    try:
+        return orjson.dumps(
+            obj, default=default, option=orjson.OPT_NON_STR_KEYS
+        ).decode()
+    except TypeError:
+        # orjson doesn't serialize ints over 64 bits, such as wei amounts
+        return json.dumps(obj, default=default)
+
+
+class QueueLogger:
+    """structlog logger that hands rendered lines to a background writer thread."""
+
+    def __init__(self, lines: "queue.SimpleQueue[str]"):
+        self._lines = lines
+
+    def msg(self, message: str) -> None:
+        self._lines.put(message)
+
+    log = debug = info = warn = warning = msg
+    fatal = failure = err = error = critical = exception = msg
+
+
+class QueueLoggerFactory:
+    """Creates QueueLoggers sharing a single writer thread."""
+
+    def __init__(self, file: TextIO = sys.stdout):
+        self._file = file
+        self._lines: queue.SimpleQueue[str] = queue.SimpleQueue()
+        self._logger = QueueLogger(self._lines)
+        self._writer = threading.Thread(
+            target=self._write_forever, name="log-writer", daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.flush)
+
+    def __call__(self, *args: Any) -> QueueLogger:
+        return self._logger
+
+    def _write_forever(self) -> None:
+        while True:
+            self._write_batch(self._lines.get())
+
+    def _write_batch(self, first_line: str) -> None:
+        batch = [first_line]
+        try:
+            while len(batch) < 1000:
+                batch.append(self._lines.get_nowait())
+        except queue.Empty:
+            pass
+        self._file.write("\n".join(batch) + "\n")
+        self._file.flush()
+
+    def flush(self) -> None:
+        """Write lines left in the queue. Called on interpreter exit."""
+        try:
+            while True:
+                self._write_batch(self._lines.get_nowait())
+        except queue.Empty:
+            pass
+
+
+def configure_logging(log_level: str, log_mode: str, sample_rate: float) -> None:
+    """Configure structlog for JSON logging."""
+    global _sample_rate
+
+    if log_mode == LOG_MODE_AGGREGATE:
+        _sample_rate = sample_rate
+        logger_factory: Any = QueueLoggerFactory()
+    else:
+        _sample_rate = 1.0
+        logger_factory = structlog.PrintLoggerFactory()
+
+    structlog.configure(
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            structlog.processors.add_log_level,
+            structlog.processors.StackInfoRenderer(),
+            structlog.dev.set_exc_info,
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.JSONRenderer(serializer=_dumps),
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(
+            getattr(logging, log_level)
+        ),
+        context_class=dict,
+        logger_factory=logger_factory,
+        cache_logger_on_first_use=True,
+    )
@@ -0,0 +1,136 @@
+"""
+Staged producer/consumer pipeline.
+
+Every stage has a bounded queue and its own worker threads. A full queue blocks the
+producer of the stage (backpressure), so upstream stages never run far ahead of slow
+downstream ones, and a slow stage such as waiting for a transaction receipt doesn't
+stop the others.
+
+Errors of a handler don't stop the stage: the item is dropped, the error is logged and
+the first one is raised by `close`, after all queued items are processed.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import structlog
+
+from src.metrics.metrics import PIPELINE_BACKPRESSURE, PIPELINE_QUEUE_DEPTH
+
+logger = structlog.get_logger(__name__)
+
+_STOP = object()
+
+
+class Stage:
+    """Bounded queue of one pipeline stage and the workers processing it."""
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], object],
+        workers: int,
+        queue_size: int,
+        on_error: Callable[[Exception], None],
+    ):
+        self.name = name
+        self.handler = handler
+        self.on_error = on_error
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=queue_size)
+        self._threads = [
+            threading.Thread(
+                target=self._work, name=f"pipeline-{name}-{i}", daemon=True
+            )
+            for i in range(max(1, workers))
+        ]
+
+    def put(self, item: Any) -> None:
+        """Queue an item, waiting while the queue is full."""
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            started = time.perf_counter()
+            self._queue.put(item)
+            PIPELINE_BACKPRESSURE.labels(stage=self.name).inc(
+                time.perf_counter() - started
+            )
+        PIPELINE_QUEUE_DEPTH.labels(stage=self.name).set(self._queue.qsize())
+
+    def start(self) -> None:
+        for thread in self._threads:
+            thread.start()
+
+    def join(self) -> None:
+        """Wait until queued items are processed and stop the workers."""
+        self._queue.join()
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        PIPELINE_QUEUE_DEPTH.labels(stage=self.name).set(0)
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                PIPELINE_QUEUE_DEPTH.labels(stage=self.name).set(self._queue.qsize())
+                self.handler(item)
+            except Exception as error:
+                logger.error(
+                    {
+                        "msg": "Pipeline stage failed to process item",
+                        "stage": self.name,
+                        "error": str(error),
+                    },
+                    exc_info=error,
+                )
+                self.on_error(error)
+            finally:
+                self._queue.task_done()
+
+
+class Pipeline:
+    """
+    Stages connected by bounded queues.
+
+    Stages are closed in the order they were added, so add them from upstream to
+    downstream: items a stage hands over while it drains are processed by the later
+    stages before they stop.
+    """
+
+    def __init__(self):
+        self.stages: dict[str, Stage] = {}
+        self._error: Optional[Exception] = None
+        self._error_lock = threading.Lock()
+
+    def add_stage(
+        self,
+        name: str,
+        handler: Callable[[Any], object],
+        workers: int = 1,
+        queue_size: int = 1,
+    ) -> Stage:
+        stage = Stage(name, handler, workers, queue_size, self._set_error)
+        self.stages[name] = stage
+        return stage
+
+    def _set_error(self, error: Exception) -> None:
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+
+    def __enter__(self) -> "Pipeline":
+        for stage in self.stages.values():
+            stage.start()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        for stage in self.stages.values():
+            stage.join()
+        # An error of the producer takes precedence over errors of the stages
+        if exc is None and self._error is not None:
+            raise self._error
@@ -0,0 +1,235 @@
+"""
+On-demand profiling helpers used by the debug endpoints of the health server.
+
+Nothing here runs unless an endpoint is called: the bot loop only checks whether a
+profile was requested before each cycle.
+
+Cycles are profiled by sampling thread stacks rather than with cProfile. A cycle runs
+on the pipeline worker threads too, and since Python 3.12 cProfile is process-wide: a
+single profiler sees every thread but keeps one call stack, so the stacks of concurrent
+threads are mixed up, and a second profiler can't be enabled per thread. The report
+keeps the pstats layout, but its ncalls column counts samples, not calls.
+"""
+
+import io
+import pstats
+import sys
+import threading
+import time
+import traceback
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import IO, Optional
+
+# (filename, first line, function name), the function key of pstats
+_Function = tuple[str, int, str]
+
+
+class _SampledProfile:
+    """
+    Wall-clock samples of thread stacks, reported as pstats statistics.
+
+    tottime and cumtime are the samples with the function on top of the stack and
+    anywhere in it, times the sampling interval. ncalls is the number of samples.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        # Function -> samples on top of the stack
+        self._own: dict[_Function, int] = {}
+        # Function -> samples with the function in the stack
+        self._total: dict[_Function, int] = {}
+        # Function -> {caller: samples}
+        self._callers: dict[_Function, dict[_Function, int]] = {}
+
+    def sample(self, thread_ids: set[int]) -> None:
+        """Add a sample of the current stacks of the threads."""
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id not in thread_ids:
+                continue
+            stack: list[_Function] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            self._add(stack)
+
+    def _add(self, stack: list[_Function]) -> None:
+        """Count a stack, innermost frame first."""
+        if not stack:
+            return
+        self._own[stack[0]] = self._own.get(stack[0], 0) + 1
+        # Recursive functions are counted once per sample
+        for function, caller in dict(zip(stack, stack[1:] + [None])).items():
+            self._total[function] = self._total.get(function, 0) + 1
+            if caller is not None:
+                callers = self._callers.setdefault(function, {})
+                callers[caller] = callers.get(caller, 0) + 1
+
+    def to_stats(self, stream: IO[str]) -> pstats.Stats:
+        interval = self.interval
+        stats = pstats.Stats(stream=stream)
+        # Same layout as the stats of cProfile.Profile
+        stats.stats = {  # type: ignore[attr-defined]
+            function: (
+                total,
+                total,
+                self._own.get(function, 0) * interval,
+                total * interval,
+                {
+                    caller: (count, count, 0.0, count * interval)
+                    for caller, count in self._callers.get(function, {}).items()
+                },
+            )
+            for function, total in self._total.items()
+        }
+        # Totals and top level functions are computed from the stats
+        stats.get_top_level_stats()
+        return stats
+
+
+class _ProfileRequest:
+    def __init__(self, cycles: int, interval: float):
+        self.cycles = cycles
+        self.cycles_done = 0
+        self.profile = _SampledProfile(interval)
+        self.done = threading.Event()
+
+
+class CycleProfiler:
+    """
+    Captures statistics of the next N bot cycles on request.
+
+    Stacks of the thread running the cycle and of the threads it starts, such as the
+    pipeline workers, are sampled every `interval` seconds.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._request: Optional[_ProfileRequest] = None
+
+    def profile_cycles(
+        self, cycles: int, timeout: float, sort: str = "cumulative", limit: int = 50
+    ) -> str:
+        """
+        Profile the next `cycles` bot cycles and return pstats report of the samples.
+
+        Blocks until the cycles are finished.
+
+        Raises:
+            RuntimeError: If another profile is already in progress
+            TimeoutError: If cycles were not finished in `timeout` seconds
+        """
+        request = _ProfileRequest(cycles, self.interval)
+        with self._lock:
+            if self._request is not None:
+                raise RuntimeError("Another profile is already in progress")
+            self._request = request
+
+        try:
+            if not request.done.wait(timeout):
+                raise TimeoutError(
+                    f"Profiled {request.cycles_done} of {cycles} cycles in {timeout} seconds"
+                )
+        finally:
+            with self._lock:
+                self._request = None
+
+        stream = io.StringIO()
+        stream.write(
+            f"Profile of {cycles} bot cycle(s), "
+            f"stacks sampled every {self.interval * 1000:g} ms, "
+            "ncalls is the number of samples, not calls\n"
+        )
+        request.profile.to_stats(stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    @contextmanager
+    def cycle(self) -> Iterator[None]:
+        """Wrap a bot cycle. Profiles it only if a profile was requested."""
+        request = self._request
+        if request is None or request.done.is_set():
+            yield
+            return
+
+        # Threads started by the cycle are sampled, the ones running before are not
+        cycle_thread = threading.get_ident()
+        excluded = {thread.ident for thread in threading.enumerate()} - {cycle_thread}
+        stop = threading.Event()
+        sampler = threading.Thread(
+            target=self._sample,
+            args=(request.profile, excluded, stop),
+            name="cycle-profiler",
+            daemon=True,
+        )
+        sampler.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            sampler.join()
+            request.cycles_done += 1
+            if request.cycles_done >= request.cycles:
+                request.done.set()
+
+    def _sample(
+        self,
+        profile: _SampledProfile,
+        excluded: set[Optional[int]],
+        stop: threading.Event,
+    ) -> None:
+        excluded = excluded | {threading.get_ident()}
+        while not stop.wait(self.interval):
+            profile.sample(set(sys._current_frames()) - excluded)
+
+
+cycle_profiler = CycleProfiler()
+
+
+def allocations_snapshot(seconds: float, top: int) -> str:
+    """
+    Trace memory allocations for `seconds` and return top-N allocation sites.
+
+    If tracemalloc is already running, the snapshot is taken immediately.
+    """
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start()
+        time.sleep(seconds)
+
+    try:
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+
+    stats = snapshot.statistics("lineno")
+    lines = [f"Top {top} allocation sites out of {len(stats)}"]
+    lines.extend(str(stat) for stat in stats[:top])
+    return "\n".join(lines) + "\n"
+
+
+def thread_stacks(collapsed: bool = False) -> str:
+    """
+    Dump stacks of all threads.
+
+    Collapsed format emits one `thread;frame;frame... 1` line per thread,
+    compatible with flamegraph tools.
+    """
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    lines = []
+    for thread_id, frame in sys._current_frames().items():
+        name = names.get(thread_id, str(thread_id))
+        stack = traceback.extract_stack(frame)
+        if collapsed:
+            frames = ";".join(
+                f"{entry.name} ({entry.filename}:{entry.lineno})" for entry in stack
+            )
+            lines.append(f"{name};{frames} 1")
+        else:
+            lines.append(f"Thread {name} ({thread_id}):")
+            lines.extend(line.rstrip() for line in traceback.format_list(stack))
+            lines.append("")
+    return "\n".join(lines) + "\n"
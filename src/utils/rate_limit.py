@@ -0,0 +1,196 @@
+import random
+import threading
+import time
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+import requests
+import structlog
+from requests.adapters import HTTPAdapter
+
+from src.metrics.cycle_stats import endpoint_label
+from src.metrics.metrics import RPC_RATE_LIMIT_WAIT, RPC_RETRIES, RPC_THROTTLED
+
+logger = structlog.get_logger(__name__)
+
+# Responses worth retrying: throttling and transient server errors
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRY_DELAY_SECONDS = 30.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens are refilled continuously at `rate` per second up to `burst`. A request
+    takes one token, callers either skip a bucket without tokens or wait for one.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available."""
+        with self._lock:
+            self._refill()
+            return max(0.0, (1 - self._tokens) / self.rate)
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available right now."""
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def acquire(self) -> float:
+        """
+        Take a token, waiting for it if needed.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+_shared_buckets: dict[str, TokenBucket] = {}
+_shared_buckets_lock = threading.Lock()
+
+
+def shared_bucket(endpoint: str, rate: float) -> Optional[TokenBucket]:
+    """
+    Token bucket of the endpoint host and port.
+
+    EL and CL clients served by the same host share the bucket, so the bot stays
+    within the provider quota as a whole. The lowest configured rate wins.
+    """
+    if rate <= 0:
+        return None
+    host = urlparse(endpoint).netloc.lower()
+    with _shared_buckets_lock:
+        bucket = _shared_buckets.get(host)
+        if bucket is None:
+            bucket = _shared_buckets[host] = TokenBucket(rate)
+        elif rate < bucket.rate:
+            bucket.rate = rate
+            bucket.burst = max(1.0, rate)
+        return bucket
+
+
+def retry_delay(
+    attempt: int, backoff_seconds: float, retry_after: Optional[str] = None
+) -> float:
+    """
+    Delay before the next attempt.
+
+    Retry-After from the server takes precedence, otherwise exponential backoff with
+    jitter, so clients throttled together don't retry together.
+    """
+    if retry_after:
+        try:
+            return min(MAX_RETRY_DELAY_SECONDS, max(0.0, float(retry_after)))
+        except ValueError:
+            # HTTP date format is not worth parsing here
+            pass
+    delay = min(MAX_RETRY_DELAY_SECONDS, backoff_seconds * 2**attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def wait_for_bucket(bucket: Optional[TokenBucket], layer: str, endpoint: str) -> None:
+    if bucket is None:
+        return
+    waited = bucket.acquire()
+    if waited:
+        RPC_RATE_LIMIT_WAIT.labels(layer=layer, endpoint=endpoint).inc(waited)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter pacing requests with a token bucket.
+
+    Requests wait for the bucket instead of failing. Throttled (429), transient 5xx
+    and connection failures are retried with jittered backoff.
+    """
+
+    def __init__(
+        self,
+        layer: str,
+        bucket: Optional[TokenBucket],
+        retries: int,
+        backoff_seconds: float,
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        self.layer = layer
+        self.bucket = bucket
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream=False,
+        timeout=None,
+        verify=True,
+        cert=None,
+        proxies=None,
+    ) -> requests.Response:
+        endpoint = endpoint_label(request.url or "")
+        attempt = 0
+        while True:
+            wait_for_bucket(self.bucket, self.layer, endpoint)
+            try:
+                response = super().send(request, stream, timeout, verify, cert, proxies)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.retries:
+                    raise
+                reason = "connection"
+                delay = retry_delay(attempt, self.backoff_seconds)
+            else:
+                if response.status_code not in RETRY_STATUS_CODES:
+                    return response
+                RPC_THROTTLED.labels(
+                    layer=self.layer,
+                    endpoint=endpoint,
+                    status=str(response.status_code),
+                ).inc()
+                if attempt >= self.retries:
+                    return response
+                reason = str(response.status_code)
+                delay = retry_delay(
+                    attempt, self.backoff_seconds, response.headers.get("Retry-After")
+                )
+                response.close()
+
+            RPC_RETRIES.labels(layer=self.layer).inc()
+            logger.warning(
+                {
+                    "msg": "Request failed, retrying.",
+                    "layer": self.layer,
+                    "endpoint": endpoint,
+                    "reason": reason,
+                    "attempt": attempt + 1,
+                    "delay": round(delay, 3),
+                }
+            )
+            time.sleep(delay)
+            attempt += 1
@@ -0,0 +1,398 @@
+"""
+Memory-mapped snapshot of the beacon chain validator registry.
+
+The head validator set has well over a million entries. Parsed from JSON into a dict per
+entry it takes gigabytes of memory and minutes to load. The snapshot keeps every
+validator as a fixed-width record in `<path>.bin`, at the offset of its index, and an
+open addressing hash table of pubkeys in `<path>.idx`. Both files are opened with mmap,
+so lookups by index and by pubkey are O(1) and opening a snapshot costs almost nothing.
+
+The snapshot is built once and then refreshed incrementally every epoch: validators in a
+status that may still change are fetched again and new validators are appended. Records
+are updated in place, the epoch in the header is written last, so an interrupted refresh
+is repeated by the next one. A snapshot older than the shortest path from active_ongoing
+to withdrawal_done, e.g. reopened after a long downtime, is rebuilt instead.
+"""
+
+import mmap
+import os
+import struct
+import threading
+from array import array
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+import structlog
+from eth_typing import HexStr
+
+from src.blockchain.constants import SLOTS_PER_EPOCH
+from src.metrics.metrics import VALIDATOR_REGISTRY_EPOCH, VALIDATOR_REGISTRY_SIZE
+
+if TYPE_CHECKING:
+    from src.utils.cl_client import CLClient
+
+logger = structlog.get_logger(__name__)
+
+MAGIC = b"VALREG01"
+# magic, epoch, number of records
+HEADER = struct.Struct("<8sQQ8x")
+# index, pubkey, exit epoch, withdrawable epoch, status
+RECORD = struct.Struct("<Q48sQQB7x")
+PUBKEY_OFFSET = 8
+STATUS_OFFSET = 72
+PUBKEY_SIZE = 48
+EMPTY_PUBKEY = bytes(PUBKEY_SIZE)
+MIN_INDEX_SLOTS = 1024
+
+STATUSES = (
+    "pending_initialized",
+    "pending_queued",
+    "active_ongoing",
+    "active_exiting",
+    "active_slashed",
+    "exited_unslashed",
+    "exited_slashed",
+    "withdrawal_possible",
+    "withdrawal_done",
+)
+EXITED_STATUSES = frozenset(
+    ("exited_unslashed", "exited_slashed", "withdrawal_possible", "withdrawal_done")
+)
+# Validators leave active_ongoing only to statuses below, withdrawal_done is final
+CHANGING_STATUSES = [
+    status for status in STATUSES if status not in ("active_ongoing", "withdrawal_done")
+]
+_CHANGING_CODES = frozenset(STATUSES.index(status) for status in CHANGING_STATUSES)
+# Fewest epochs from active_ongoing to withdrawal_done: the exit epoch is at least
+# MAX_SEED_LOOKAHEAD + 1 ahead, then MIN_VALIDATOR_WITHDRAWABILITY_DELAY passes.
+# Over this gap an active validator may skip every changing status
+MIN_EXIT_TO_WITHDRAWAL_EPOCHS = 4 + 1 + 256
+
+
+@dataclass(frozen=True)
+class ValidatorRecord:
+    index: int
+    pubkey: HexStr
+    status: str
+    exit_epoch: int
+    withdrawable_epoch: int
+
+    @property
+    def exited(self) -> bool:
+        return self.status in EXITED_STATUSES
+
+
+def _pack(validator: dict[str, Any]) -> bytes:
+    """Record of a validator from the beacon API."""
+    details = validator["validator"]
+    return RECORD.pack(
+        int(validator["index"]),
+        bytes.fromhex(details["pubkey"].removeprefix("0x")),
+        int(details["exit_epoch"]),
+        int(details["withdrawable_epoch"]),
+        STATUSES.index(validator["status"]),
+    )
+
+
+def _slot(pubkey: bytes, mask: int) -> int:
+    # BLS pubkeys start with flag bits, the tail is uniformly distributed
+    return int.from_bytes(pubkey[-8:], "big") & mask
+
+
+class ValidatorRegistry:
+    """
+    Validator registry snapshot stored next to `path`.
+
+    Args:
+        path: Base path of the snapshot files, `.bin` and `.idx` suffixes are added
+    """
+
+    def __init__(self, path: Path):
+        self.records_path = path.with_suffix(".bin")
+        self.index_path = path.with_suffix(".idx")
+        self.epoch: Optional[int] = None
+        self._count = 0
+        self._lock = threading.RLock()
+        self._records: Optional[mmap.mmap] = None
+        self._index: Optional[mmap.mmap] = None
+        self._slots: Optional[memoryview] = None
+        self._open()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, index: int) -> Optional[ValidatorRecord]:
+        with self._lock:
+            if self._records is None or not 0 <= index < self._count:
+                return None
+            return self._record(index)
+
+    def get_by_pubkey(self, pubkey: HexStr) -> Optional[ValidatorRecord]:
+        with self._lock:
+            position = self._find(bytes.fromhex(pubkey.removeprefix("0x")))
+            return None if position is None else self._record(position)
+
+    def pubkeys(self) -> Mapping[int, HexStr]:
+        """Pubkeys by validator index, read from the snapshot on access."""
+        return _Pubkeys(self)
+
+    def refresh(self, cl_client: "CLClient") -> bool:
+        """
+        Bring the snapshot to the head epoch.
+
+        Returns:
+            False if the snapshot is already at the head epoch
+        """
+        head_slot = cl_client.get_head_slot()
+        epoch = head_slot // SLOTS_PER_EPOCH
+        with self._lock:
+            if self.epoch == epoch:
+                return False
+            # All requests of a refresh read the same state
+            state_id = str(head_slot)
+            if (
+                self._records is None
+                or self.epoch is None
+                or epoch - self.epoch >= MIN_EXIT_TO_WITHDRAWAL_EPOCHS
+            ):
+                self._build(cl_client.iter_validators(state_id), epoch)
+            else:
+                self._update(cl_client, state_id, epoch)
+        logger.info(
+            {
+                "msg": "Validator registry snapshot refreshed",
+                "epoch": epoch,
+                "validators": self._count,
+            }
+        )
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    def _open(self) -> None:
+        try:
+            records_file = open(self.records_path, "r+b")
+        except FileNotFoundError:
+            return
+        with records_file:
+            header = records_file.read(HEADER.size)
+            if len(header) < HEADER.size or header[:8] != MAGIC:
+                logger.warning(
+                    {"msg": "Unknown validator registry snapshot, ignoring."}
+                )
+                return
+            _, epoch, count = HEADER.unpack(header)
+            # Records appended by an interrupted refresh
+            records_file.truncate(HEADER.size + count * RECORD.size)
+            self._records = mmap.mmap(records_file.fileno(), 0)
+        self._count = count
+        try:
+            with open(self.index_path, "r+b") as index_file:
+                self._index = mmap.mmap(index_file.fileno(), 0)
+            self._slots = memoryview(self._index).cast("I")
+        except FileNotFoundError:
+            self._write_index(range(count))
+        self.epoch = epoch
+        self._export()
+
+    def _close(self) -> None:
+        if self._slots is not None:
+            self._slots.release()
+        for mapped in (self._records, self._index):
+            if mapped is not None:
+                mapped.close()
+        self._records = self._index = self._slots = None
+
+    def _record(self, position: int) -> ValidatorRecord:
+        assert self._records is not None
+        index, pubkey, exit_epoch, withdrawable_epoch, status = RECORD.unpack_from(
+            self._records, HEADER.size + position * RECORD.size
+        )
+        return ValidatorRecord(
+            index=index,
+            pubkey=HexStr("0x" + pubkey.hex()),
+            status=STATUSES[status],
+            exit_epoch=exit_epoch,
+            withdrawable_epoch=withdrawable_epoch,
+        )
+
+    def _pubkey_at(self, position: int) -> bytes:
+        assert self._records is not None
+        offset = HEADER.size + position * RECORD.size + PUBKEY_OFFSET
+        return self._records[offset : offset + PUBKEY_SIZE]
+
+    def _find(self, pubkey: bytes) -> Optional[int]:
+        if self._slots is None:
+            return None
+        mask = len(self._slots) - 1
+        slot = _slot(pubkey, mask)
+        while True:
+            value = self._slots[slot]
+            if value == 0:
+                return None
+            position = value - 1
+            # Positions over the count are left by an interrupted refresh
+            if position < self._count and self._pubkey_at(position) == pubkey:
+                return position
+            slot = (slot + 1) & mask
+
+    def _build(self, validators: Iterable[dict[str, Any]], epoch: int) -> None:
+        """Write a new snapshot from a full validator set."""
+        self.records_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.records_path.with_suffix(".bin.tmp")
+        count = 0
+        with open(tmp_path, "wb") as records_file:
+            records_file.write(HEADER.pack(MAGIC, epoch, 0))
+            for validator in validators:
+                index = int(validator["index"])
+                if index != count:
+                    records_file.seek(HEADER.size + index * RECORD.size)
+                records_file.write(_pack(validator))
+                count = max(count, index + 1)
+            records_file.truncate(HEADER.size + count * RECORD.size)
+            records_file.seek(0)
+            records_file.write(HEADER.pack(MAGIC, epoch, count))
+
+        self._close()
+        os.replace(tmp_path, self.records_path)
+        with open(self.records_path, "r+b") as records_file:
+            self._records = mmap.mmap(records_file.fileno(), 0)
+        self._count = count
+        self._write_index(range(count))
+        self.epoch = epoch
+        self._export()
+
+    def _write_index(self, positions: Iterable[int]) -> None:
+        """Write a new pubkey hash table of the records, at most half full."""
+        size = MIN_INDEX_SLOTS
+        while size < 2 * self._count:
+            size *= 2
+        slots = array("I", bytes(4 * size))
+        mask = size - 1
+        for position in positions:
+            pubkey = self._pubkey_at(position)
+            if pubkey == EMPTY_PUBKEY:
+                continue
+            slot = _slot(pubkey, mask)
+            while slots[slot]:
+                slot = (slot + 1) & mask
+            slots[slot] = position + 1
+
+        if self._slots is not None:
+            self._slots.release()
+        if self._index is not None:
+            self._index.close()
+        tmp_path = self.index_path.with_suffix(".idx.tmp")
+        with open(tmp_path, "wb") as index_file:
+            slots.tofile(index_file)
+        os.replace(tmp_path, self.index_path)
+        with open(self.index_path, "r+b") as index_file:
+            self._index = mmap.mmap(index_file.fileno(), 0)
+        self._slots = memoryview(self._index).cast("I")
+
+    def _insert(self, position: int) -> None:
+        assert self._slots is not None
+        pubkey = self._pubkey_at(position)
+        mask = len(self._slots) - 1
+        slot = _slot(pubkey, mask)
+        while self._slots[slot]:
+            if self._slots[slot] == position + 1:
+                return
+            slot = (slot + 1) & mask
+        self._slots[slot] = position + 1
+
+    def _update(self, cl_client: "CLClient", state_id: str, epoch: int) -> None:
+        """Apply status changes and new validators of the state to the snapshot."""
+        assert self._records is not None
+        changed = {
+            int(validator["index"]): validator
+            for validator in cl_client.iter_validators(
+                state_id, statuses=CHANGING_STATUSES
+            )
+        }
+        # Validators that left a changing status since the last refresh
+        statuses = self._records[
+            HEADER.size + STATUS_OFFSET : HEADER.size
+            + self._count * RECORD.size : RECORD.size
+        ]
+        left = [
+            position
+            for position, code in enumerate(statuses)
+            if code in _CHANGING_CODES and position not in changed
+        ]
+        for validator in cl_client.iter_validators(state_id, ids=left):
+            changed[int(validator["index"])] = validator
+        # Validators deposited since the last refresh, including the ones already
+        # active: indexes below a pending one need not be in a changing status
+        for validator in self._iter_new(cl_client, state_id):
+            changed[int(validator["index"])] = validator
+
+        count = max(self._count, max(changed, default=-1) + 1)
+        if count > self._count:
+            self._grow(count)
+        for index, validator in changed.items():
+            self._records[
+                HEADER.size + index * RECORD.size : HEADER.size
+                + (index + 1) * RECORD.size
+            ] = _pack(validator)
+
+        previous_count, self._count = self._count, count
+        assert self._slots is not None
+        if 2 * count > len(self._slots):
+            self._write_index(range(count))
+        else:
+            for position in range(previous_count, count):
+                self._insert(position)
+        self._index.flush()  # type: ignore[union-attr]
+        HEADER.pack_into(self._records, 0, MAGIC, epoch, count)
+        self._records.flush()
+        self.epoch = epoch
+        self._export()
+
+    def _iter_new(
+        self, cl_client: "CLClient", state_id: str
+    ) -> Iterator[dict[str, Any]]:
+        """Validators over the snapshot, requested in batches until one is empty."""
+        start = self._count
+        while True:
+            batch = list(
+                cl_client.iter_validators(
+                    state_id, ids=range(start, start + cl_client.IDS_PER_REQUEST)
+                )
+            )
+            yield from batch
+            if not batch:
+                return
+            start = max(int(validator["index"]) for validator in batch) + 1
+
+    def _grow(self, count: int) -> None:
+        assert self._records is not None
+        self._records.close()
+        with open(self.records_path, "r+b") as records_file:
+            records_file.truncate(HEADER.size + count * RECORD.size)
+            self._records = mmap.mmap(records_file.fileno(), 0)
+
+    def _export(self) -> None:
+        VALIDATOR_REGISTRY_EPOCH.set(self.epoch or 0)
+        VALIDATOR_REGISTRY_SIZE.set(self._count)
+
+
+class _Pubkeys(Mapping[int, HexStr]):
+    def __init__(self, registry: ValidatorRegistry):
+        self.registry = registry
+
+    def __getitem__(self, index: int) -> HexStr:
+        record = self.registry.get(index)
+        if record is None or record.pubkey == "0x" + EMPTY_PUBKEY.hex():
+            raise KeyError(index)
+        return record.pubkey
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(len(self.registry)))
+
+    def __len__(self) -> int:
+        return len(self.registry)
@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 from typing import Optional
 
 import structlog
@@ -11,8 +12,29 @@ logger = structlog.get_logger(__name__)
 # EL node
 WEB3_RPC_ENDPOINTS = os.getenv("WEB3_RPC_ENDPOINTS", "").split(",")
 
+
+def _float_list(value: str) -> list[float]:
+    """Comma-separated numbers, empty entries are 0."""
+    if not value.strip():
+        return []
+    return [float(item) if item.strip() else 0.0 for item in value.split(",")]
+
+
+# Read-only EL calls are spread across endpoints proportionally to weight / latency.
+# One value per endpoint in WEB3_RPC_ENDPOINTS order, missing or 0 means 1
+WEB3_RPC_WEIGHTS = _float_list(os.getenv("WEB3_RPC_WEIGHTS", ""))
+# Requests per second allowed for every endpoint, missing or 0 means no limit
+WEB3_RPC_RATE_LIMITS = _float_list(os.getenv("WEB3_RPC_RATE_LIMITS", ""))
+
 # CL node
 CL_RPC_ENDPOINTS = os.getenv("CL_RPC_ENDPOINTS", "").split(",")
+# Requests per second allowed for every CL endpoint, missing or 0 means no limit.
+# EL and CL endpoints on the same host and port share one limit
+CL_RPC_RATE_LIMITS = _float_list(os.getenv("CL_RPC_RATE_LIMITS", ""))
+
+# Retries of throttled (429), 5xx and failed EL/CL requests, with jittered exponential backoff
+RPC_MAX_RETRIES = int(os.getenv("RPC_MAX_RETRIES", 5))
+RPC_RETRY_BACKOFF_SECONDS = float(os.getenv("RPC_RETRY_BACKOFF_SECONDS", 0.5))
 
 # Account private key
 WALLET_PRIVATE_KEY = os.getenv("WALLET_PRIVATE_KEY", None)
@@ -29,6 +51,17 @@ if WALLET_PRIVATE_KEY:
 else:
     logger.warning({"msg": "Account not provided. Run in dry mode."})
 
+# Additional signer keys (comma-separated). Independent trigger_exits transactions are
+# spread across WALLET_PRIVATE_KEY and these accounts
+WALLET_PRIVATE_KEYS = os.getenv("WALLET_PRIVATE_KEYS", "")
+ACCOUNTS: list[LocalAccount] = []
+if ACCOUNT:
+    ACCOUNTS = [ACCOUNT] + [
+        Account.from_key(key.strip())
+        for key in WALLET_PRIVATE_KEYS.split(",")
+        if key.strip()
+    ]
+
 # Transactions settings
 DRY_RUN = os.getenv("DRY_RUN") == "true"
 
@@ -36,6 +69,12 @@ MIN_PRIORITY_FEE = Web3.to_wei(*os.getenv("MIN_PRIORITY_FEE", "50 mwei").split("
 MAX_PRIORITY_FEE = Web3.to_wei(*os.getenv("MAX_PRIORITY_FEE", "1 gwei").split(" "))
 
 MAX_GAS_FEE = Web3.to_wei(*os.getenv("MAX_GAS_FEE", "10 gwei").split(" "))
+
+# Balance a signer keeps above the transaction value, accounts below it are skipped
+SIGNER_MIN_BALANCE = Web3.to_wei(
+    *os.getenv("SIGNER_MIN_BALANCE", "0.01 ether").split(" ")
+)
+
 CONTRACT_GAS_LIMIT = int(os.getenv("CONTRACT_GAS_LIMIT", 15 * 10**6))
 
 # Curated module strategy
@@ -52,12 +91,21 @@ MAX_BUFFERED_ETHERS = Web3.to_wei(
 
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# full - log every validator check, aggregate - per-payload summaries and sampled validator lines
+LOG_MODE = os.getenv("LOG_MODE", "full").lower()
+# Share of per-validator log lines written in aggregate mode
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
 
 # Metrics
 PROMETHEUS_PORT = int(os.getenv("PROMETHEUS_PORT", "9000"))
 PROMETHEUS_PREFIX = os.getenv("PROMETHEUS_PREFIX", "validator_exit_bot")
 SERVER_PORT = int(os.getenv("SERVER_PORT", "9010"))
 
+# Profiling endpoints (/debug/*). Disabled if port is 0.
+# Endpoints are not authenticated, so the server must be bound to a trusted interface
+DEBUG_SERVER_HOST = os.getenv("DEBUG_SERVER_HOST", "127.0.0.1")
+DEBUG_SERVER_PORT = int(os.getenv("DEBUG_SERVER_PORT", "0"))
+
 # List of ids of staking modules in which the depositor bot will make deposits
 _env_whitelist = os.getenv("MODULES_WHITELIST", "").strip()
 MODULES_WHITELIST = (
@@ -66,6 +114,11 @@ MODULES_WHITELIST = (
     else []
 )
 DEPOSIT_MODULES_WHITELIST = MODULES_WHITELIST  # Alias for metrics compatibility
+# How often the list of staking modules is re-read from the staking router.
+# An empty MODULES_WHITELIST means all discovered modules are processed.
+STAKING_MODULES_REFRESH_INTERVAL_SECONDS = int(
+    os.getenv("STAKING_MODULES_REFRESH_INTERVAL_SECONDS", 60 * 60)
+)
 # Same as min deposit block distance on mainnet for all modules
 # https://etherscan.io/address/0xFdDf38947aFB03C621C71b06C9C70bce73f12999#readProxyContract#F38
 BLOCKS_BETWEEN_EXECUTION = int(os.getenv("BLOCKS_BETWEEN_EXECUTION", 25))
@@ -73,33 +126,137 @@ BLOCKS_BETWEEN_EXECUTION = int(os.getenv("BLOCKS_BETWEEN_EXECUTION", 25))
 # Bot cycle sleep interval in seconds
 SLEEP_INTERVAL_SECONDS = int(os.getenv("SLEEP_INTERVAL_SECONDS", 60))
 
+# Work allowed for one bot cycle, the rest is resumed by the next cycle without sleeping.
+# 0 means no limit
+CYCLE_BUDGET_SECONDS = float(os.getenv("CYCLE_BUDGET_SECONDS", SLEEP_INTERVAL_SECONDS))
+CYCLE_BUDGET_RPC_REQUESTS = int(os.getenv("CYCLE_BUDGET_RPC_REQUESTS", 0))
+
+# Workers of the tx fetch/decode and status check pipeline stages, and the size of the
+# queue in front of every stage. A full queue blocks the stage feeding it
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", 4))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 16))
+
+# Sharding across bot instances, see src/sharding.py. SHARD_COUNT=1 disables it.
+# SHARD_KEY is "module" (validators by module_id % SHARD_COUNT) or "payload" (whole
+# payloads by exitRequestsHash). Without SHARD_ID every instance leases a free shard
+# from SHARD_LEASE_DIR, which must be shared by the instances. Every instance needs
+# its own WALLET_PRIVATE_KEY and DATA_DIR
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", 1))
+_env_shard_id = os.getenv("SHARD_ID", "")
+SHARD_ID = int(_env_shard_id) if _env_shard_id else None
+SHARD_KEY = os.getenv("SHARD_KEY", "module")
+# Expired leases are taken over by other instances. Must exceed the time between
+# renewals: a cycle, the sleep after it and the time a sent transaction waits for
+# inclusion
+SHARD_LEASE_TTL_SECONDS = float(
+    os.getenv(
+        "SHARD_LEASE_TTL_SECONDS",
+        max(3 * (CYCLE_BUDGET_SECONDS + SLEEP_INTERVAL_SECONDS), 600),
+    )
+)
+SHARD_INSTANCE_ID = os.getenv(
+    "SHARD_INSTANCE_ID", f"{os.uname().nodename}-{os.getpid()}"
+)
+
 # Lookback period in days for initial scan on bot startup
 LOOKBACK_DAYS = int(os.getenv("LOOKBACK_DAYS", 7))
 
+# Directory for files persisted between restarts. Locked by the instance using it,
+# instances must not share it
+DATA_DIR = Path(os.getenv("DATA_DIR", "./data"))
+
+# How long contract addresses resolved through LidoLocator are reused after restart.
+# 0 disables the on-disk address cache
+ADDRESS_CACHE_TTL_SECONDS = int(os.getenv("ADDRESS_CACHE_TTL_SECONDS", 24 * 60 * 60))
+
+# Shard leases, see SHARD_COUNT. Shared by the instances, so not in DATA_DIR
+SHARD_LEASE_DIR = Path(os.getenv("SHARD_LEASE_DIR", "./leases"))
+
+# Raw exit requests data of tracked payloads kept in memory. Least recently used
+# payloads over the budget are spilled to DATA_DIR/payloads. 0 means no limit
+PAYLOAD_MEMORY_BUDGET_BYTES = int(
+    os.getenv("PAYLOAD_MEMORY_BUDGET_BYTES", 64 * 1024 * 1024)
+)
+
+# Delay before the first retry of an event that failed to process, doubled on every
+# failure. Failed events are kept in DATA_DIR/dead_letters.json
+DEAD_LETTER_RETRY_SECONDS = float(os.getenv("DEAD_LETTER_RETRY_SECONDS", 5 * 60))
+
+# Size limit of the on-disk cache of finalized transactions, receipts and logs.
+# 0 disables the cache
+DISK_CACHE_MAX_BYTES = int(os.getenv("DISK_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Check validator statuses in a memory-mapped snapshot of the beacon validator registry
+# (DATA_DIR/validator_registry.*) instead of a CL request per validator. The first start
+# downloads the whole registry, then only changed and new validators are fetched per epoch
+VALIDATOR_REGISTRY_SNAPSHOT = os.getenv("VALIDATOR_REGISTRY_SNAPSHOT") == "true"
+
+# Record EL/CL traffic to a cassette file or replay it without network access.
+# Empty - disabled, record - write requests and responses, replay - serve them from the file
+RPC_CASSETTE_MODE = os.getenv("RPC_CASSETTE_MODE", "").lower()
+RPC_CASSETTE_PATH = Path(
+    os.getenv("RPC_CASSETTE_PATH", str(DATA_DIR / "cassette.jsonl.gz"))
+)
+# Sleep for the recorded request duration when replaying
+RPC_CASSETTE_PRESERVE_LATENCY = os.getenv("RPC_CASSETTE_PRESERVE_LATENCY") == "true"
+
 # All non-private env variables to the logs in main
 PUBLIC_ENV_VARS = {
     "LIDO_LOCATOR": LIDO_LOCATOR,
+    "WEB3_RPC_WEIGHTS": WEB3_RPC_WEIGHTS,
+    "WEB3_RPC_RATE_LIMITS": WEB3_RPC_RATE_LIMITS,
+    "CL_RPC_RATE_LIMITS": CL_RPC_RATE_LIMITS,
+    "RPC_MAX_RETRIES": RPC_MAX_RETRIES,
+    "RPC_RETRY_BACKOFF_SECONDS": RPC_RETRY_BACKOFF_SECONDS,
     "DRY_RUN": DRY_RUN,
     "MIN_PRIORITY_FEE": MIN_PRIORITY_FEE,
     "MAX_PRIORITY_FEE": MAX_PRIORITY_FEE,
     "MAX_GAS_FEE": MAX_GAS_FEE,
+    "SIGNER_MIN_BALANCE": SIGNER_MIN_BALANCE,
     "GAS_FEE_PERCENTILE_1": GAS_FEE_PERCENTILE_1,
     "GAS_FEE_PERCENTILE_DAYS_HISTORY_1": GAS_FEE_PERCENTILE_DAYS_HISTORY_1,
     "GAS_PRIORITY_FEE_PERCENTILE": GAS_PRIORITY_FEE_PERCENTILE,
     "MAX_BUFFERED_ETHERS": MAX_BUFFERED_ETHERS,
     "LOG_LEVEL": LOG_LEVEL,
+    "LOG_MODE": LOG_MODE,
+    "LOG_SAMPLE_RATE": LOG_SAMPLE_RATE,
     "PROMETHEUS_PORT": PROMETHEUS_PORT,
     "PROMETHEUS_PREFIX": PROMETHEUS_PREFIX,
     "SERVER_PORT": SERVER_PORT,
+    "DEBUG_SERVER_HOST": DEBUG_SERVER_HOST,
+    "DEBUG_SERVER_PORT": DEBUG_SERVER_PORT,
     "ACCOUNT": "" if ACCOUNT is None else ACCOUNT.address,
+    "ACCOUNTS": [account.address for account in ACCOUNTS],
     "BLOCKS_BETWEEN_EXECUTION": BLOCKS_BETWEEN_EXECUTION,
+    "MODULES_WHITELIST": MODULES_WHITELIST,
+    "STAKING_MODULES_REFRESH_INTERVAL_SECONDS": STAKING_MODULES_REFRESH_INTERVAL_SECONDS,
     "SLEEP_INTERVAL_SECONDS": SLEEP_INTERVAL_SECONDS,
+    "CYCLE_BUDGET_SECONDS": CYCLE_BUDGET_SECONDS,
+    "CYCLE_BUDGET_RPC_REQUESTS": CYCLE_BUDGET_RPC_REQUESTS,
+    "PIPELINE_WORKERS": PIPELINE_WORKERS,
+    "PIPELINE_QUEUE_SIZE": PIPELINE_QUEUE_SIZE,
+    "SHARD_COUNT": SHARD_COUNT,
+    "SHARD_ID": SHARD_ID,
+    "SHARD_KEY": SHARD_KEY,
+    "SHARD_LEASE_DIR": SHARD_LEASE_DIR,
+    "SHARD_LEASE_TTL_SECONDS": SHARD_LEASE_TTL_SECONDS,
+    "SHARD_INSTANCE_ID": SHARD_INSTANCE_ID,
     "LOOKBACK_DAYS": LOOKBACK_DAYS,
+    "DATA_DIR": DATA_DIR,
+    "ADDRESS_CACHE_TTL_SECONDS": ADDRESS_CACHE_TTL_SECONDS,
+    "PAYLOAD_MEMORY_BUDGET_BYTES": PAYLOAD_MEMORY_BUDGET_BYTES,
+    "DEAD_LETTER_RETRY_SECONDS": DEAD_LETTER_RETRY_SECONDS,
+    "DISK_CACHE_MAX_BYTES": DISK_CACHE_MAX_BYTES,
+    "VALIDATOR_REGISTRY_SNAPSHOT": VALIDATOR_REGISTRY_SNAPSHOT,
+    "RPC_CASSETTE_MODE": RPC_CASSETTE_MODE,
+    "RPC_CASSETTE_PATH": RPC_CASSETTE_PATH,
+    "RPC_CASSETTE_PRESERVE_LATENCY": RPC_CASSETTE_PRESERVE_LATENCY,
 }
 
 PRIVATE_ENV_VARS = {
     "WEB3_RPC_ENDPOINTS": WEB3_RPC_ENDPOINTS,
     "WALLET_PRIVATE_KEY": WALLET_PRIVATE_KEY,
+    "WALLET_PRIVATE_KEYS": WALLET_PRIVATE_KEYS,
 }
 
 assert not set(PRIVATE_ENV_VARS.keys()).intersection(set(PUBLIC_ENV_VARS.keys()))
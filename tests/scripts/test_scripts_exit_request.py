@@ -7,6 +7,7 @@ from eth_typing.encoding import HexStr
 
 from scripts.exit_request import build_exit_request
 from scripts.kapi_client import KapiKey
+from src.utils.cl_client import CLClient
 
 
 class TestBuildExitRequest:
@@ -53,6 +54,9 @@ class TestBuildExitRequest:
         assert result[1].validator_index == 456
         assert result[1].validator_pub_key == "0x11223344"
         assert result[1].pub_key_index == 15
+        mock_cl_client.get_validators_by_indexes.assert_called_once_with(
+            validator_indexes
+        )
 
     def test_build_exit_request_validator_not_found_in_cl(self):
         """Test error when validator index is not found in CL."""
@@ -101,3 +105,58 @@ class TestBuildExitRequest:
         result = build_exit_request(mock_kapi_client, mock_cl_client, validator_indexes)
 
         assert len(result) == 0
+
+    def test_build_exit_request_keeps_requested_order(self):
+        """Test keys are returned in the order of the requested indexes."""
+        count = 5000
+        mock_cl_client = Mock()
+        mock_cl_client.get_validators_by_indexes.return_value = {
+            index: HexStr(f"0x{index:096x}") for index in range(count)
+        }
+
+        mock_kapi_client = Mock()
+        mock_kapi_client.get_keys.return_value = [
+            KapiKey(
+                module_id=1,
+                no_id=index % 7,
+                validator_pub_key=HexStr(f"0x{index:096X}"),
+                pub_key_index=index,
+            )
+            for index in range(count)
+        ]
+
+        validator_indexes = list(reversed(range(count)))
+        result = build_exit_request(mock_kapi_client, mock_cl_client, validator_indexes)
+
+        assert [key.validator_index for key in result] == validator_indexes
+        assert [key.pub_key_index for key in result] == validator_indexes
+        assert result[0].no_id == (count - 1) % 7
+
+
+class TestGetValidatorsByIndexes:
+    """Tests for CLClient.get_validators_by_indexes with requested indexes."""
+
+    def test_requests_only_given_indexes(self):
+        cl_client = CLClient("http://cl")
+        cl_client.iter_validators = Mock(
+            return_value=iter(
+                [
+                    {"index": "5", "validator": {"pubkey": "0x05"}},
+                    {"index": "9", "validator": {"pubkey": "0x09"}},
+                ]
+            )
+        )
+
+        result = cl_client.get_validators_by_indexes([9, 5, 9])
+
+        assert result == {5: "0x05", 9: "0x09"}
+        cl_client.iter_validators.assert_called_once_with(ids=[5, 9])
+
+    def test_registry_is_used_when_attached(self):
+        registry = Mock()
+        registry.pubkeys.return_value = {5: "0x05"}
+        cl_client = CLClient("http://cl", registry=registry)
+        cl_client.iter_validators = Mock()
+
+        assert cl_client.get_validators_by_indexes([5]) == {5: "0x05"}
+        cl_client.iter_validators.assert_not_called()
@@ -0,0 +1,84 @@
+"""Tests for the on-disk contract address cache."""
+
+import json
+
+from web3 import Web3
+
+from src.blockchain.address_cache import load_addresses, save_addresses
+
+LOCATOR = Web3.to_checksum_address("0xC1d0b3DE6792Bf6b4b37EccdcC24e45978Cfd2Eb")
+ADDRESSES = {
+    "validatorsExitBusOracle": Web3.to_checksum_address(
+        "0x0De4Ea0184c2ad0BacA7183356Aea5B8d5Bf5c6e"
+    ),
+    "stakingRouter": Web3.to_checksum_address(
+        "0xFdDf38947aFB03C621C71b06C9C70bce73f12999"
+    ),
+    "withdrawalVault": Web3.to_checksum_address(
+        "0xB9D7934878B5FB9610B3fE8A5e441e8fad7E293f"
+    ),
+}
+
+
+class TestAddressCache:
+    def test_roundtrip(self, tmp_path):
+        path = tmp_path / "addresses.json"
+        save_addresses(path, 1, LOCATOR, ADDRESSES)
+
+        assert load_addresses(path, 1, LOCATOR, 60) == ADDRESSES
+
+    def test_missing_file(self, tmp_path):
+        assert load_addresses(tmp_path / "addresses.json", 1, LOCATOR, 60) is None
+
+    def test_other_chain_ignored(self, tmp_path):
+        path = tmp_path / "addresses.json"
+        save_addresses(path, 1, LOCATOR, ADDRESSES)
+
+        assert load_addresses(path, 560048, LOCATOR, 60) is None
+
+    def test_other_locator_ignored(self, tmp_path):
+        path = tmp_path / "addresses.json"
+        save_addresses(path, 1, LOCATOR, ADDRESSES)
+
+        assert (
+            load_addresses(
+                path,
+                1,
+                Web3.to_checksum_address("0x28FAB2059C713A7F9D8c86Db49f9bb0e96Af1ef8"),
+                60,
+            )
+            is None
+        )
+
+    def test_expired_cache_ignored(self, tmp_path):
+        path = tmp_path / "addresses.json"
+        save_addresses(path, 1, LOCATOR, ADDRESSES)
+        cache = json.loads(path.read_text())
+        cache["resolved_at"] -= 120
+        path.write_text(json.dumps(cache))
+
+        assert load_addresses(path, 1, LOCATOR, 60) is None
+
+    def test_corrupted_cache_ignored(self, tmp_path):
+        path = tmp_path / "addresses.json"
+        path.write_text("{not json")
+
+        assert load_addresses(path, 1, LOCATOR, 60) is None
+
+    def test_incomplete_cache_ignored(self, tmp_path):
+        path = tmp_path / "addresses.json"
+        addresses = {
+            key: value for key, value in ADDRESSES.items() if key != "stakingRouter"
+        }
+        save_addresses(path, 1, LOCATOR, addresses)
+
+        assert load_addresses(path, 1, LOCATOR, 60) is None
+
+    def test_malformed_address_ignored(self, tmp_path):
+        path = tmp_path / "addresses.json"
+        save_addresses(path, 1, LOCATOR, ADDRESSES)
+        cache = json.loads(path.read_text())
+        cache["addresses"]["stakingRouter"] = "0x01"
+        path.write_text(json.dumps(cache))
+
+        assert load_addresses(path, 1, LOCATOR, 60) is None
@@ -0,0 +1,138 @@
+"""Tests for EL/CL traffic record and replay."""
+
+import datetime
+
+import pytest
+import requests
+
+from src.utils.cassette import (
+    CASSETTE_MODE_RECORD,
+    CASSETTE_MODE_REPLAY,
+    Cassette,
+    CassetteAdapter,
+    CassetteMiss,
+)
+from src.utils.cl_client import CLClient
+
+PARAMS = [
+    {"to": "0x0De4Ea0184c2ad0BacA7183356Aea5B8d5Bf5c6e", "data": "0x01"},
+    "latest",
+]
+
+
+def _cl_response(url: str, status: int, body: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = body.encode()
+    response.headers["Content-Type"] = "application/json"
+    response.elapsed = datetime.timedelta(milliseconds=5)
+    response.request = requests.Request("GET", url).prepare()
+    return response
+
+
+def _replay(path, **kwargs) -> Cassette:
+    return Cassette(path, CASSETTE_MODE_REPLAY, **kwargs)
+
+
+class TestCassette:
+    def test_el_roundtrip(self, tmp_path):
+        path = tmp_path / "cassette.jsonl.gz"
+        cassette = Cassette(path, CASSETTE_MODE_RECORD)
+        response = {"jsonrpc": "2.0", "id": 1, "result": "0x01"}
+        cassette.record_el("eth_call", PARAMS, response, 0.01)
+        cassette.close()
+
+        assert _replay(path).replay_el("eth_call", PARAMS) == response
+
+    def test_repeated_requests_replayed_in_order(self, tmp_path):
+        path = tmp_path / "cassette.jsonl.gz"
+        cassette = Cassette(path, CASSETTE_MODE_RECORD)
+        for block in (1, 2):
+            cassette.record_el("eth_blockNumber", [], {"result": hex(block)}, 0.01)
+        cassette.close()
+
+        replay = _replay(path)
+        results = [replay.replay_el("eth_blockNumber", [])["result"] for _ in range(3)]
+
+        # Last response is reused once recorded ones are exhausted
+        assert results == ["0x1", "0x2", "0x2"]
+
+    def test_unknown_request(self, tmp_path):
+        path = tmp_path / "cassette.jsonl.gz"
+        Cassette(path, CASSETTE_MODE_RECORD).close()
+
+        with pytest.raises(CassetteMiss):
+            _replay(path).replay_el("eth_call", PARAMS)
+
+    def test_cl_roundtrip_through_session(self, tmp_path):
+        path = tmp_path / "cassette.jsonl.gz"
+        cassette = Cassette(path, CASSETTE_MODE_RECORD)
+        url = "http://beacon:5052/eth/v1/beacon/states/head/validators/0xabc"
+        cassette.record_cl_response(_cl_response(url, 200, '{"data": {"index": "1"}}'))
+        cassette.close()
+
+        session = requests.Session()
+        session.mount("http://", CassetteAdapter(_replay(path)))
+        # Requests are matched by path, the host may differ
+        response = session.get(
+            "http://other:5052/eth/v1/beacon/states/head/validators/0xabc"
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"data": {"index": "1"}}
+
+    def test_cl_error_status_replayed(self, tmp_path):
+        path = tmp_path / "cassette.jsonl.gz"
+        cassette = Cassette(path, CASSETTE_MODE_RECORD)
+        url = "http://beacon/eth/v1/beacon/states/head/validators/0xabc"
+        cassette.record_cl_response(_cl_response(url, 404, '{"code": 404}'))
+        cassette.close()
+
+        session = requests.Session()
+        session.mount("http://", CassetteAdapter(_replay(path)))
+
+        with pytest.raises(requests.HTTPError):
+            session.get(url).raise_for_status()
+
+    def test_marks(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("MODULES_WHITELIST", "1,2")
+        path = tmp_path / "cassette.jsonl.gz"
+        cassette = Cassette(path, CASSETTE_MODE_RECORD)
+        cassette.record_env()
+        cassette.record_cycle(100, 200)
+        cassette.record_cycle(201, 300)
+        cassette.close()
+
+        replay = _replay(path)
+
+        assert replay.env["MODULES_WHITELIST"] == "1,2"
+        assert [(c["from_block"], c["to_block"]) for c in replay.cycles] == [
+            (100, 200),
+            (201, 300),
+        ]
+
+    def test_preserve_latency(self, tmp_path, mocker):
+        path = tmp_path / "cassette.jsonl.gz"
+        cassette = Cassette(path, CASSETTE_MODE_RECORD)
+        cassette.record_el("eth_chainId", [], {"result": "0x1"}, 0.25)
+        cassette.close()
+        sleep = mocker.patch("src.utils.cassette.time.sleep")
+
+        _replay(path, preserve_latency=True).replay_el("eth_chainId", [])
+
+        sleep.assert_called_once_with(0.25)
+
+    def test_streamed_cl_response_replayed(self, tmp_path):
+        path = tmp_path / "cassette.jsonl.gz"
+        cassette = Cassette(path, CASSETTE_MODE_RECORD)
+        url = "http://beacon/eth/v1/beacon/states/head/validators"
+        body = '{"data": [{"index": "1", "validator": {"pubkey": "0xabc"}}]}'
+        cassette.record_cl_response(_cl_response(url, 200, body))
+        cassette.close()
+
+        cl_client = CLClient("http://beacon")
+        cl_client.session.mount("http://", CassetteAdapter(_replay(path)))
+
+        assert list(cl_client.iter_validators()) == [
+            {"index": "1", "validator": {"pubkey": "0xabc"}}
+        ]
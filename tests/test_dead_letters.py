@@ -0,0 +1,71 @@
+"""Tests for the dead-letter set of failed events."""
+
+from typing import cast
+
+import pytest
+from hexbytes import HexBytes
+from web3.types import EventData
+
+from src.dead_letters import MAX_RETRY_DELAY_SECONDS, DeadLetters
+
+EXIT_REQUESTS_HASH = HexBytes(b"\x01" * 32)
+
+
+def _event() -> EventData:
+    return cast(
+        EventData,
+        {
+            "args": {"exitRequestsHash": EXIT_REQUESTS_HASH},
+            "blockNumber": 100,
+            "transactionHash": HexBytes(b"\x02" * 32),
+        },
+    )
+
+
+@pytest.fixture
+def now(mocker):
+    return mocker.patch("src.dead_letters.time.time", return_value=1000.0)
+
+
+class TestDeadLetters:
+    def test_backoff_doubles_and_is_capped(self, tmp_path, now):
+        dead_letters = DeadLetters(tmp_path / "dead_letters.json", 60)
+
+        delays = [
+            dead_letters.add(_event(), ValueError("boom")).retry_at - 1000
+            for _ in range(15)
+        ]
+
+        assert delays[:3] == [60, 120, 240]
+        assert delays[-1] == MAX_RETRY_DELAY_SECONDS
+
+    def test_due_after_retry_time(self, tmp_path, now):
+        dead_letters = DeadLetters(tmp_path / "dead_letters.json", 60)
+        dead_letters.add(_event(), ValueError("boom"))
+
+        assert dead_letters.due() == []
+        now.return_value = 1060.0
+        assert [entry.exit_requests_hash for entry in dead_letters.due()] == [
+            EXIT_REQUESTS_HASH.hex()
+        ]
+
+    def test_persisted_between_restarts(self, tmp_path, now):
+        path = tmp_path / "dead_letters.json"
+        dead_letters = DeadLetters(path, 60)
+        dead_letters.add(_event(), ValueError("boom"))
+
+        restored = DeadLetters(path, 60)
+
+        assert restored.entries == dead_letters.entries
+        event = restored.entries[EXIT_REQUESTS_HASH.hex()].to_event()
+        assert event["args"]["exitRequestsHash"] == EXIT_REQUESTS_HASH
+        assert event["transactionHash"] == _event()["transactionHash"]
+
+        restored.remove(EXIT_REQUESTS_HASH.hex())
+        assert len(DeadLetters(path, 60)) == 0
+
+    def test_unreadable_file_ignored(self, tmp_path):
+        path = tmp_path / "dead_letters.json"
+        path.write_text("not json")
+
+        assert len(DeadLetters(path, 60)) == 0
@@ -0,0 +1,131 @@
+"""Tests for the on-disk cache of immutable chain data."""
+
+from typing import Any, Callable
+
+from src.blockchain.disk_cache import DiskCache, DiskCacheMiddleware
+
+TX_HASH = "0x" + "ab" * 32
+CHAIN_ID = 560048
+
+
+class FakeNode:
+    def __init__(self, finalized: int, tx_block: int):
+        self.finalized = finalized
+        self.tx_block = tx_block
+        self.calls: list[str] = []
+
+    def make_request(self, method, params) -> Any:
+        self.calls.append(method)
+        if method == "eth_getBlockByNumber":
+            return {"result": {"number": hex(self.finalized)}}
+        if method == "eth_getLogs":
+            return {"result": [{"blockNumber": params[0]["fromBlock"]}]}
+        return {"result": {"hash": params[0], "blockNumber": hex(self.tx_block)}}
+
+
+def _middleware(tmp_path, node: FakeNode) -> Callable[..., Any]:
+    cache = DiskCache(tmp_path / "cache.sqlite", 1024 * 1024, CHAIN_ID)
+    middleware = DiskCacheMiddleware(None, cache)
+    return middleware.wrap_make_request(node.make_request)
+
+
+class TestDiskCache:
+    def test_roundtrip_and_persistence(self, tmp_path):
+        cache = DiskCache(tmp_path / "cache.sqlite", 1024, CHAIN_ID)
+        cache.set("key", b"value")
+        cache.close()
+
+        reopened = DiskCache(tmp_path / "cache.sqlite", 1024, CHAIN_ID)
+
+        assert reopened.get("key") == b"value"
+        assert reopened.get("missing") is None
+        assert reopened.size == len("key") + len("value")
+
+    def test_cleared_when_opened_for_another_chain(self, tmp_path):
+        cache = DiskCache(tmp_path / "cache.sqlite", 1024, CHAIN_ID)
+        cache.set("key", b"value")
+        cache.close()
+
+        reopened = DiskCache(tmp_path / "cache.sqlite", 1024, 1)
+
+        assert reopened.get("key") is None
+        assert reopened.size == 0
+        reopened.close()
+        assert DiskCache(tmp_path / "cache.sqlite", 1024, 1).size == 0
+
+    def test_replace_keeps_size(self, tmp_path):
+        cache = DiskCache(tmp_path / "cache.sqlite", 1024, CHAIN_ID)
+        cache.set("key", b"1234")
+        cache.set("key", b"12")
+
+        assert cache.size == len("key") + 2
+
+    def test_least_recently_used_evicted(self, tmp_path):
+        cache = DiskCache(tmp_path / "cache.sqlite", 100, CHAIN_ID)
+        cache.set("a", b"x" * 29)
+        cache.set("b", b"x" * 29)
+        cache.set("c", b"x" * 29)
+        # "a" becomes the most recently used entry
+        cache.get("a")
+        cache.set("d", b"x" * 29)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("d") is not None
+        assert cache.size <= 100
+
+
+class TestDiskCacheMiddleware:
+    def test_nothing_cached_before_finalized_block_known(self, tmp_path):
+        node = FakeNode(finalized=100, tx_block=90)
+        make_request = _middleware(tmp_path, node)
+
+        make_request("eth_getTransactionByHash", [TX_HASH])
+        make_request("eth_getTransactionByHash", [TX_HASH])
+
+        assert node.calls.count("eth_getTransactionByHash") == 2
+
+    def test_finalized_transaction_cached(self, tmp_path):
+        node = FakeNode(finalized=100, tx_block=90)
+        make_request = _middleware(tmp_path, node)
+        make_request("eth_getBlockByNumber", ["finalized", False])
+
+        first = make_request("eth_getTransactionByHash", [TX_HASH])
+        second = make_request("eth_getTransactionByHash", [TX_HASH])
+
+        assert node.calls.count("eth_getTransactionByHash") == 1
+        assert second["result"] == first["result"]
+
+    def test_not_finalized_transaction_not_cached(self, tmp_path):
+        node = FakeNode(finalized=100, tx_block=101)
+        make_request = _middleware(tmp_path, node)
+        make_request("eth_getBlockByNumber", ["finalized", False])
+
+        make_request("eth_getTransactionReceipt", [TX_HASH])
+        make_request("eth_getTransactionReceipt", [TX_HASH])
+
+        assert node.calls.count("eth_getTransactionReceipt") == 2
+
+    def test_logs_cached_for_finalized_range_only(self, tmp_path):
+        node = FakeNode(finalized=100, tx_block=90)
+        make_request = _middleware(tmp_path, node)
+        make_request("eth_getBlockByNumber", ["finalized", False])
+        finalized_query = {"address": "0x01", "fromBlock": "0x1", "toBlock": "0x64"}
+        open_query = {"address": "0x01", "fromBlock": "0x1", "toBlock": "latest"}
+
+        for _ in range(2):
+            make_request("eth_getLogs", [finalized_query])
+            make_request("eth_getLogs", [open_query])
+
+        assert node.calls.count("eth_getLogs") == 3
+
+    def test_block_receipts_cached_for_finalized_block_only(self, tmp_path):
+        node = FakeNode(finalized=100, tx_block=90)
+        make_request = _middleware(tmp_path, node)
+        make_request("eth_getBlockByNumber", ["finalized", False])
+
+        for _ in range(2):
+            make_request("eth_getBlockReceipts", ["0x64"])
+            make_request("eth_getBlockReceipts", ["0x65"])
+
+        assert node.calls.count("eth_getBlockReceipts") == 3
@@ -0,0 +1,64 @@
+"""Tests for the health check and status server."""
+
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src import health_server
+
+
+@pytest.fixture
+def server_url():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), health_server.HealthCheckHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+class TestHealthServer:
+    def test_health_ok_after_pulse(self, server_url):
+        health_server.pulse()
+
+        response = requests.get(f"{server_url}/health", timeout=5)
+
+        assert response.status_code == 200
+
+    def test_health_fails_without_pulse(self, server_url, monkeypatch):
+        monkeypatch.setattr(
+            health_server,
+            "_last_pulse",
+            time.monotonic() - health_server.PULSE_TIMEOUT_SECONDS - 1,
+        )
+
+        response = requests.get(f"{server_url}/health", timeout=5)
+
+        assert response.status_code == 503
+
+    def test_status(self, server_url, monkeypatch):
+        monkeypatch.setattr(health_server, "_status", {})
+        health_server.update_status(
+            tracked_payloads=2,
+            tracked_validators=10,
+            pending_transactions=1,
+            last_processed_block=100,
+            finalized_block=132,
+            last_successful_cycle_at=time.time(),
+        )
+
+        status = requests.get(f"{server_url}/status", timeout=5).json()
+
+        assert status["tracked_payloads"] == 2
+        assert status["tracked_validators"] == 10
+        assert status["pending_transactions"] == 1
+        assert status["cycle_lag_blocks"] == 32
+        assert status["cycle_lag_seconds"] >= 0
+        assert "last_pulse_seconds_ago" in status
+
+    def test_debug_endpoints_disabled_on_health_server(self, server_url):
+        response = requests.get(f"{server_url}/debug/stacks", timeout=5)
+
+        assert response.status_code == 404
@@ -0,0 +1,94 @@
+"""Tests for incremental decoding of JSON responses."""
+
+import gzip
+import io
+import json
+
+import pytest
+import requests
+from urllib3 import HTTPResponse
+
+from src.utils.cl_client import CLClient
+from src.utils.json_stream import iter_json_array
+
+DOCUMENT = {
+    "execution_optimistic": False,
+    "meta": {"nested": [1, 2, {"data": "not this one"}]},
+    "data": [
+        {"index": "1", "status": "active_ongoing", "name": "zażółć"},
+        {"index": "2", "balance": 32000000000, "ratio": 1.25e-3},
+        [],
+        None,
+    ],
+    "finalized": True,
+}
+
+
+def _chunks(body: bytes, size: int) -> list[bytes]:
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+class TestIterJsonArray:
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 10_000])
+    def test_items_across_chunk_boundaries(self, chunk_size):
+        body = json.dumps(DOCUMENT, indent=2, ensure_ascii=False).encode()
+
+        items = list(iter_json_array(_chunks(body, chunk_size), "data"))
+
+        assert items == DOCUMENT["data"]
+
+    def test_number_split_between_chunks(self):
+        assert list(iter_json_array([b'{"data": [12', b"34, 5]}"], "data")) == [
+            1234,
+            5,
+        ]
+
+    def test_missing_key(self):
+        with pytest.raises(ValueError, match="No 'data' array"):
+            list(iter_json_array([b'{"error": "not found"}'], "data"))
+
+    def test_truncated_body(self):
+        with pytest.raises(ValueError):
+            list(iter_json_array([b'{"data": [{"index": "1"}, {"ind'], "data"))
+
+
+def _response(document: dict, compress: bool = False) -> requests.Response:
+    body = json.dumps(document).encode()
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = HTTPResponse(
+        body=io.BytesIO(gzip.compress(body) if compress else body),
+        headers={"Content-Encoding": "gzip"} if compress else {},
+        preload_content=False,
+    )
+    return response
+
+
+class TestCLClientStreaming:
+    def test_gzip_response_streamed(self, mocker):
+        session = mocker.Mock()
+        session.request.return_value = _response(
+            {"data": DOCUMENT["data"][:2]}, compress=True
+        )
+
+        validators = list(CLClient("http://cl", session=session).iter_validators())
+
+        assert validators == DOCUMENT["data"][:2]
+        assert session.request.call_args.kwargs["stream"] is True
+
+    def test_ids_sent_in_batches(self, mocker):
+        session = mocker.Mock()
+        session.request.side_effect = lambda method, url, **kwargs: _response(
+            {"data": kwargs["json"]["ids"]}
+        )
+        client = CLClient("http://cl", session=session)
+        client.IDS_PER_REQUEST = 2
+
+        validators = list(client.iter_validators("123", ids=range(5)))
+
+        assert validators == ["0", "1", "2", "3", "4"]
+        assert session.request.call_count == 3
+        assert session.request.call_args.args == (
+            "POST",
+            "http://cl/eth/v1/beacon/states/123/validators",
+        )
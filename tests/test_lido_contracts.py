@@ -0,0 +1,71 @@
+"""Tests for staking modules discovery in LidoContracts."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from src import variables
+from src.blockchain.web3_extentions.lido_contracts import LidoContracts
+
+MODULE_1 = "0x55032650b14df07b85bF18A3a3eC8E0Af2e028d5"
+MODULE_2 = "0xaE7B191A31f627b4eB1d4DaC64eab9976995b433"
+
+
+@pytest.fixture
+def lido_contracts(monkeypatch):
+    monkeypatch.setattr(LidoContracts, "_load_contracts", lambda self: None)
+    w3 = Mock()
+    contracts = LidoContracts(w3)
+    contracts.staking_router = Mock()
+    contracts.staking_router.get_staking_modules_addresses.return_value = {
+        1: MODULE_1,
+        2: MODULE_2,
+    }
+    w3.eth.contract.side_effect = lambda address, **_: Mock(address=address)
+    return contracts
+
+
+class TestStakingModulesDiscovery:
+    def test_modules_fetched_once_within_refresh_interval(self, lido_contracts):
+        assert lido_contracts.get_staking_modules() == {1: MODULE_1, 2: MODULE_2}
+        lido_contracts.get_staking_modules()
+
+        lido_contracts.staking_router.get_staking_modules_addresses.assert_called_once()
+
+    def test_modules_refreshed_after_interval(self, lido_contracts, monkeypatch):
+        monkeypatch.setattr(variables, "STAKING_MODULES_REFRESH_INTERVAL_SECONDS", 0)
+
+        lido_contracts.get_staking_modules()
+        lido_contracts.get_staking_modules()
+
+        assert (
+            lido_contracts.staking_router.get_staking_modules_addresses.call_count == 2
+        )
+
+    def test_registry_created_lazily_and_reused(self, lido_contracts):
+        assert lido_contracts.node_operator_registry_map == {}
+
+        registry = lido_contracts.get_node_operator_registry(2)
+
+        assert registry.address == MODULE_2
+        assert lido_contracts.get_node_operator_registry(2) is registry
+        assert lido_contracts.w3.eth.contract.call_count == 1
+
+    def test_unknown_module_has_no_registry(self, lido_contracts):
+        assert lido_contracts.get_node_operator_registry(42) is None
+
+    def test_empty_whitelist_enables_all_discovered_modules(
+        self, lido_contracts, monkeypatch
+    ):
+        monkeypatch.setattr(variables, "MODULES_WHITELIST", [])
+
+        assert lido_contracts.is_module_enabled(1)
+        assert lido_contracts.is_module_enabled(2)
+        assert not lido_contracts.is_module_enabled(3)
+
+    def test_whitelist_restricts_modules(self, lido_contracts, monkeypatch):
+        monkeypatch.setattr(variables, "MODULES_WHITELIST", [2])
+
+        assert not lido_contracts.is_module_enabled(1)
+        assert lido_contracts.is_module_enabled(2)
+        lido_contracts.staking_router.get_staking_modules_addresses.assert_not_called()
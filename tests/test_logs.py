@@ -0,0 +1,50 @@
+"""Tests for logging helpers."""
+
+import io
+import json
+import time
+
+from src.utils import logs
+from src.utils.logs import QueueLoggerFactory, _dumps, log_sampled
+
+
+class TestLogSampling:
+    def test_full_rate_logs_everything(self, monkeypatch):
+        monkeypatch.setattr(logs, "_sample_rate", 1.0)
+
+        assert all(log_sampled() for _ in range(100))
+
+    def test_zero_rate_logs_nothing(self, monkeypatch):
+        monkeypatch.setattr(logs, "_sample_rate", 0.0)
+
+        assert not any(log_sampled() for _ in range(100))
+
+
+class TestQueueLogger:
+    def test_lines_written_in_order(self):
+        output = io.StringIO()
+        factory = QueueLoggerFactory(output)
+        logger = factory()
+
+        for i in range(10):
+            logger.info(f"line {i}")
+
+        deadline = time.monotonic() + 5
+        while output.getvalue().count("\n") < 10 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert output.getvalue().splitlines() == [f"line {i}" for i in range(10)]
+
+
+class TestDumps:
+    def test_non_string_keys_and_bytes(self):
+        rendered = _dumps({"event": {1: b"\x01"}}, default=str)
+
+        assert json.loads(rendered) == {"event": {"1": "b'\\x01'"}}
+
+    def test_ints_over_64_bits(self):
+        balance = 100 * 10**18
+
+        rendered = _dumps({"event": "balance", "wei": balance}, default=str)
+
+        assert json.loads(rendered) == {"event": "balance", "wei": balance}
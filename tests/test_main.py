@@ -0,0 +1,60 @@
+"""Tests for the bot setup in src/main.py."""
+
+from typing import Any
+
+import pytest
+from web3.module import Module
+from web3.providers import BaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+from src import main
+
+
+class ChainIdProvider(BaseProvider):
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        return {"jsonrpc": "2.0", "id": 1, "result": "0x1"}
+
+
+class TestCreateWeb3:
+    @pytest.fixture(autouse=True)
+    def provider(self, mocker):
+        mocker.patch.object(main, "RoutingProvider", return_value=ChainIdProvider())
+        # Lido contracts are resolved on attach
+        mocker.patch.object(main, "LidoContracts", Module)
+
+    def test_runs_without_disk_cache_when_data_dir_unwritable(self, mocker, tmp_path):
+        # A file in place of the data directory, mkdir fails as it would without access
+        data_dir = tmp_path / "data"
+        data_dir.write_text("")
+        mocker.patch.object(main, "DATA_DIR", data_dir / "nested")
+        mocker.patch.object(main, "DISK_CACHE_MAX_BYTES", 1024)
+
+        w3 = main.create_web3(["http://localhost:8545"])
+
+        assert "disk_cache" not in w3.middleware_onion
+        assert w3.eth.chain_id == 1
+
+    def test_disk_cache_injected(self, mocker, tmp_path):
+        mocker.patch.object(main, "DATA_DIR", tmp_path)
+        mocker.patch.object(main, "DISK_CACHE_MAX_BYTES", 1024)
+
+        w3 = main.create_web3(["http://localhost:8545"])
+
+        assert "disk_cache" in w3.middleware_onion
+        # Listed from the outermost to the innermost layer
+        assert [name for _, name in w3.middleware_onion.middleware][-1] == "disk_cache"
+
+
+class TestLockDataDir:
+    def test_data_dir_of_another_instance_refused(self, mocker, tmp_path):
+        mocker.patch.object(main, "DATA_DIR", tmp_path)
+        lock_file = main.lock_data_dir()
+        assert lock_file is not None
+
+        with pytest.raises(RuntimeError, match="another bot instance"):
+            main.lock_data_dir()
+
+        lock_file.close()
+        lock_file = main.lock_data_dir()
+        assert lock_file is not None
+        lock_file.close()
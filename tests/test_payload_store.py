@@ -0,0 +1,57 @@
+"""Tests for the memory-bounded store of raw payload bytes."""
+
+from src.payload_store import PayloadStore
+
+
+class TestPayloadStore:
+    def test_least_recently_used_spilled_over_budget(self, tmp_path):
+        store = PayloadStore(tmp_path, memory_budget=200)
+        store["a"] = b"a" * 100
+        store["b"] = b"b" * 100
+        store.get("a")
+
+        store["c"] = b"c" * 100
+
+        assert store.memory_bytes() == 200
+        assert store.spilled_bytes() == 100
+        assert (tmp_path / "b.bin").read_bytes() == b"b" * 100
+
+    def test_spilled_payload_read_back(self, tmp_path):
+        store = PayloadStore(tmp_path, memory_budget=100)
+        store["a"] = b"a" * 100
+        store["b"] = b"b" * 100
+
+        assert store["a"] == b"a" * 100
+        # Reading it back spills the other payload
+        assert not (tmp_path / "a.bin").exists()
+        assert (tmp_path / "b.bin").exists()
+        assert len(store) == 2
+        assert set(store) == {"a", "b"}
+
+    def test_remove_deletes_spilled_file(self, tmp_path):
+        store = PayloadStore(tmp_path, memory_budget=100)
+        store["a"] = b"a" * 100
+        store["b"] = b"b" * 100
+
+        store.remove("a")
+        store.remove("b")
+
+        assert len(store) == 0
+        assert store.memory_bytes() == 0
+        assert list(tmp_path.iterdir()) == []
+
+    def test_no_budget_keeps_everything_in_memory(self, tmp_path):
+        store = PayloadStore(tmp_path, memory_budget=0)
+        for key in "abc":
+            store[key] = b"x" * 1000
+
+        assert store.spilled_bytes() == 0
+        assert store.get("missing") is None
+
+    def test_stale_files_removed_on_start(self, tmp_path):
+        (tmp_path / "old.bin").write_bytes(b"old")
+
+        store = PayloadStore(tmp_path, memory_budget=100)
+
+        assert "old" not in store
+        assert not (tmp_path / "old.bin").exists()
@@ -0,0 +1,84 @@
+"""Tests for the staged producer/consumer pipeline."""
+
+import threading
+import time
+
+import pytest
+
+from src.utils.pipeline import Pipeline
+
+
+class TestPipeline:
+    def test_items_flow_through_stages(self):
+        results = []
+        pipeline = Pipeline()
+        pipeline.add_stage(
+            "double", lambda item: pipeline.stages["collect"].put(item * 2)
+        )
+        pipeline.add_stage("collect", results.append)
+
+        with pipeline:
+            for item in range(10):
+                pipeline.stages["double"].put(item)
+
+        assert results == [item * 2 for item in range(10)]
+
+    def test_slow_stage_does_not_block_upstream_work(self):
+        release = threading.Event()
+        decoded = []
+        pipeline = Pipeline()
+        pipeline.add_stage(
+            "decode",
+            lambda item: (decoded.append(item), pipeline.stages["send"].put(item)),
+        )
+        pipeline.add_stage("send", lambda item: release.wait(), queue_size=10)
+
+        with pipeline:
+            for item in range(5):
+                pipeline.stages["decode"].put(item)
+            deadline = time.monotonic() + 5
+            while len(decoded) < 5 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            # Everything is decoded while the first send is still waiting
+            assert decoded == list(range(5))
+            release.set()
+
+    def test_full_queue_blocks_producer(self):
+        release = threading.Event()
+        pipeline = Pipeline()
+        pipeline.add_stage("slow", lambda item: release.wait(), queue_size=1)
+        produced = []
+
+        def produce():
+            for item in range(3):
+                pipeline.stages["slow"].put(item)
+                produced.append(item)
+
+        with pipeline:
+            producer = threading.Thread(target=produce)
+            producer.start()
+            time.sleep(0.2)
+            # One item in work, one in the queue, the third waits for room
+            assert len(produced) == 2
+            release.set()
+            producer.join()
+
+        assert produced == [0, 1, 2]
+
+    def test_error_raised_after_drain(self):
+        processed = []
+
+        def handle(item):
+            if item == 1:
+                raise ValueError("boom")
+            processed.append(item)
+
+        pipeline = Pipeline()
+        pipeline.add_stage("stage", handle)
+
+        with pytest.raises(ValueError, match="boom"):
+            with pipeline:
+                for item in range(3):
+                    pipeline.stages["stage"].put(item)
+
+        assert processed == [0, 2]
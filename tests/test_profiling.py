@@ -0,0 +1,99 @@
+"""Tests for on-demand profiling helpers."""
+
+import threading
+import time
+
+import pytest
+
+from src.utils.profiling import CycleProfiler, allocations_snapshot, thread_stacks
+
+
+def busy_cycle():
+    # Long enough to be sampled a few times
+    deadline = time.monotonic() + 0.03
+    while time.monotonic() < deadline:
+        sum(i * i for i in range(1000))
+
+
+def worker_task():
+    busy_cycle()
+
+
+class TestCycleProfiler:
+    def test_cycle_without_request_is_not_profiled(self):
+        profiler = CycleProfiler()
+
+        with profiler.cycle():
+            busy_cycle()
+
+        assert profiler._request is None
+
+    def test_profile_next_cycles(self):
+        profiler = CycleProfiler()
+        stop = threading.Event()
+
+        def bot_loop():
+            while not stop.is_set():
+                with profiler.cycle():
+                    busy_cycle()
+                time.sleep(0.01)
+
+        thread = threading.Thread(target=bot_loop, daemon=True)
+        thread.start()
+        try:
+            report = profiler.profile_cycles(cycles=2, timeout=5)
+        finally:
+            stop.set()
+            thread.join()
+
+        assert "Profile of 2 bot cycle(s)" in report
+        assert "ncalls is the number of samples" in report
+        assert "busy_cycle" in report
+        assert profiler._request is None
+
+    def test_profile_worker_threads(self):
+        profiler = CycleProfiler()
+        stop = threading.Event()
+
+        def bot_loop():
+            while not stop.is_set():
+                with profiler.cycle():
+                    worker = threading.Thread(target=worker_task)
+                    worker.start()
+                    worker.join()
+                time.sleep(0.01)
+
+        thread = threading.Thread(target=bot_loop, daemon=True)
+        thread.start()
+        try:
+            report = profiler.profile_cycles(cycles=1, timeout=5)
+        finally:
+            stop.set()
+            thread.join()
+
+        assert "worker_task" in report
+        assert "busy_cycle" in report
+
+    def test_profile_timeout(self):
+        profiler = CycleProfiler()
+
+        with pytest.raises(TimeoutError):
+            profiler.profile_cycles(cycles=1, timeout=0.01)
+
+        assert profiler._request is None
+
+
+class TestSnapshots:
+    def test_allocations_snapshot(self):
+        report = allocations_snapshot(seconds=0, top=5)
+
+        assert report.startswith("Top 5 allocation sites")
+
+    def test_thread_stacks_collapsed(self):
+        report = thread_stacks(collapsed=True)
+
+        main_line = next(
+            line for line in report.splitlines() if line.startswith("MainThread;")
+        )
+        assert main_line.endswith(" 1")
+        assert "test_thread_stacks_collapsed" in main_line
@@ -0,0 +1,122 @@
+"""Tests for EL request routing across endpoints."""
+
+import pytest
+import requests
+from web3.types import RPCEndpoint
+
+from src.blockchain.providers import RoutingProvider
+
+ENDPOINTS = ["http://127.0.0.1:8545", "http://127.0.0.2:8545"]
+
+
+@pytest.fixture(autouse=True)
+def no_shared_buckets(mocker):
+    mocker.patch.dict("src.utils.rate_limit._shared_buckets", clear=True)
+
+
+def _throttled() -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = 429
+    return requests.HTTPError("429 Too Many Requests", response=response)
+
+
+def _provider(mocker, **kwargs) -> tuple[RoutingProvider, list]:
+    # Endpoint proxies request the chain id on creation
+    mocker.patch(
+        "web3_multi_provider.http_provider_proxy.HTTPProviderProxy._fetch_chain_id",
+        return_value=1,
+    )
+    provider = RoutingProvider(ENDPOINTS, **kwargs)
+    nodes = []
+    for endpoint in provider._endpoints:
+        node = mocker.Mock()
+        node.endpoint_uri = endpoint.uri
+        node.make_request.return_value = {"jsonrpc": "2.0", "id": 1, "result": "0x1"}
+        endpoint.provider = node
+        nodes.append(node)
+    return provider, nodes
+
+
+class TestRoutingProvider:
+    def test_reads_spread_across_endpoints(self, mocker):
+        provider, nodes = _provider(mocker)
+
+        for _ in range(50):
+            provider.make_request(RPCEndpoint("eth_call"), [{}, "latest"])
+
+        assert all(node.make_request.call_count > 0 for node in nodes)
+
+    def test_send_pinned_to_first_endpoint(self, mocker):
+        provider, nodes = _provider(mocker)
+
+        for _ in range(10):
+            provider.make_request(
+                RPCEndpoint("eth_getTransactionCount"), ["0x01", "pending"]
+            )
+            provider.make_request(RPCEndpoint("eth_sendRawTransaction"), ["0x02"])
+
+        assert nodes[0].make_request.call_count == 20
+        assert nodes[1].make_request.call_count == 0
+
+    def test_pinned_fails_over_and_skips_failed_endpoint(self, mocker):
+        provider, nodes = _provider(mocker)
+        nodes[0].make_request.side_effect = ConnectionError("down")
+
+        provider.make_request(RPCEndpoint("eth_sendRawTransaction"), ["0x02"])
+        provider.make_request(RPCEndpoint("eth_sendRawTransaction"), ["0x02"])
+
+        # The failed endpoint is not retried during the cooldown
+        assert nodes[0].make_request.call_count == 1
+        assert nodes[1].make_request.call_count == 2
+
+    def test_all_endpoints_failing(self, mocker):
+        provider, nodes = _provider(mocker)
+        for node in nodes:
+            node.make_request.side_effect = ConnectionError("down")
+
+        with pytest.raises(Exception, match="No active provider"):
+            provider.make_request(RPCEndpoint("eth_call"), [{}, "latest"])
+
+    def test_reads_avoid_rate_limited_endpoint(self, mocker):
+        provider, nodes = _provider(mocker, rate_limits=[1, 0])
+
+        for _ in range(20):
+            provider.make_request(RPCEndpoint("eth_getLogs"), [{}])
+
+        # One token of burst, the rest goes to the unlimited endpoint
+        assert nodes[0].make_request.call_count <= 2
+        assert nodes[1].make_request.call_count >= 18
+
+    def test_throttled_read_retried_after_backoff(self, mocker):
+        sleep = mocker.patch("src.blockchain.providers.time.sleep")
+        provider, nodes = _provider(mocker, max_retries=2)
+        ok = {"jsonrpc": "2.0", "id": 1, "result": "0x1"}
+        nodes[0].make_request.side_effect = [_throttled(), ok]
+        nodes[1].make_request.side_effect = [_throttled()]
+
+        response = provider.make_request(RPCEndpoint("eth_call"), [{}, "latest"])
+
+        assert response == ok
+        sleep.assert_called_once()
+
+    def test_non_idempotent_call_not_retried(self, mocker):
+        sleep = mocker.patch("src.blockchain.providers.time.sleep")
+        provider, nodes = _provider(mocker, max_retries=2)
+        for node in nodes:
+            node.make_request.side_effect = _throttled()
+
+        with pytest.raises(Exception, match="No active provider"):
+            provider.make_request(RPCEndpoint("eth_sendTransaction"), [{}])
+
+        sleep.assert_not_called()
+
+    def test_chain_id_requested_once(self, mocker):
+        provider, nodes = _provider(mocker)
+
+        for _ in range(5):
+            assert (
+                provider.make_request(RPCEndpoint("eth_chainId"), []).get("result")
+                == "0x1"
+            )
+
+        assert sum(node.make_request.call_count for node in nodes) == 1
@@ -0,0 +1,102 @@
+"""Tests for request pacing and retries shared by the EL and CL clients."""
+
+import io
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.utils.rate_limit import (
+    MAX_RETRY_DELAY_SECONDS,
+    RateLimitedAdapter,
+    TokenBucket,
+    retry_delay,
+    shared_bucket,
+)
+
+URL = "http://127.0.0.1:5052/eth/v1/beacon/states/head/validators/1"
+
+
+@pytest.fixture(autouse=True)
+def no_shared_buckets(mocker):
+    mocker.patch.dict("src.utils.rate_limit._shared_buckets", clear=True)
+
+
+@pytest.fixture
+def sleep(mocker):
+    return mocker.patch("src.utils.rate_limit.time.sleep")
+
+
+def _response(status: int, headers: dict | None = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = b"{}"
+    response.raw = io.BytesIO(b"{}")
+    return response
+
+
+class TestTokenBucket:
+    def test_burst_then_empty(self):
+        bucket = TokenBucket(rate=5)
+
+        assert [bucket.try_acquire() for _ in range(6)] == [True] * 5 + [False]
+        assert 0 < bucket.wait_time() <= 0.2
+
+    def test_shared_by_host_with_lowest_rate(self):
+        el = shared_bucket("http://node.example:8545", 50)
+        cl = shared_bucket("http://node.example:8545/eth", 20)
+
+        assert el is not None
+        assert el is cl
+        assert el.rate == 20
+        assert shared_bucket("http://other.example:8545", 50) is not el
+        assert shared_bucket("http://node.example:8545", 0) is None
+
+
+class TestRetryDelay:
+    def test_jittered_exponential(self):
+        delays = [retry_delay(3, 0.5) for _ in range(100)]
+
+        assert all(2 <= delay <= 4 for delay in delays)
+        assert len(set(delays)) > 1
+
+    def test_retry_after_and_cap(self):
+        assert retry_delay(0, 0.5, "7") == 7
+        assert retry_delay(20, 0.5) <= MAX_RETRY_DELAY_SECONDS
+
+
+class TestRateLimitedAdapter:
+    def test_throttled_request_retried(self, mocker, sleep):
+        send = mocker.patch.object(
+            HTTPAdapter,
+            "send",
+            side_effect=[_response(429, {"Retry-After": "2"}), _response(200)],
+        )
+        session = requests.Session()
+        session.mount("http://", RateLimitedAdapter("cl", None, 3, 0.5))
+
+        response = session.get(URL)
+
+        assert response.status_code == 200
+        assert send.call_count == 2
+        sleep.assert_called_once_with(2.0)
+
+    def test_last_response_returned_after_retries(self, mocker, sleep):
+        mocker.patch.object(HTTPAdapter, "send", return_value=_response(503))
+        session = requests.Session()
+        session.mount("http://", RateLimitedAdapter("cl", None, 2, 0.5))
+
+        response = session.get(URL)
+
+        assert response.status_code == 503
+        assert sleep.call_count == 2
+
+    def test_not_found_not_retried(self, mocker, sleep):
+        send = mocker.patch.object(HTTPAdapter, "send", return_value=_response(404))
+        session = requests.Session()
+        session.mount("http://", RateLimitedAdapter("cl", None, 2, 0.5))
+
+        assert session.get(URL).status_code == 404
+        assert send.call_count == 1
+        sleep.assert_not_called()
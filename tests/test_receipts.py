@@ -0,0 +1,91 @@
+"""Tests for bulk transaction receipt fetching."""
+
+import pytest
+from hexbytes import HexBytes
+from web3.exceptions import MethodUnavailable, TransactionNotFound, Web3RPCError
+
+from src.blockchain.web3_extentions.receipts import ReceiptUtils
+
+TX_A = HexBytes(b"\x0a" * 32)
+TX_B = HexBytes(b"\x0b" * 32)
+TX_OTHER = HexBytes(b"\x0c" * 32)
+
+
+def _receipt(tx_hash: HexBytes) -> dict:
+    return {"transactionHash": tx_hash, "status": 1}
+
+
+@pytest.fixture
+def w3(mocker):
+    w3 = mocker.Mock()
+    w3.eth.get_block_receipts.side_effect = lambda block: [
+        _receipt(TX_A),
+        _receipt(TX_OTHER),
+        _receipt(TX_B),
+    ]
+    w3.eth.get_transaction_receipt.side_effect = _receipt
+    return w3
+
+
+class TestReceiptUtils:
+    def test_block_receipts_filtered_to_wanted(self, w3):
+        receipts = ReceiptUtils(w3).get_receipts({100: [TX_A, TX_B]})
+
+        assert set(receipts) == {TX_A, TX_B}
+        w3.eth.get_block_receipts.assert_called_once_with(100)
+        w3.eth.get_transaction_receipt.assert_not_called()
+
+    def test_fallback_detected_once(self, w3):
+        w3.eth.get_block_receipts.side_effect = MethodUnavailable("Method not found")
+        receipt_utils = ReceiptUtils(w3)
+
+        receipts = receipt_utils.get_receipts({100: [TX_A], 110: [TX_B]})
+
+        assert set(receipts) == {TX_A, TX_B}
+        assert w3.eth.get_block_receipts.call_count == 1
+        assert w3.eth.get_transaction_receipt.call_count == 2
+        assert receipt_utils.block_receipts_supported is False
+
+    def test_unsupported_endpoint_after_supported_one(self, w3):
+        # Reads routed to another endpoint of the provider
+        w3.eth.get_block_receipts.side_effect = [
+            [_receipt(TX_A)],
+            MethodUnavailable("Method not found"),
+        ]
+        receipt_utils = ReceiptUtils(w3)
+
+        receipts = receipt_utils.get_receipts({100: [TX_A], 110: [TX_B], 120: [TX_B]})
+
+        assert set(receipts) == {TX_A, TX_B}
+        assert w3.eth.get_block_receipts.call_count == 2
+        assert receipt_utils.block_receipts_supported is False
+
+    def test_other_errors_fall_back_for_the_block(self, w3):
+        w3.eth.get_block_receipts.side_effect = [
+            Web3RPCError("response size exceeded"),
+            [_receipt(TX_B)],
+        ]
+        receipt_utils = ReceiptUtils(w3)
+
+        receipts = receipt_utils.get_receipts({100: [TX_A], 110: [TX_B]})
+
+        assert set(receipts) == {TX_A, TX_B}
+        w3.eth.get_transaction_receipt.assert_called_once_with(TX_A)
+        assert receipt_utils.block_receipts_supported is True
+
+    def test_failed_block_and_transaction_receipts_left_out(self, w3):
+        w3.eth.get_block_receipts.side_effect = TimeoutError("read timed out")
+        w3.eth.get_transaction_receipt.side_effect = TimeoutError("read timed out")
+
+        assert ReceiptUtils(w3).get_receipts({100: [TX_A]}) == {}
+
+    def test_missing_transaction_receipt_left_out(self, w3):
+        w3.eth.get_block_receipts.side_effect = MethodUnavailable("Method not found")
+        w3.eth.get_transaction_receipt.side_effect = [
+            TransactionNotFound("reorged"),
+            _receipt(TX_B),
+        ]
+
+        receipts = ReceiptUtils(w3).get_receipts({100: [TX_A], 110: [TX_B]})
+
+        assert set(receipts) == {TX_B}
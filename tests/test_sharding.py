@@ -0,0 +1,107 @@
+"""Tests for sharding of the bot work across instances."""
+
+import threading
+
+import pytest
+
+from src.sharding import SHARD_KEY_PAYLOAD, Sharding, ShardLease
+
+
+@pytest.fixture
+def now(mocker):
+    return mocker.patch("src.sharding.time.time", return_value=1000.0)
+
+
+def _lease(tmp_path, instance_id: str) -> ShardLease:
+    return ShardLease(tmp_path, 2, instance_id, ttl_seconds=60)
+
+
+class TestSharding:
+    def test_everything_owned_without_sharding(self):
+        sharding = Sharding()
+
+        assert not sharding.enabled
+        assert sharding.owns_module(3)
+        assert sharding.owns_payload("ff" * 32)
+        assert sharding.can_submit()
+
+    def test_modules_split_by_shard_id(self):
+        sharding = Sharding(shard_count=2, shard_id=1)
+
+        assert [sharding.owns_module(module_id) for module_id in range(4)] == [
+            False,
+            True,
+            False,
+            True,
+        ]
+        # Payloads are not sharded by module key
+        assert sharding.owns_payload("00" * 32)
+
+    def test_payloads_split_by_hash(self):
+        sharding = Sharding(shard_count=2, shard_id=1, key=SHARD_KEY_PAYLOAD)
+
+        # Shard of the first 8 bytes of the hash
+        assert sharding.owns_payload("00" * 7 + "01" + "00" * 24)
+        assert not sharding.owns_payload("00" * 7 + "02" + "00" * 24)
+        assert sharding.owns_module(2)
+
+    def test_shard_id_or_lease_required(self):
+        with pytest.raises(ValueError):
+            Sharding(shard_count=2)
+
+
+class TestShardLease:
+    def test_instances_lease_different_shards(self, tmp_path, now):
+        leases = [_lease(tmp_path, name) for name in ("a", "b", "c")]
+
+        assert [lease.refresh() for lease in leases] == [0, 1, None]
+        # Renewal keeps the shard
+        assert leases[0].refresh() == 0
+
+    def test_expired_lease_taken_over(self, tmp_path, now):
+        first, second = _lease(tmp_path, "a"), _lease(tmp_path, "b")
+        first.shard_count = second.shard_count = 1
+        assert first.refresh() == 0
+        assert second.refresh() is None
+
+        now.return_value += 61
+
+        assert second.refresh() == 0
+        assert first.refresh() is None
+
+    def test_released_lease_acquired_without_waiting(self, tmp_path, now):
+        first, second = _lease(tmp_path, "a"), _lease(tmp_path, "b")
+        first.shard_count = second.shard_count = 1
+        first.refresh()
+
+        first.release()
+
+        assert second.refresh() == 0
+
+    def test_no_submission_after_lease_lost(self, tmp_path, now):
+        sharding = Sharding(shard_count=2, lease=_lease(tmp_path, "a"))
+        assert sharding.refresh() == 0
+
+        now.return_value += 61
+        # Another instance took the shard over while this one was stalled
+        assert _lease(tmp_path, "b").refresh() == 0
+
+        assert not sharding.can_submit()
+
+    def test_concurrent_submissions_keep_the_shard(self, tmp_path, now):
+        sharding = Sharding(shard_count=2, lease=_lease(tmp_path, "a"))
+        sharding.refresh()
+        results = []
+
+        def submit():
+            for _ in range(20):
+                results.append(sharding.can_submit() and sharding.owns_module(2))
+
+        workers = [threading.Thread(target=submit) for _ in range(8)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert all(results) and len(results) == 160
+        assert sharding.shard_id == 0
@@ -0,0 +1,112 @@
+"""Tests for the pool of signer accounts."""
+
+import threading
+
+import pytest
+from eth_account import Account
+from web3 import Web3
+from web3.types import Wei
+
+from src.blockchain.signer_pool import SignerPool
+
+ACCOUNTS = [Account.from_key(bytes([i]) * 32) for i in (1, 2)]
+MIN_BALANCE = Wei(Web3.to_wei(0.01, "ether"))
+
+
+@pytest.fixture
+def chain():
+    """Per-address chain state read by the pool."""
+    return {
+        account.address: {"balance": Web3.to_wei(1, "ether"), "latest": 5, "pending": 5}
+        for account in ACCOUNTS
+    }
+
+
+@pytest.fixture
+def pool(mocker, chain):
+    w3 = mocker.Mock()
+    w3.eth.chain_id = 1
+    w3.eth.get_balance.side_effect = lambda address: chain[address]["balance"]
+    w3.eth.get_transaction_count.side_effect = lambda address, block: chain[address][
+        block
+    ]
+    return SignerPool(w3, ACCOUNTS, MIN_BALANCE)
+
+
+class TestSignerPool:
+    def test_idle_signers_used_in_parallel(self, pool):
+        first = pool.acquire(Wei(0))
+        second = pool.acquire(Wei(0))
+
+        assert {first.address, second.address} == {a.address for a in ACCOUNTS}
+        assert first.nonce == second.nonce == 5
+
+    def test_nonce_advanced_after_inclusion(self, pool):
+        signer = pool.acquire(Wei(0))
+        pool.release(signer, sent_nonce=5, included=True)
+
+        # The node doesn't see the transaction yet, the local nonce is used
+        assert pool.acquire(Wei(0)).nonce == 6
+
+    def test_low_funds_signer_skipped(self, pool, chain):
+        chain[ACCOUNTS[0].address]["balance"] = MIN_BALANCE + 100
+
+        signer = pool.acquire(Wei(101))
+
+        assert signer.address == ACCOUNTS[1].address
+        assert pool.signers[0].state == "low_funds"
+
+    def test_stuck_signer_skipped_until_included(self, pool, chain):
+        stuck = pool.acquire(Wei(0))
+        chain[stuck.address]["pending"] = 6
+        pool.release(stuck, sent_nonce=5, included=False)
+        assert stuck.state == "stuck"
+
+        other = pool.acquire(Wei(0))
+        assert other.address != stuck.address
+        pool.release(other)
+        assert pool.acquire(Wei(0)) is other
+        pool.release(other)
+
+        chain[stuck.address]["latest"] = 6
+        assert pool.acquire(Wei(0)) is stuck
+        assert stuck.nonce == 6
+
+    def test_dropped_transaction_nonce_reused(self, pool):
+        signer = pool.acquire(Wei(0))
+        pool.release(signer, sent_nonce=5, included=False)
+
+        assert pool.acquire(Wei(0)) is signer
+        assert signer.nonce == 5
+
+    def test_none_when_no_signer_usable(self, pool, chain):
+        for state in chain.values():
+            state["balance"] = 0
+
+        assert pool.acquire(Wei(0)) is None
+
+    def test_waits_for_busy_signer(self, pool):
+        taken = [pool.acquire(Wei(0)) for _ in ACCOUNTS]
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire(Wei(0))))
+        waiter.start()
+
+        pool.release(taken[1])
+        waiter.join(timeout=5)
+
+        assert acquired == [taken[1]]
+
+    def test_signer_released_on_rpc_error(self, pool):
+        pool.w3.eth.get_balance.side_effect = ConnectionError("rpc down")
+
+        with pytest.raises(ConnectionError):
+            pool.acquire(Wei(0))
+
+        assert all(signer.state == "available" for signer in pool.signers)
+
+    def test_none_when_wait_times_out(self, pool, mocker):
+        mocker.patch.object(SignerPool, "WAIT_TIMEOUT_SECONDS", 0.01)
+        for _ in ACCOUNTS:
+            pool.acquire(Wei(0))
+
+        assert pool.acquire(Wei(0)) is None
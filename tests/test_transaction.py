@@ -0,0 +1,65 @@
+"""Tests for access lists of sent transactions."""
+
+import pytest
+from web3.exceptions import MethodUnavailable
+from web3.types import Wei
+
+from src.blockchain.web3_extentions.transaction import TransactionUtils
+
+SENDER = "0x0000000000000000000000000000000000000001"
+ACCESS_LIST = [
+    {
+        "address": "0x00000961Ef480Eb55e80D19ad83579A64c007002",
+        "storageKeys": ["0x" + "00" * 32],
+    }
+]
+
+
+@pytest.fixture
+def transaction(mocker):
+    transaction = mocker.Mock()
+    transaction.address = "0x0000000000000000000000000000000000000002"
+    transaction._encode_transaction_data.return_value = "0x1234"
+    return transaction
+
+
+@pytest.fixture
+def transaction_utils(mocker):
+    w3 = mocker.Mock()
+    w3.eth.create_access_list.return_value = {
+        "accessList": ACCESS_LIST,
+        "gasUsed": 90_000,
+    }
+    return TransactionUtils(w3)
+
+
+class TestAccessList:
+    def test_attached_when_gas_lower(self, transaction_utils, transaction):
+        transaction.estimate_gas.return_value = 95_000
+
+        access_list, gas = transaction_utils._choose_access_list(
+            transaction, SENDER, Wei(1), 100_000
+        )
+
+        assert access_list == ACCESS_LIST
+        assert gas == 95_000
+        params = transaction.estimate_gas.call_args.args[0]
+        assert params["accessList"] == ACCESS_LIST
+        assert params["value"] == 1
+
+    def test_not_attached_when_gas_not_lower(self, transaction_utils, transaction):
+        transaction.estimate_gas.return_value = 100_200
+
+        assert transaction_utils._choose_access_list(
+            transaction, SENDER, Wei(0), 100_000
+        ) == (None, 100_000)
+
+    def test_unsupported_method_ignored(self, transaction_utils, transaction):
+        transaction_utils.w3.eth.create_access_list.side_effect = MethodUnavailable(
+            "Method not found"
+        )
+
+        assert transaction_utils._choose_access_list(
+            transaction, SENDER, Wei(0), 100_000
+        ) == (None, 100_000)
+        transaction.estimate_gas.assert_not_called()
@@ -0,0 +1,391 @@
+"""Tests for ExitDataProcessing event ingestion in TriggerExitBot."""
+
+import pytest
+from eth_abi.abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.types import Wei
+
+from src import variables
+from src.metrics.cycle_stats import WorkBudget
+from src.sharding import Sharding
+from src.trigger_exit_bot import TriggerExitBot, TriggerPlan
+from src.utils.exit_data_decoder import decode_all_validators
+
+TX_HASH = HexBytes(b"\x02" * 32)
+PAYLOAD = (
+    (1).to_bytes(3, "big")
+    + (38).to_bytes(5, "big")
+    + (1201962).to_bytes(8, "big")
+    + bytes(range(48))
+)
+
+
+def _exit_requests_hash(data: bytes, data_format: int = 1) -> bytes:
+    return Web3.keccak(encode(["bytes", "uint256"], [data, data_format]))
+
+
+@pytest.fixture
+def bot(mocker, tmp_path):
+    mocker.patch.object(variables, "DATA_DIR", tmp_path)
+    mocker.patch.object(variables, "PAYLOAD_MEMORY_BUDGET_BYTES", 0)
+    # A worker per stage keeps the processing order of the tests
+    mocker.patch.object(variables, "PIPELINE_WORKERS", 1)
+    w3 = mocker.Mock()
+    w3.eth.get_transaction.return_value = {"input": b"\x01"}
+    w3.receipts.get_receipts.return_value = {TX_HASH: {"status": 1}}
+    vebo = w3.lido.validator_exit_bus_oracle
+    vebo.decode_submit_report_data.return_value = None
+    vebo.decode_submit_exit_requests_data.return_value = {
+        "request": {"data": PAYLOAD, "dataFormat": 1}
+    }
+    bot = TriggerExitBot(w3, mocker.Mock())
+    # Validator checks are not part of ingestion
+    mocker.patch.object(bot, "_check_payload", return_value=[])
+    return bot
+
+
+def _event(exit_requests_hash: bytes, block_number: int = 100) -> dict:
+    return {
+        "args": {"exitRequestsHash": exit_requests_hash},
+        "blockNumber": block_number,
+        "transactionHash": TX_HASH,
+    }
+
+
+class TestHashFirstIngestion:
+    def test_payload_stored_under_exit_requests_hash(self, bot):
+        exit_requests_hash = _exit_requests_hash(PAYLOAD)
+        bot.vebo.get_exit_data_processing_events.return_value = [
+            _event(exit_requests_hash)
+        ]
+
+        bot.trigger_exits(0, 200)
+
+        assert list(bot.validators_map) == [exit_requests_hash.hex()]
+        assert bot.data_bytes_map[exit_requests_hash.hex()] == PAYLOAD
+        assert bot.validators_map[exit_requests_hash.hex()][0]["valIndex"] == 1201962
+
+    def test_known_payload_skips_transaction(self, bot):
+        exit_requests_hash = _exit_requests_hash(PAYLOAD)
+        bot.vebo.get_exit_data_processing_events.return_value = [
+            _event(exit_requests_hash)
+        ]
+
+        bot.trigger_exits(0, 200)
+        bot.trigger_exits(0, 200)
+
+        assert bot.w3.eth.get_transaction.call_count == 1
+        assert bot.w3.receipts.get_receipts.call_count == 1
+        assert bot.vebo.decode_submit_exit_requests_data.call_count == 1
+
+    def test_receipts_requested_by_block(self, bot):
+        exit_requests_hash = _exit_requests_hash(PAYLOAD)
+        other_hash = _exit_requests_hash(PAYLOAD, data_format=2)
+        bot.vebo.get_exit_data_processing_events.return_value = [
+            _event(exit_requests_hash),
+            _event(other_hash),
+        ]
+
+        bot.trigger_exits(0, 200)
+
+        bot.w3.receipts.get_receipts.assert_called_once_with({100: [TX_HASH, TX_HASH]})
+
+    def test_hash_mismatch_quarantined(self, bot):
+        exit_requests_hash = _exit_requests_hash(PAYLOAD, data_format=2)
+        bot.vebo.get_exit_data_processing_events.return_value = [
+            _event(exit_requests_hash)
+        ]
+
+        bot.trigger_exits(0, 200)
+
+        assert bot.validators_map == {}
+        assert bot.next_block == 201
+        entry = bot.dead_letters.entries[exit_requests_hash.hex()]
+        assert "does not match exitRequestsHash" in entry.error
+
+
+class _RequestBudget(WorkBudget):
+    """Budget of a fixed number of exhausted() checks."""
+
+    def __init__(self, checks: int):
+        super().__init__()
+        self.checks = checks
+
+    def exhausted(self) -> bool:
+        self.checks -= 1
+        return self.checks < 0
+
+
+class TestWorkBudget:
+    def test_events_resume_from_cursor(self, bot):
+        first = _exit_requests_hash(PAYLOAD)
+        second = _exit_requests_hash(PAYLOAD, data_format=2)
+        bot.vebo.get_exit_data_processing_events.return_value = [
+            _event(first, block_number=100),
+            _event(second, block_number=150),
+        ]
+
+        events = bot.trigger_exits(0, 200, budget=_RequestBudget(1))
+
+        assert len(events) == 1
+        assert bot.next_block == 150
+        assert bot.pending_work
+
+        bot.trigger_exits(bot.next_block, 200)
+
+        assert bot.next_block == 201
+        assert not bot.pending_work
+
+    def test_restart_resumes_from_saved_cursor(self, bot, mocker, tmp_path):
+        exit_requests_hash = _exit_requests_hash(PAYLOAD)
+        bot.vebo.get_exit_data_processing_events.return_value = [
+            _event(exit_requests_hash)
+        ]
+        bot.trigger_exits(0, 200)
+
+        mocker.patch.object(variables, "DATA_DIR", tmp_path)
+        restarted = TriggerExitBot(bot.w3, bot.cl_client)
+        restarted.vebo = bot.vebo
+        mocker.patch.object(restarted, "_check_payload", return_value=[])
+        bot.vebo.get_exit_data_processing_events.return_value = []
+
+        assert restarted.next_block == 201
+        restarted.trigger_exits(restarted.next_block, 300)
+
+        assert list(restarted.validators_map) == [exit_requests_hash.hex()]
+        bot.vebo.get_exit_data_processing_events.assert_called_with(
+            from_block=201, to_block=300
+        )
+        assert restarted.cursor.next_block == 301
+
+    def test_triggerable_payloads_checked_first(self, bot):
+        bot.validators_map = {"idle": [], "never": [], "triggerable": []}
+        bot.payload_checked_at = {"idle": 1, "triggerable": 2}
+        bot.triggerable_counts = {"idle": 0, "triggerable": 3}
+        bot.vebo.get_exit_data_processing_events.return_value = []
+
+        bot.trigger_exits(0, 200)
+
+        checked = [c.args[0] for c in bot._check_payload.call_args_list]
+        assert checked == ["triggerable", "never", "idle"]
+
+    def test_payload_checks_resume_with_skipped_payloads(self, bot):
+        bot.validators_map = {"a": [], "b": [], "c": []}
+        bot.vebo.get_exit_data_processing_events.return_value = []
+
+        bot.trigger_exits(0, 200, budget=_RequestBudget(2))
+        bot.trigger_exits(0, 200, budget=_RequestBudget(1))
+
+        checked = [c.args[0] for c in bot._check_payload.call_args_list]
+        assert checked == ["a", "b", "c"]
+
+
+class TestDeadLetters:
+    def test_failed_event_quarantined_and_range_processed(self, bot):
+        broken = _exit_requests_hash(PAYLOAD, data_format=2)
+        exit_requests_hash = _exit_requests_hash(PAYLOAD)
+        bot.vebo.get_exit_data_processing_events.return_value = [
+            _event(broken, block_number=100),
+            _event(exit_requests_hash, block_number=150),
+        ]
+        bot.vebo.decode_submit_exit_requests_data.side_effect = [
+            ValueError("malformed"),
+            {"request": {"data": PAYLOAD, "dataFormat": 1}},
+        ]
+
+        bot.trigger_exits(0, 200)
+
+        assert list(bot.validators_map) == [exit_requests_hash.hex()]
+        assert broken.hex() in bot.dead_letters
+        assert bot.next_block == 201
+
+    def test_event_without_receipt_quarantined(self, bot):
+        exit_requests_hash = _exit_requests_hash(PAYLOAD)
+        bot.vebo.get_exit_data_processing_events.return_value = [
+            _event(exit_requests_hash)
+        ]
+        bot.w3.receipts.get_receipts.return_value = {}
+
+        bot.trigger_exits(0, 200)
+
+        assert exit_requests_hash.hex() in bot.dead_letters
+        assert bot.next_block == 201
+
+    def test_quarantined_event_retried_after_backoff(self, bot, mocker):
+        exit_requests_hash = _exit_requests_hash(PAYLOAD)
+        bot.vebo.get_exit_data_processing_events.return_value = [
+            _event(exit_requests_hash)
+        ]
+        bot.vebo.decode_submit_exit_requests_data.side_effect = ValueError("down")
+        bot.trigger_exits(0, 200)
+
+        # Rescanned events don't bypass the backoff
+        bot.vebo.decode_submit_exit_requests_data.side_effect = None
+        bot.trigger_exits(0, 200)
+        assert exit_requests_hash.hex() in bot.dead_letters
+
+        retry_at = bot.dead_letters.entries[exit_requests_hash.hex()].retry_at
+        mocker.patch("src.dead_letters.time.time", return_value=retry_at)
+        bot.vebo.get_exit_data_processing_events.return_value = []
+        bot.trigger_exits(201, 300)
+
+        assert exit_requests_hash.hex() in bot.validators_map
+        assert len(bot.dead_letters) == 0
+
+
+class TestPayloadRetirement:
+    def test_payload_retired_when_all_validators_exited(self, bot):
+        exit_requests_hash = _exit_requests_hash(PAYLOAD)
+        bot.vebo.get_exit_data_processing_events.return_value = [
+            _event(exit_requests_hash)
+        ]
+        bot.trigger_exits(0, 200)
+        bot.cl_client.is_validator_exited.return_value = True
+
+        TriggerExitBot._check_payload(bot, exit_requests_hash.hex())
+
+        assert bot.validators_map == {}
+        assert exit_requests_hash.hex() not in bot.data_bytes_map
+        assert bot.cursor.payload_events == {}
+        assert bot.get_state_summary()["retired_payloads"] == 1
+
+    def test_retired_payload_not_planned(self, bot):
+        data_key = _exit_requests_hash(PAYLOAD).hex()
+        validators = decode_all_validators(PAYLOAD)
+        bot._store_payload(data_key, PAYLOAD, 1, validators)
+        bot._retire_payload(data_key)
+
+        assert bot._plan_trigger(data_key, validators) is None
+        bot.vebo.trigger_exits.assert_not_called()
+
+    def test_retired_payload_not_ingested_again(self, bot):
+        exit_requests_hash = _exit_requests_hash(PAYLOAD)
+        bot.retired_payloads.add(exit_requests_hash.hex())
+        bot.vebo.get_exit_data_processing_events.return_value = [
+            _event(exit_requests_hash)
+        ]
+
+        bot.trigger_exits(0, 200)
+
+        assert bot.validators_map == {}
+        bot.w3.receipts.get_receipts.assert_not_called()
+
+
+class TestSharedValidators:
+    @pytest.fixture
+    def shared(self, bot):
+        """Two payloads with the same validator."""
+        data_keys = []
+        for data_format in (1, 2):
+            data_key = _exit_requests_hash(PAYLOAD, data_format).hex()
+            bot._store_payload(
+                data_key, PAYLOAD, data_format, decode_all_validators(PAYLOAD)
+            )
+            data_keys.append(data_key)
+        bot.cl_client.is_validator_exited.return_value = False
+        registry = bot.w3.lido.get_node_operator_registry.return_value
+        registry.is_validator_exiting_key_reported.return_value = True
+        return data_keys
+
+    def test_status_resolved_once_and_triggered_by_one_payload(self, bot, shared):
+        first, second = shared
+        assert len(bot.validator_index) == 1
+
+        to_trigger = [TriggerExitBot._check_payload(bot, key) for key in shared]
+
+        assert [len(validators) for validators in to_trigger] == [1, 0]
+        assert bot._trigger_claims == {
+            bytes(range(48)).hex(): first,
+        }
+        bot.cl_client.is_validator_exited.assert_called_once()
+        registry = bot.w3.lido.get_node_operator_registry.return_value
+        registry.is_validator_exiting_key_reported.assert_called_once()
+        assert bot.triggerable_counts[second] == 0
+
+    def test_claim_handed_over_when_plan_fails(self, bot, shared, mocker):
+        first, second = shared
+        bot.vebo.get_exit_data_processing_events.return_value = []
+        mocker.patch.object(
+            bot,
+            "_check_payload",
+            side_effect=lambda data_key: TriggerExitBot._check_payload(bot, data_key),
+        )
+        plan_trigger = mocker.patch.object(
+            bot,
+            "_plan_trigger",
+            side_effect=lambda data_key, validators: (
+                None
+                if data_key == first
+                else TriggerPlan(data_key, mocker.Mock(), Wei(0), validators)
+            ),
+        )
+        submit_trigger = mocker.patch.object(bot, "_submit_trigger")
+
+        bot.trigger_exits(0, 200)
+
+        assert [call.args[0] for call in plan_trigger.call_args_list] == [
+            first,
+            second,
+        ]
+        submit_trigger.assert_called_once()
+        assert submit_trigger.call_args.args[0].data_key == second
+        assert bot._trigger_claims == {bytes(range(48)).hex(): second}
+
+    def test_claim_released_when_lease_lost(self, bot, shared, mocker):
+        first, _ = shared
+        TriggerExitBot._check_payload(bot, first)
+        bot.sharding = mocker.Mock()
+        bot.sharding.can_submit.return_value = False
+        bot.transaction_utils = mocker.Mock()
+
+        bot._submit_trigger(
+            TriggerPlan(first, mocker.Mock(), Wei(0), bot.validators_map[first])
+        )
+
+        assert bot._trigger_claims == {}
+
+    def test_exit_removes_validator_from_all_payloads(self, bot, shared):
+        bot.cl_client.is_validator_exited.return_value = True
+
+        TriggerExitBot._check_payload(bot, shared[0])
+
+        assert bot.validators_map == {}
+        assert bot.validator_index == {}
+        assert bot.retired_payloads == set(shared)
+
+
+class TestSharding:
+    def test_validators_of_other_shard_not_triggered(self, bot, mocker):
+        data_key = _exit_requests_hash(PAYLOAD).hex()
+        bot._store_payload(data_key, PAYLOAD, 1, decode_all_validators(PAYLOAD))
+        # Module 1 belongs to shard 1 of 2
+        bot.sharding = Sharding(shard_count=2, shard_id=0)
+        bot.cl_client.is_validator_exited.return_value = False
+
+        to_trigger = TriggerExitBot._check_payload(bot, data_key)
+
+        assert to_trigger == []
+        assert data_key in bot.validators_map
+        bot.w3.lido.get_node_operator_registry.assert_not_called()
+
+    def test_exited_validators_of_other_shard_retired(self, bot, mocker):
+        data_key = _exit_requests_hash(PAYLOAD).hex()
+        bot._store_payload(data_key, PAYLOAD, 1, decode_all_validators(PAYLOAD))
+        bot.sharding = Sharding(shard_count=2, shard_id=0)
+        bot.cl_client.is_validator_exited.return_value = True
+
+        TriggerExitBot._check_payload(bot, data_key)
+
+        assert bot.validators_map == {}
+        assert data_key in bot.retired_payloads
+
+    def test_not_sent_after_lease_lost(self, bot, mocker):
+        bot.sharding = mocker.Mock()
+        bot.sharding.can_submit.return_value = False
+        bot.transaction_utils = mocker.Mock()
+        plan = TriggerPlan("", mocker.Mock(), Wei(0), decode_all_validators(PAYLOAD))
+
+        bot._submit_trigger(plan)
+
+        bot.transaction_utils.send.assert_not_called()
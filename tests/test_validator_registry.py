@@ -0,0 +1,177 @@
+"""Tests for the memory-mapped validator registry snapshot."""
+
+from typing import Optional
+
+import pytest
+from eth_typing import HexStr
+
+from src.utils.cl_client import CLClient
+from src.utils.validator_registry import (
+    MIN_EXIT_TO_WITHDRAWAL_EPOCHS,
+    ValidatorRegistry,
+)
+
+FAR_FUTURE_EPOCH = str(2**64 - 1)
+
+
+def _pubkey(index: int) -> HexStr:
+    # All-zero pubkey marks a missing record
+    return HexStr("0x" + (index + 1).to_bytes(48, "big").hex())
+
+
+def _validator(index: int, status: str = "active_ongoing") -> dict:
+    return {
+        "index": str(index),
+        "status": status,
+        "validator": {
+            "pubkey": _pubkey(index),
+            "exit_epoch": FAR_FUTURE_EPOCH,
+            "withdrawable_epoch": FAR_FUTURE_EPOCH,
+        },
+    }
+
+
+class FakeCLClient(CLClient):
+    IDS_PER_REQUEST = 2
+
+    def __init__(self, count: int):
+        super().__init__("http://cl")
+        self.slot = 320
+        self.validators = [_validator(index) for index in range(count)]
+        self.requests: list[tuple[Optional[list[int]], Optional[list[str]]]] = []
+
+    def get_head_slot(self) -> int:
+        return self.slot
+
+    def iter_validators(self, state_id="head", ids=None, statuses=None):
+        ids = None if ids is None else list(ids)
+        self.requests.append((ids, statuses))
+        for validator in self.validators:
+            if ids is not None and int(validator["index"]) not in ids:
+                continue
+            if statuses is not None and validator["status"] not in statuses:
+                continue
+            yield validator
+
+
+@pytest.fixture
+def cl_client():
+    return FakeCLClient(5)
+
+
+@pytest.fixture
+def registry(tmp_path, cl_client):
+    registry = ValidatorRegistry(tmp_path / "validator_registry")
+    registry.refresh(cl_client)
+    yield registry
+    registry.close()
+
+
+class TestValidatorRegistry:
+    def test_lookups_by_index_and_pubkey(self, registry):
+        assert len(registry) == 5
+        assert registry.epoch == 10
+        record = registry.get_by_pubkey(_pubkey(3))
+        assert record.index == 3
+        assert record.status == "active_ongoing"
+        assert registry.get(3) == record
+        assert registry.get(5) is None
+        assert registry.get_by_pubkey(_pubkey(7)) is None
+        assert registry.pubkeys()[4] == _pubkey(4)
+
+    def test_snapshot_reopened_from_files(self, tmp_path, registry):
+        reopened = ValidatorRegistry(tmp_path / "validator_registry")
+
+        assert reopened.epoch == 10
+        record = reopened.get_by_pubkey(_pubkey(2))
+        assert record is not None
+        assert record.index == 2
+        reopened.close()
+
+    def test_not_refreshed_within_epoch(self, registry, cl_client):
+        cl_client.slot += 31
+        cl_client.requests.clear()
+
+        assert not registry.refresh(cl_client)
+        assert cl_client.requests == []
+
+    def test_incremental_refresh(self, registry, cl_client):
+        cl_client.validators[1]["status"] = "withdrawal_possible"
+        cl_client.validators[4]["status"] = "pending_queued"
+        cl_client.slot += 32
+        registry.refresh(cl_client)
+        assert registry.get(1).exited
+
+        cl_client.slot += 32
+        cl_client.requests.clear()
+        # Left a changing status, not returned by the status query
+        cl_client.validators[1]["status"] = "withdrawal_done"
+        cl_client.validators[4]["status"] = "active_ongoing"
+        cl_client.validators[2]["status"] = "active_exiting"
+        cl_client.validators.extend(_validator(index) for index in range(5, 8))
+
+        assert registry.refresh(cl_client)
+
+        assert registry.get(1).status == "withdrawal_done"
+        assert registry.get(2).status == "active_exiting"
+        assert registry.get(4).status == "active_ongoing"
+        assert len(registry) == 8
+        assert registry.get_by_pubkey(_pubkey(7)).index == 7
+        # Full registry is never requested again
+        assert all(ids is not None or statuses for ids, statuses in cl_client.requests)
+
+    def test_new_validators_below_pending_ones_fetched(self, registry, cl_client):
+        # Activated below the highest pending index, not in a changing status
+        cl_client.validators.extend(_validator(index) for index in range(5, 10))
+        cl_client.validators.extend(
+            _validator(index, "pending_queued") for index in range(10, 13)
+        )
+        cl_client.slot += 32
+
+        assert registry.refresh(cl_client)
+
+        assert len(registry) == 13
+        assert registry.pubkeys()[7] == _pubkey(7)
+        assert registry.get(7).status == "active_ongoing"
+        assert registry.get(12).status == "pending_queued"
+
+    def test_rebuilt_after_exit_to_withdrawal_gap(self, tmp_path, registry, cl_client):
+        registry.close()
+        # Exited and withdrawn while the snapshot was not refreshed
+        cl_client.validators[2]["status"] = "withdrawal_done"
+        cl_client.slot += MIN_EXIT_TO_WITHDRAWAL_EPOCHS * 32
+        cl_client.requests.clear()
+        reopened = ValidatorRegistry(tmp_path / "validator_registry")
+
+        assert reopened.refresh(cl_client)
+
+        record = reopened.get(2)
+        assert record is not None
+        assert record.status == "withdrawal_done"
+        assert cl_client.requests == [(None, None)]
+        reopened.close()
+
+    def test_index_grown_with_registry(self, tmp_path):
+        cl_client = FakeCLClient(400)
+        registry = ValidatorRegistry(tmp_path / "validator_registry")
+        registry.refresh(cl_client)
+
+        cl_client.slot += 32
+        cl_client.IDS_PER_REQUEST = 1000
+        cl_client.validators.extend(_validator(index) for index in range(400, 1200))
+        registry.refresh(cl_client)
+
+        records = [registry.get_by_pubkey(_pubkey(index)) for index in range(1200)]
+        assert [record and record.index for record in records] == list(range(1200))
+        registry.close()
+
+    def test_cl_client_checks_status_in_snapshot(self, registry, cl_client, mocker):
+        cl_client.validators[1]["status"] = "exited_unslashed"
+        cl_client.slot += 32
+        registry.refresh(cl_client)
+        session = mocker.Mock()
+        client = CLClient("http://cl", session=session, registry=registry)
+
+        assert client.is_validator_exited(_pubkey(1))
+        assert not client.is_validator_exited(_pubkey(0))
+        session.get.assert_not_called()